@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     FAISS_INDEX_PATH: str = 'faiss_index.faiss'
     # RAG top-k
     TOP_K: int = 5
+    # Query embeddings kept in the in-process LRU (0 disables)
+    QUERY_CACHE_SIZE: int = 1024
 
     class Config:
         env_file = '.env'
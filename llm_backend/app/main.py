@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from app.api.chat_routes import router as chat_router
+from app.api.chat_routes import router as chat_router, _service
 from app.utils.logger import get_logger
 
 logger = get_logger()
@@ -10,7 +10,7 @@ app.include_router(chat_router, prefix="/api")
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "ok"}
+    return {"status": "ok", "query_cache": _service.query_processor.cache_stats()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,5 +1,8 @@
-from typing import List
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List
 import re
+import unicodedata
 from app.modules.embeddings import Embeddings
 
 class QueryProcessor:
@@ -8,10 +11,17 @@ class QueryProcessor:
     Responsibilities:
     - Normalize/clean input text
     - Call embeddings module to create vectors
+    - Keep a bounded LRU of recent query vectors so repeated questions
+      skip the embedding model
     """
 
-    def __init__(self, embeddings: Embeddings):
+    def __init__(self, embeddings: Embeddings, cache_size: int = 1024):
         self.embeddings = embeddings
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
 
     def clean_text(self, text: str) -> str:
         """Simple cleaning pipeline: strip, lower, normalize whitespace."""
@@ -22,6 +32,36 @@ class QueryProcessor:
         return text
 
     def vectorize(self, text: str):
-        """Clean and vectorize the query using embeddings module."""
+        """Clean and vectorize the query using embeddings module.
+
+        Vectors are cached per (model, NFC-normalized cleaned text).
+        """
         cleaned = self.clean_text(text)
-        return self.embeddings.encode([cleaned])[0]
+        if self.cache_size <= 0:
+            return self.embeddings.encode([cleaned])[0]
+
+        key = (getattr(self.embeddings, 'model_name', None), unicodedata.normalize('NFC', cleaned))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        vector = self.embeddings.encode([cleaned])[0]
+        with self._lock:
+            self._cache[key] = vector
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return vector
+
+    def cache_stats(self) -> Dict:
+        """Counters for the query embedding cache (exposed on /health)."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._cache),
+            'max_entries': self.cache_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
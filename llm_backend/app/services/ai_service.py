@@ -21,7 +21,7 @@ class AIService:
         self.rag = rag or RAGPipeline()
         self.llm = llm or LLMEngine()
         self.multilingual = multilingual or MultilingualManager(provider=settings.TRANSLATION_PROVIDER)
-        self.query_processor = QueryProcessor(self.embeddings)
+        self.query_processor = QueryProcessor(self.embeddings, cache_size=settings.QUERY_CACHE_SIZE)
 
     def build_context(self, retrieved: List[tuple]) -> str:
         parts = []
@@ -16,3 +16,22 @@ def test_clean_and_vectorize():
     assert cleaned == 'Hello World'
     vec = qp.vectorize('hello')
     assert isinstance(vec, list) or hasattr(vec, '__len__')
+
+def test_vectorize_caches_repeated_queries():
+    class CountingEmbeddings(DummyEmbeddings):
+        calls = 0
+        def encode(self, texts):
+            CountingEmbeddings.calls += 1
+            return super().encode(texts)
+
+    qp = QueryProcessor(embeddings=CountingEmbeddings(), cache_size=2)
+    first = qp.vectorize('what is the refund policy')
+    again = qp.vectorize('  what is   the refund policy ')
+    assert again == first
+    assert CountingEmbeddings.calls == 1
+    qp.vectorize('a')
+    qp.vectorize('b')
+    qp.vectorize('what is the refund policy')
+    assert CountingEmbeddings.calls == 4
+    stats = qp.cache_stats()
+    assert stats['hits'] == 1 and stats['entries'] == 2
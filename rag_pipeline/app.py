@@ -113,7 +113,8 @@ with col2:
                             # Display source documents
                             st.subheader("📚 Source Documents")
                             for doc in result['source_documents']:
-                                with st.expander(f"Document {doc['rank']} (Score: {doc['score']:.4f})"):
+                                source = f" — {doc['citation']}" if doc.get('citation') else ""
+                                with st.expander(f"Document {doc['rank']} (Score: {doc['score']:.4f}){source}"):
                                     st.write(doc['text'])
                             
                             # Display stats
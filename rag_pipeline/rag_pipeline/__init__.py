@@ -3,11 +3,17 @@ Smart Document Assistant - RAG Pipeline Module
 Modular RAG pipeline for document question-answering system
 """
 
-from rag_pipeline.rag_system import RAGSystem
-from rag_pipeline.chunker import TextChunker
-from rag_pipeline.embeddings import EmbeddingModel
-from rag_pipeline.vector_store import FAISSVectorStore
-from rag_pipeline.retriever import Retriever
+import importlib
+
+# Imported on first use, so light modules such as rag_pipeline.embedding_cache
+# can be used without loading FAISS or sentence-transformers
+_EXPORTS = {
+    "RAGSystem": "rag_pipeline.rag_system",
+    "TextChunker": "rag_pipeline.chunker",
+    "EmbeddingModel": "rag_pipeline.embeddings",
+    "FAISSVectorStore": "rag_pipeline.vector_store",
+    "Retriever": "rag_pipeline.retriever"
+}
 
 __version__ = "1.0.0"
 __author__ = "RAG Pipeline Engineer"
@@ -19,3 +25,9 @@ __all__ = [
     "FAISSVectorStore",
     "Retriever"
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'rag_pipeline' has no attribute '{name}'")
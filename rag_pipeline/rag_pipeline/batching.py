@@ -0,0 +1,145 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """Coalesce concurrent retrieval requests into ``Retriever.retrieve_batch`` calls.
+    
+    Callers submit single queries from any thread (or ``await retrieve_async``
+    from an event loop). A worker thread waits up to ``max_wait_ms`` after the
+    first pending query for others to arrive, then embeds and searches the
+    whole group in one forward pass and one FAISS call. Queries only share a
+    batch when their ``k``/``nprobe``/``ef_search`` and ``document_ids``/``pages``
+    filters match.
+    """
+    
+    def __init__(self, retriever, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        if retriever is None:
+            raise ValueError("retriever required")
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be greater than 0")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms cannot be negative")
+        
+        self.retriever = retriever
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        
+        self._queue: "queue.Queue[Optional[Tuple]]" = queue.Queue()
+        self._stats = {"requests": 0, "batches": 0, "largest_batch": 0}
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="rag-micro-batcher", daemon=True)
+        self._worker.start()
+    
+    def submit(self, query: str, k: Optional[int] = None, nprobe: Optional[int] = None,
+               ef_search: Optional[int] = None, document_ids=None, pages=None) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        if not query or not isinstance(query, str) or not query.strip():
+            raise ValueError("Query must be a non-empty string")
+        
+        # Filters become part of the batch key, so they are normalised to hashable values
+        if isinstance(document_ids, str):
+            document_ids = [document_ids]
+        if document_ids is not None:
+            document_ids = tuple(sorted(set(document_ids)))
+        if isinstance(pages, int):
+            pages = (pages, pages)
+        if pages is not None:
+            pages = tuple(pages)
+        
+        future = Future()
+        self._queue.put((query, (k, nprobe, ef_search, document_ids, pages), future))
+        return future
+    
+    def retrieve(self, query: str, k: Optional[int] = None, nprobe: Optional[int] = None,
+                 ef_search: Optional[int] = None, document_ids=None, pages=None,
+                 timeout: Optional[float] = None) -> List[dict]:
+        return self.submit(query, k=k, nprobe=nprobe, ef_search=ef_search,
+                           document_ids=document_ids, pages=pages).result(timeout=timeout)
+    
+    async def retrieve_async(self, query: str, k: Optional[int] = None, nprobe: Optional[int] = None,
+                             ef_search: Optional[int] = None, document_ids=None, pages=None) -> List[dict]:
+        return await asyncio.wrap_future(self.submit(query, k=k, nprobe=nprobe, ef_search=ef_search,
+                                                     document_ids=document_ids, pages=pages))
+    
+    def _collect(self, first: Tuple) -> Tuple[List[Tuple], bool]:
+        pending = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return pending, True
+            pending.append(item)
+        return pending, False
+    
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            
+            pending, stopping = self._collect(first)
+            
+            groups: Dict[Tuple, List[Tuple]] = {}
+            for item in pending:
+                groups.setdefault(item[1], []).append(item)
+            
+            for (k, nprobe, ef_search, document_ids, pages), items in groups.items():
+                self._dispatch(items, k, nprobe, ef_search, document_ids, pages)
+        
+        # Anything that raced in behind the shutdown sentinel is failed, not dropped
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[2].set_running_or_notify_cancel():
+                item[2].set_exception(RuntimeError("MicroBatcher is closed"))
+    
+    def _dispatch(self, items: List[Tuple], k: Optional[int], nprobe: Optional[int],
+                  ef_search: Optional[int], document_ids=None, pages=None) -> None:
+        live = [item for item in items if item[2].set_running_or_notify_cancel()]
+        if not live:
+            return
+        
+        with self._stats_lock:
+            self._stats["requests"] += len(live)
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(live))
+        
+        try:
+            results = self.retriever.retrieve_batch(
+                [query for query, _, _ in live], k=k, nprobe=nprobe, ef_search=ef_search,
+                document_ids=document_ids, pages=pages
+            )
+        except Exception as e:
+            for _, _, future in live:
+                future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(live, results):
+            future.set_result(result)
+    
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["mean_batch_size"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout=timeout)
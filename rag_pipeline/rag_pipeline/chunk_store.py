@@ -0,0 +1,226 @@
+import os
+import json
+import mmap
+from typing import Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+class ChunkTextStore:
+    """Chunk texts stored as one UTF-8 blob plus an offsets array.
+    
+    Texts are decoded lazily per lookup, so opening a store costs a handful of
+    file opens no matter how many chunks it holds. With ``use_mmap=True`` the
+    files are memory-mapped and every process reading the same index shares
+    a single page-cache copy.
+    
+    Stores written with chunk IDs keep them in a sorted ``int64`` column next
+    to a per-chunk document column; older stores fall back to positional IDs.
+    Chunk locations (page range and character offsets in the source document)
+    live in one ``(n, 4)`` column, ``-1`` where unknown.
+    """
+    
+    TEXTS_FILE = "chunks.bin"
+    OFFSETS_FILE = "chunks.offsets.npy"
+    IDS_FILE = "chunks.ids.npy"
+    DOCS_FILE = "chunks.docs.npy"
+    DOCUMENTS_FILE = "documents.json"
+    LOCATIONS_FILE = "chunks.locations.npy"
+    LOCATION_FIELDS = ("page_start", "page_end", "start", "end")
+    
+    def __init__(self, offsets: np.ndarray, data, mapping: mmap.mmap = None,
+                 ids: Optional[np.ndarray] = None, doc_index: Optional[np.ndarray] = None,
+                 documents: Optional[List[str]] = None, locations: Optional[np.ndarray] = None):
+        self.offsets = offsets
+        self.data = data
+        self.ids = ids
+        self.doc_index = doc_index
+        self.documents = documents or []
+        self.locations = locations
+        self._mapping = mapping
+    
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return (os.path.exists(os.path.join(directory, cls.TEXTS_FILE))
+                and os.path.exists(os.path.join(directory, cls.OFFSETS_FILE)))
+    
+    @classmethod
+    def write(cls, directory: str, texts: Sequence[str], ids: Optional[Sequence[int]] = None,
+              document_ids: Optional[Sequence[Optional[str]]] = None,
+              locations: Optional[np.ndarray] = None) -> None:
+        """Write texts (sorted by ``ids`` when given) and their optional ID, document and location columns."""
+        if ids is not None and len(ids) != len(texts):
+            raise ValueError("ids and texts must have the same length")
+        if document_ids is not None and len(document_ids) != len(texts):
+            raise ValueError("document_ids and texts must have the same length")
+        if locations is not None and len(locations) != len(texts):
+            raise ValueError("locations and texts must have the same length")
+        
+        order = range(len(texts))
+        if ids is not None:
+            ids = np.asarray(ids, dtype=np.int64)
+            order = np.argsort(ids, kind="stable").tolist()
+        
+        offsets = np.zeros(len(texts) + 1, dtype=np.uint64)
+        position = 0
+        with open(os.path.join(directory, cls.TEXTS_FILE + ".tmp"), 'wb') as f:
+            for row, idx in enumerate(order):
+                encoded = texts[idx].encode("utf-8")
+                f.write(encoded)
+                position += len(encoded)
+                offsets[row + 1] = position
+        
+        columns = {cls.OFFSETS_FILE: offsets}
+        documents = None
+        if ids is not None:
+            columns[cls.IDS_FILE] = ids[order]
+        if locations is not None:
+            columns[cls.LOCATIONS_FILE] = cls.as_locations(locations)[order]
+        if document_ids is not None:
+            documents = sorted({doc for doc in document_ids if doc is not None})
+            lookup = {doc: idx for idx, doc in enumerate(documents)}
+            columns[cls.DOCS_FILE] = np.array(
+                [lookup.get(document_ids[idx], -1) for idx in order], dtype=np.int32
+            )
+        
+        for name, column in columns.items():
+            with open(os.path.join(directory, name + ".tmp"), 'wb') as f:
+                np.save(f, column)
+        if documents is not None:
+            with open(os.path.join(directory, cls.DOCUMENTS_FILE + ".tmp"), 'w', encoding="utf-8") as f:
+                json.dump(documents, f, ensure_ascii=False)
+        
+        written = [cls.TEXTS_FILE, *columns] + ([cls.DOCUMENTS_FILE] if documents is not None else [])
+        for name in written:
+            os.replace(os.path.join(directory, name + ".tmp"), os.path.join(directory, name))
+        
+        # Columns not written this time must not survive from an earlier save
+        for name in (cls.IDS_FILE, cls.DOCS_FILE, cls.DOCUMENTS_FILE, cls.LOCATIONS_FILE):
+            if name not in written and os.path.exists(os.path.join(directory, name)):
+                os.remove(os.path.join(directory, name))
+    
+    @classmethod
+    def as_locations(cls, locations, count: Optional[int] = None) -> np.ndarray:
+        """Coerce location rows (or ``None`` for "unknown") into an ``(n, 4)`` int64 column."""
+        if locations is None:
+            return np.full((count or 0, len(cls.LOCATION_FIELDS)), -1, dtype=np.int64)
+        if not isinstance(locations, np.ndarray):
+            locations = [[-1 if value is None else value for value in row] for row in locations]
+        return np.asarray(locations, dtype=np.int64).reshape(-1, len(cls.LOCATION_FIELDS))
+    
+    @classmethod
+    def open(cls, directory: str, use_mmap: bool = True) -> "ChunkTextStore":
+        texts_file = os.path.join(directory, cls.TEXTS_FILE)
+        mmap_mode = 'r' if use_mmap else None
+        
+        def load_column(name: str) -> Optional[np.ndarray]:
+            path = os.path.join(directory, name)
+            return np.load(path, mmap_mode=mmap_mode) if os.path.exists(path) else None
+        
+        documents = None
+        documents_file = os.path.join(directory, cls.DOCUMENTS_FILE)
+        if os.path.exists(documents_file):
+            with open(documents_file, 'r', encoding="utf-8") as f:
+                documents = json.load(f)
+        
+        columns = {
+            "offsets": load_column(cls.OFFSETS_FILE),
+            "ids": load_column(cls.IDS_FILE),
+            "doc_index": load_column(cls.DOCS_FILE),
+            "locations": load_column(cls.LOCATIONS_FILE),
+            "documents": documents
+        }
+        
+        if not use_mmap:
+            with open(texts_file, 'rb') as f:
+                return cls(data=f.read(), **columns)
+        
+        if os.path.getsize(texts_file) == 0:
+            return cls(data=b"", **columns)
+        
+        with open(texts_file, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data=mapping, mapping=mapping, **columns)
+    
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+    
+    def __getitem__(self, idx: int) -> str:
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("chunk index out of range")
+        start, end = int(self.offsets[idx]), int(self.offsets[idx + 1])
+        return self.data[start:end].decode("utf-8")
+    
+    def __iter__(self) -> Iterator[str]:
+        for idx in range(len(self)):
+            yield self[idx]
+    
+    def to_list(self) -> List[str]:
+        return list(self)
+    
+    def chunk_ids(self) -> np.ndarray:
+        if self.ids is None:
+            return np.arange(len(self), dtype=np.int64)
+        return self.ids
+    
+    def position(self, chunk_id: int) -> int:
+        if self.ids is None:
+            return chunk_id if 0 <= chunk_id < len(self) else -1
+        
+        position = int(np.searchsorted(self.ids, chunk_id))
+        if position < len(self.ids) and self.ids[position] == chunk_id:
+            return position
+        return -1
+    
+    def get(self, chunk_id: int) -> Optional[str]:
+        position = self.position(chunk_id)
+        return self[position] if position >= 0 else None
+    
+    def document_at(self, position: int) -> Optional[str]:
+        if self.doc_index is None:
+            return None
+        doc = int(self.doc_index[position])
+        return self.documents[doc] if doc >= 0 else None
+    
+    def location_at(self, position: int) -> np.ndarray:
+        if self.locations is None:
+            return np.full(len(self.LOCATION_FIELDS), -1, dtype=np.int64)
+        return np.asarray(self.locations[position])
+    
+    def ids_for_document(self, document_id: str) -> np.ndarray:
+        if self.doc_index is None or document_id not in self.documents:
+            return np.array([], dtype=np.int64)
+        mask = np.asarray(self.doc_index) == self.documents.index(document_id)
+        return self.chunk_ids()[mask]
+    
+    def select(self, document_ids: Optional[Sequence[str]] = None,
+               pages: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """Chunk IDs from any of ``document_ids`` whose page range overlaps ``pages``.
+        
+        Both filters are evaluated on the columns, without decoding any text.
+        Chunks with unknown pages never match a page filter.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if document_ids is not None:
+            codes = [self.documents.index(doc) for doc in document_ids if doc in self.documents]
+            if self.doc_index is None or not codes:
+                return np.array([], dtype=np.int64)
+            mask &= np.isin(np.asarray(self.doc_index), codes)
+        if pages is not None:
+            if self.locations is None:
+                return np.array([], dtype=np.int64)
+            locations = np.asarray(self.locations)
+            first, last = pages
+            mask &= (locations[:, 0] >= 0) & (locations[:, 0] <= last) & (locations[:, 1] >= first)
+        return self.chunk_ids()[mask]
+    
+    def records(self) -> Iterator[Tuple[int, str, Optional[str], np.ndarray]]:
+        ids = self.chunk_ids()
+        for position in range(len(self)):
+            yield int(ids[position]), self[position], self.document_at(position), self.location_at(position)
+    
+    def close(self) -> None:
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
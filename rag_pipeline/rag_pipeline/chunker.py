@@ -1,9 +1,126 @@
-from typing import List, Optional
+from bisect import bisect_right
+from collections import deque
+from functools import lru_cache
+import re
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 
+class TokenCounter:
+    """Length in model tokens, measured with the embedding model's own tokenizer.
+    
+    The recursive splitter measures the same pieces over and over, so single
+    counts are memoised; ``count_batch`` tokenizes a whole list in one call,
+    which fast (Rust) tokenizers spread over threads.
+    """
+    
+    def __init__(self, tokenizer, cache_size: int = 65536):
+        self.tokenizer = tokenizer
+        self._count = lru_cache(maxsize=cache_size)(self._count_uncached)
+    
+    def _count_uncached(self, text: str) -> int:
+        return len(self.tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"])
+    
+    def __call__(self, text: str) -> int:
+        return self._count(text)
+    
+    def count_batch(self, texts: Sequence[str], add_special_tokens: bool = True) -> List[int]:
+        if not texts:
+            return []
+        encoded = self.tokenizer(list(texts), add_special_tokens=add_special_tokens, verbose=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def special_tokens(self) -> int:
+        """Tokens the model adds around every sequence (e.g. [CLS] and [SEP])."""
+        return self.tokenizer.num_special_tokens_to_add(pair=False)
+
+
+class _SpanSplitter(RecursiveCharacterTextSplitter):
+    """``RecursiveCharacterTextSplitter`` that also reports where each chunk sits in the text.
+    
+    Mirrors the recursive split and merge of the library (separators kept at the
+    start of the following piece, whitespace stripped) on ``(start, end)`` spans
+    instead of strings. Merged pieces are always adjacent, so every chunk is the
+    stripped slice ``text[start:end]`` and no offset has to be searched for.
+    """
+    
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        return self._split_spans(text, 0, len(text), self._separators)
+    
+    def _span_length(self, text: str, start: int, end: int) -> int:
+        # Character lengths need no slice
+        return end - start if self._length_function is len else self._length_function(text[start:end])
+    
+    def _split_spans(self, text: str, start: int, end: int, separators: List[str]) -> List[Tuple[int, int]]:
+        piece = text[start:end]
+        separator, new_separators = separators[-1], []
+        for i, candidate in enumerate(separators):
+            if not candidate:
+                separator = candidate
+                break
+            if candidate in piece:
+                separator, new_separators = candidate, separators[i + 1:]
+                break
+        
+        if separator:
+            cuts = [start] + [start + match.start() for match in re.finditer(re.escape(separator), piece)] + [end]
+        else:
+            cuts = list(range(start, end + 1))
+        splits = [(lo, hi) for lo, hi in zip(cuts, cuts[1:]) if lo < hi]
+        
+        spans, good = [], []
+        for lo, hi in splits:
+            if self._span_length(text, lo, hi) < self._chunk_size:
+                good.append((lo, hi))
+                continue
+            if good:
+                spans.extend(self._merge_spans(text, good))
+                good = []
+            if not new_separators:
+                spans.extend(self._strip_span(text, lo, hi))
+            else:
+                spans.extend(self._split_spans(text, lo, hi, new_separators))
+        if good:
+            spans.extend(self._merge_spans(text, good))
+        return spans
+    
+    def _merge_spans(self, text: str, splits: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        # Same size and overlap accounting as _merge_splits with the empty separator
+        separator_length = self._length_function("")
+        merged = []
+        current: Deque[Tuple[int, int, int]] = deque()
+        total = 0
+        for lo, hi in splits:
+            length = self._span_length(text, lo, hi)
+            if current and total + length + separator_length > self._chunk_size:
+                merged.extend(self._strip_span(text, current[0][0], current[-1][1]))
+                while total > self._chunk_overlap or (
+                    total + length + (separator_length if current else 0) > self._chunk_size and total > 0
+                ):
+                    total -= current.popleft()[2] + (separator_length if current else 0)
+            current.append((lo, hi, length))
+            total += length + (separator_length if len(current) > 1 else 0)
+        if current:
+            merged.extend(self._strip_span(text, current[0][0], current[-1][1]))
+        return merged
+    
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        piece = text[start:end]
+        stripped = piece.lstrip()
+        start += len(piece) - len(stripped)
+        end = start + len(stripped.rstrip())
+        return [(start, end)] if start < end else []
+
+
 class TextChunker:
-    def __init__(self, chunk_size: int = 800, chunk_overlap: int = 100):
+    
+    # Only used to size stream windows, which are measured in characters
+    CHARS_PER_TOKEN = 4
+    
+    def __init__(self, chunk_size: int = 800, chunk_overlap: int = 100,
+                 length_function: Optional[Callable[[str], int]] = None):
+        """Sizes are in characters, or in the units ``length_function`` counts (e.g. a ``TokenCounter``)."""
         if chunk_size <= 0 or chunk_overlap < 0:
             raise ValueError("Invalid chunk parameters")
         if chunk_overlap >= chunk_size:
@@ -11,15 +128,25 @@ class TextChunker:
         
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.length_function = length_function or len
+        self.counts_characters = length_function is None
         
-        self.splitter = RecursiveCharacterTextSplitter(
+        self.splitter = _SpanSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             separators=["\n\n", "\n", " ", ""],
-            length_function=len,
+            length_function=self.length_function,
             is_separator_regex=False
         )
     
+    @classmethod
+    def for_tokenizer(cls, token_counter: TokenCounter, max_tokens: int,
+                      chunk_overlap: int = 32) -> "TextChunker":
+        """Chunker whose chunks fit in ``max_tokens`` model tokens including special tokens."""
+        chunk_size = max_tokens - token_counter.special_tokens()
+        return cls(chunk_size=chunk_size, chunk_overlap=min(chunk_overlap, chunk_size - 1),
+                   length_function=token_counter)
+    
     def chunk_text(self, text: str) -> List[str]:
         if not isinstance(text, str):
             raise TypeError(f"Expected str, got {type(text).__name__}")
@@ -34,13 +161,114 @@ class TextChunker:
         except Exception as e:
             raise RuntimeError(f"Chunking failed: {str(e)}")
     
-    def get_chunks_with_info(self, text: str) -> List[dict]:
-        chunks = self.chunk_text(text)
+    def chunk_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """Chunk text and return each chunk with its ``(start, end)`` offsets in ``text``."""
+        if not isinstance(text, str):
+            raise TypeError(f"Expected str, got {type(text).__name__}")
+        
+        if not text.strip():
+            return []
+        
+        try:
+            return [(start, end, text[start:end]) for start, end in self.splitter.split_spans(text)]
+        except Exception as e:
+            raise RuntimeError(f"Chunking failed: {str(e)}")
+    
+    def chunk_stream(self, texts: Iterable[str], window: Optional[int] = None) -> Iterator[str]:
+        """Chunk text that arrives in pieces (e.g. PDF pages) without holding all of it.
+        
+        Pieces are buffered until about ``window`` characters are available and
+        split; every chunk but the last is emitted and the last one is carried
+        into the next window, so chunks still span piece boundaries. Memory is
+        bounded by the window plus one piece.
+        """
+        for info in self.chunk_pages(texts, window=window):
+            yield info["text"]
+    
+    def chunk_pages(self, pages: Iterable[str], window: Optional[int] = None,
+                    document_id: Optional[str] = None) -> Iterator[Dict]:
+        """Like ``chunk_stream`` but yield chunk info with page numbers and offsets.
+        
+        Offsets are into the pages joined with newlines, the text
+        ``extract_text_from_pdf`` returns, and ``text`` is always that slice;
+        pages are numbered from 1. Chunk boundaries can differ from
+        ``chunk_text`` on the joined text, since each window is split on its own.
+        """
+        if window is None:
+            window = self.chunk_size * 8 * (1 if self.counts_characters else self.CHARS_PER_TOKEN)
+        if window < self.chunk_size:
+            raise ValueError("window must be at least chunk_size")
+        
+        page_starts: List[int] = []
+        position = 0
+        
+        # The buffer is the joined text from buffer_start on, kept as parts until it is split
+        buffer: List[str] = []
+        buffer_start = 0
+        size = 0
+        chunk_id = 0
+        for page in pages:
+            if page_starts:
+                buffer.append("\n")
+                size += 1
+            page_starts.append(position)
+            position += len(page) + 1
+            buffer.append(page)
+            size += len(page)
+            if size < window:
+                continue
+            
+            infos, carried = self._chunk_buffer("".join(buffer), buffer_start, page_starts, chunk_id, document_id)
+            yield from infos[:-1]
+            chunk_id += len(infos) - 1
+            if infos:
+                buffer_start = infos[-1]["start"]
+            else:
+                buffer_start += size
+            buffer = [carried]
+            size = len(carried)
+        
+        if buffer:
+            yield from self._chunk_buffer("".join(buffer), buffer_start, page_starts, chunk_id, document_id)[0]
+    
+    def _chunk_buffer(self, text: str, buffer_start: int, page_starts: List[int], first_id: int,
+                      document_id: Optional[str]) -> Tuple[List[Dict], str]:
+        """Chunk the buffered text; also return the text to carry into the next window.
+        
+        The carry is the raw text from the last chunk's start to the end of the
+        buffer, separators and blank pages included, so offsets stay exact.
+        """
+        spans = self.chunk_spans(text)
+        infos = [
+            self._chunk_info(first_id + idx, chunk, buffer_start + start, buffer_start + end,
+                             page_starts, document_id)
+            for idx, (start, end, chunk) in enumerate(spans)
+        ]
+        carried = text[spans[-1][0]:] if spans else ""
+        return infos, carried
+    
+    @staticmethod
+    def _chunk_info(chunk_id: int, text: str, start: int, end: int,
+                    page_starts: Optional[Sequence[int]], document_id: Optional[str]) -> Dict:
+        page_start = page_end = None
+        if page_starts:
+            page_start = bisect_right(page_starts, start)
+            page_end = bisect_right(page_starts, end - 1)
+        return {
+            "chunk_id": chunk_id,
+            "text": text,
+            "length": len(text),
+            "document_id": document_id,
+            "start": start,
+            "end": end,
+            "page_start": page_start,
+            "page_end": page_end
+        }
+    
+    def get_chunks_with_info(self, text: str, document_id: Optional[str] = None,
+                             page_starts: Optional[Sequence[int]] = None) -> List[dict]:
+        """Chunk text into dicts carrying offsets and, given page start offsets, 1-based page numbers."""
         return [
-            {
-                "chunk_id": idx,
-                "text": chunk,
-                "length": len(chunk)
-            }
-            for idx, chunk in enumerate(chunks)
+            self._chunk_info(idx, chunk, start, end, page_starts, document_id)
+            for idx, (start, end, chunk) in enumerate(self.chunk_spans(text))
         ]
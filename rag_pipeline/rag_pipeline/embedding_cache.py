@@ -0,0 +1,405 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model_name: str, text: str) -> bytes:
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Disk-backed embedding cache keyed by (model name, normalized text hash).
+    
+    Vectors live in one fixed-width memory-mapped file (``float32`` or
+    ``float16``) next to two parallel columns, also memory-mapped: the
+    SHA-256 key stored in each row and the tick it was last used. A write
+    touches only the rows it changes, so storing an embedding costs the same
+    at any cache size, and LRU order survives restarts. When ``max_entries``
+    is reached the least recently used row is overwritten in place.
+    
+    Processes may share a ``cache_dir``: writers take an exclusive lock on
+    ``write.lock`` and first pick up rows other processes changed, and a
+    lookup only returns a row whose stored key still matches. Without
+    ``fcntl`` (Windows) only one process should write a given ``cache_dir``.
+    """
+    
+    VECTORS_FILE = "vectors.bin"
+    KEYS_FILE = "keys.bin"
+    CLOCK_FILE = "clock.bin"
+    LOCK_FILE = "write.lock"
+    LEGACY_INDEX_FILE = "index.npz"
+    META_FILE = "meta.json"
+    KEY_BYTES = 32
+    DTYPES = {"float32": np.float32, "float16": np.float16}
+    
+    def __init__(self, cache_dir: str, model_name: str, dimension: int, dtype: str = "float32",
+                 max_entries: int = 1_000_000):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"dtype must be one of {sorted(self.DTYPES)}")
+        if dimension <= 0:
+            raise ValueError("dimension must be greater than 0")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+        
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.dimension = dimension
+        self.dtype = dtype
+        self.max_entries = max_entries
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        # key -> row in LRU order, and the reverse, as this process last saw them
+        self._slots: "OrderedDict[bytes, int]" = OrderedDict()
+        self._owners: Dict[int, bytes] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        self._clock: Optional[np.memmap] = None
+        self._capacity = 0
+        # Rows ever allocated, the latest tick used, and the tick up to which other writers were read
+        self._size = 0
+        self._tick = 0
+        self._synced = 0
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+    
+    def _load(self) -> None:
+        meta = {"model_name": self.model_name, "dimension": self.dimension, "dtype": self.dtype}
+        meta_file = self._path(self.META_FILE)
+        
+        if os.path.exists(meta_file):
+            with open(meta_file, 'r', encoding="utf-8") as f:
+                stored = json.load(f)
+            if {key: stored.get(key) for key in meta} != meta:
+                # A different model or layout: the old vectors are useless here
+                self.clear()
+        
+        with open(meta_file, 'w', encoding="utf-8") as f:
+            json.dump(meta, f)
+        
+        vectors_file = self._path(self.VECTORS_FILE)
+        if not os.path.exists(vectors_file):
+            return
+        self._open_vectors(os.path.getsize(vectors_file) // self._row_bytes())
+        self._migrate_legacy_index()
+        if not self._capacity:
+            return
+        
+        used = np.flatnonzero(self._keys.any(axis=1))
+        used = used[np.argsort(self._clock[used], kind="stable")]
+        for slot in used.tolist():
+            key = self._keys[slot].tobytes()
+            self._slots[key] = slot
+            self._owners[slot] = key
+        self._size = int(used.max()) + 1 if len(used) else 0
+        self._tick = self._synced = int(self._clock.max())
+    
+    def _migrate_legacy_index(self) -> None:
+        # Caches written before the key/clock columns kept them in one index.npz
+        index_file = self._path(self.LEGACY_INDEX_FILE)
+        if not os.path.exists(index_file):
+            return
+        if self._capacity and not self._keys.any():
+            with np.load(index_file, allow_pickle=False) as index:
+                order = (np.argsort(index["last_used"], kind="stable") if "last_used" in index.files
+                         else np.arange(len(index["slots"])))
+                keys, slots = index["keys"][order], index["slots"][order]
+            valid = slots < self._capacity
+            self._keys[slots[valid]] = keys[valid]
+            self._clock[slots[valid]] = np.arange(1, int(valid.sum()) + 1)
+        os.remove(index_file)
+    
+    def _row_bytes(self) -> int:
+        return self.dimension * np.dtype(self.DTYPES[self.dtype]).itemsize
+    
+    def _open_vectors(self, capacity: int) -> None:
+        self.flush()
+        self._vectors = self._keys = self._clock = None
+        
+        columns = (
+            (self.VECTORS_FILE, self.DTYPES[self.dtype], (capacity, self.dimension)),
+            (self.KEYS_FILE, np.uint8, (capacity, self.KEY_BYTES)),
+            (self.CLOCK_FILE, np.int64, (capacity,))
+        )
+        maps = []
+        for name, dtype, shape in columns:
+            path = self._path(name)
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(path, 'ab') as f:
+                # Only ever grow: another process may already have mapped a larger file
+                if os.path.getsize(path) < size:
+                    f.truncate(size)
+            maps.append(np.memmap(path, dtype=dtype, mode='r+', shape=shape) if capacity else None)
+        
+        self._capacity = capacity
+        self._vectors, self._keys, self._clock = maps
+    
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._path(self.LOCK_FILE), 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def _sync(self) -> None:
+        """Pick up rows other processes wrote since the last write (caller holds the write lock)."""
+        vectors_file = self._path(self.VECTORS_FILE)
+        capacity = os.path.getsize(vectors_file) // self._row_bytes() if os.path.exists(vectors_file) else 0
+        if capacity > self._capacity:
+            self._open_vectors(capacity)
+        if not self._capacity:
+            return
+        
+        changed = np.flatnonzero(self._clock > self._synced)
+        changed = changed[np.argsort(self._clock[changed], kind="stable")]
+        for slot in changed.tolist():
+            key = self._keys[slot].tobytes()
+            previous = self._owners.get(slot)
+            if previous is not None and previous != key and self._slots.get(previous) == slot:
+                del self._slots[previous]
+            if not any(key):
+                self._owners.pop(slot, None)
+                continue
+            self._owners[slot] = key
+            self._slots[key] = slot
+            self._slots.move_to_end(key)
+            self._size = max(self._size, slot + 1)
+        
+        # New writes must be newer than anything another process has written
+        self._tick = max(self._tick, int(self._clock.max()))
+    
+    def _allocate(self) -> int:
+        if len(self._slots) >= self.max_entries or self._size >= self.max_entries:
+            _, slot = self._slots.popitem(last=False)
+            self._owners.pop(slot, None)
+            self.evictions += 1
+            return slot
+        
+        slot = self._size
+        if slot >= self._capacity:
+            self._open_vectors(min(max(self._capacity * 2, 1024), self.max_entries))
+        self._size += 1
+        return slot
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Return the cached float32 vector for each text, or None on a miss."""
+        keys = [cache_key(self.model_name, text) for text in texts]
+        with self._lock:
+            results = []
+            for key in keys:
+                slot = self._slots.get(key)
+                vector = None
+                # Another process may have reused the row; its stored key tells
+                if slot is not None and self._keys[slot].tobytes() == key:
+                    vector = np.array(self._vectors[slot], dtype=np.float32)
+                    if self._keys[slot].tobytes() != key:
+                        vector = None
+                if vector is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self._tick += 1
+                self._clock[slot] = self._tick
+                self._slots.move_to_end(key)
+                self.hits += 1
+                results.append(vector)
+            return results
+    
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors)
+        if vectors.ndim != 2 or len(vectors) != len(texts) or vectors.shape[1] != self.dimension:
+            raise ValueError("vectors must be an (n, dimension) array matching texts")
+        
+        keys = [cache_key(self.model_name, text) for text in texts]
+        with self._write_lock():
+            self._sync()
+            for key, vector in zip(keys, vectors):
+                slot = self._slots.get(key)
+                if slot is None:
+                    slot = self._allocate()
+                # Clear the key first so readers never pair it with a half-written vector
+                self._keys[slot] = 0
+                self._vectors[slot] = vector
+                self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+                self._tick += 1
+                self._clock[slot] = self._tick
+                self._slots[key] = slot
+                self._slots.move_to_end(key)
+                self._owners[slot] = key
+            self._synced = self._tick
+    
+    def flush(self) -> None:
+        """Write mapped rows to disk; other processes see them without it."""
+        for column in (self._vectors, self._keys, self._clock):
+            if column is not None:
+                column.flush()
+    
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._vectors = self._keys = self._clock = None
+            self._capacity = 0
+    
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._slots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "dtype": self.dtype
+        }
+    
+    def clear(self) -> None:
+        self._vectors = self._keys = self._clock = None
+        self._capacity = self._size = self._tick = self._synced = 0
+        self._slots = OrderedDict()
+        self._owners = {}
+        for name in (self.VECTORS_FILE, self.KEYS_FILE, self.CLOCK_FILE, self.LEGACY_INDEX_FILE):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+
+class QueryEmbeddingCache:
+    """Bounded in-process LRU of query embeddings with an optional shared tier.
+    
+    Keys are the same ``(model, normalized text)`` hashes ``EmbeddingCache``
+    uses, so passing one as ``shared`` lets processes that share a cache
+    directory reuse each other's query vectors. Local misses fall through to
+    the shared tier and are promoted into the LRU on a hit there. One cache
+    can serve several models by passing ``model_name`` per call; the shared
+    tier is only used for the model it was built for.
+    
+    New query vectors are written to the shared tier ``shared_batch_size`` at
+    a time (and on ``flush``), keeping disk writes off the per-query path.
+    """
+    
+    def __init__(self, model_name: Optional[str] = None, max_entries: int = 1024,
+                 shared: Optional[EmbeddingCache] = None, shared_batch_size: int = 32):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+        if shared_batch_size <= 0:
+            raise ValueError("shared_batch_size must be greater than 0")
+        
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.shared = shared
+        self.shared_batch_size = shared_batch_size
+        
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        # Query vectors not yet written to the shared tier
+        self._pending: Dict[str, np.ndarray] = {}
+    
+    def _shared_for(self, model_name: str) -> Optional[EmbeddingCache]:
+        shared = self.shared
+        return shared if shared is not None and shared.model_name == model_name else None
+    
+    def get(self, query: str, model_name: Optional[str] = None) -> Optional[np.ndarray]:
+        model_name = model_name or self.model_name
+        key = cache_key(model_name, query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+        
+        shared = self._shared_for(model_name)
+        vector = shared.get_many([query])[0] if shared is not None else None
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._store(key, vector)
+            return vector
+    
+    def put(self, query: str, vector: np.ndarray, model_name: Optional[str] = None) -> None:
+        model_name = model_name or self.model_name
+        vector = np.asarray(vector, dtype=np.float32)
+        shared = self._shared_for(model_name)
+        with self._lock:
+            self._store(cache_key(model_name, query), vector)
+            if shared is None:
+                return
+            self._pending[query] = vector
+            if len(self._pending) < self.shared_batch_size:
+                return
+            pending, self._pending = self._pending, {}
+        shared.put_many(list(pending), np.stack(list(pending.values())))
+    
+    def flush(self) -> None:
+        """Write pending query vectors to the shared tier."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending and self.shared is not None:
+            self.shared.put_many(list(pending), np.stack(list(pending.values())))
+    
+    def _store(self, key: bytes, vector: np.ndarray) -> None:
+        # Cached arrays are handed to every caller, so they must not be mutated
+        vector.setflags(write=False)
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "pending_shared": len(self._pending),
+            "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0
+        }
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
@@ -1,13 +1,16 @@
-from typing import List
+from typing import Dict, List, Optional
 import numpy as np
 from sentence_transformers import SentenceTransformer
+from rag_pipeline.chunker import TokenCounter
+from rag_pipeline.embedding_cache import EmbeddingCache
 
 
 class EmbeddingModel:
     
     DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
     
-    def __init__(self, model_name: str = DEFAULT_MODEL, device: str = "cpu"):
+    def __init__(self, model_name: str = DEFAULT_MODEL, device: str = "cpu", cache_dir: Optional[str] = None,
+                 cache_dtype: str = "float32", cache_max_entries: int = 1_000_000):
         if not model_name:
             raise ValueError("model_name cannot be empty")
         
@@ -19,6 +22,19 @@ class EmbeddingModel:
             self.embedding_dim = self.model.get_sentence_embedding_dimension()
         except Exception as e:
             raise RuntimeError(f"Failed to load model: {str(e)}")
+        
+        # Inputs longer than max_seq_length tokens are silently truncated by the model
+        self.max_seq_length = getattr(self.model, "max_seq_length", None)
+        tokenizer = getattr(self.model, "tokenizer", None)
+        self.token_counter = TokenCounter(tokenizer) if tokenizer is not None else None
+        self._truncation = {"chunks": 0, "truncated": 0}
+        
+        self.cache = None
+        if cache_dir:
+            self.cache = EmbeddingCache(
+                cache_dir, model_name=model_name, dimension=self.embedding_dim,
+                dtype=cache_dtype, max_entries=cache_max_entries
+            )
     
     def encode_single(self, text: str) -> np.ndarray:
         if not isinstance(text, str) or not text.strip():
@@ -38,18 +54,63 @@ class EmbeddingModel:
             raise ValueError("No valid texts to encode")
         
         try:
-            embeddings = self.model.encode(
-                valid_texts,
-                batch_size=batch_size,
-                convert_to_numpy=True,
-                show_progress_bar=False
-            )
-            return embeddings
+            if self.cache is None:
+                return self._encode(valid_texts, batch_size)
+            
+            cached = self.cache.get_many(valid_texts)
+            missing = [i for i, vector in enumerate(cached) if vector is None]
+            if missing:
+                # Only texts the cache has never seen go through the transformer
+                fresh = self._encode([valid_texts[i] for i in missing], batch_size)
+                self.cache.put_many([valid_texts[i] for i in missing], fresh)
+                for i, vector in zip(missing, fresh):
+                    cached[i] = vector
+            return np.stack(cached).astype(np.float32, copy=False)
         except Exception as e:
             raise RuntimeError(f"Failed to encode batch: {str(e)}")
     
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+    
+    def truncation_stats(self, texts: List[str]) -> Optional[Dict]:
+        """Count texts longer than the model's max sequence length, with one batched tokenizer call."""
+        if self.token_counter is None or not self.max_seq_length:
+            return None
+        
+        counts = self.token_counter.count_batch(texts)
+        truncated = sum(count > self.max_seq_length for count in counts)
+        self._truncation["chunks"] += len(counts)
+        self._truncation["truncated"] += truncated
+        return {
+            "chunk_count": len(counts),
+            "truncated_chunks": truncated,
+            "truncated_pct": round(100 * truncated / len(counts), 2) if counts else 0.0,
+            "max_tokens": max(counts, default=0),
+            "max_seq_length": self.max_seq_length
+        }
+    
+    def get_truncation_stats(self) -> Optional[Dict]:
+        """Truncation totals over every text measured by ``truncation_stats``."""
+        if self.token_counter is None or not self.max_seq_length:
+            return None
+        chunks, truncated = self._truncation["chunks"], self._truncation["truncated"]
+        return {
+            "chunk_count": chunks,
+            "truncated_chunks": truncated,
+            "truncated_pct": round(100 * truncated / chunks, 2) if chunks else 0.0,
+            "max_seq_length": self.max_seq_length
+        }
+    
     def get_query_embedding(self, query: str) -> np.ndarray:
         return self.encode_single(query)
     
     def get_embeddings_dimension(self) -> int:
         return self.embedding_dim
+    
+    def get_cache_stats(self) -> Optional[Dict]:
+        return self.cache.get_stats() if self.cache is not None else None
@@ -0,0 +1,98 @@
+import tempfile
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from rag_pipeline.vector_store import FAISSVectorStore
+
+
+DEFAULT_TIERS = [
+    {"index_type": "flat"},
+    {"index_type": "ivf_flat", "nprobe": 1},
+    {"index_type": "ivf_flat", "nprobe": 8},
+    {"index_type": "ivf_flat", "nprobe": 32},
+    {"index_type": "ivf_pq", "nprobe": 8},
+    {"index_type": "ivf_pq", "nprobe": 32},
+    {"index_type": "hnsw", "ef_search": 16},
+    {"index_type": "hnsw", "ef_search": 64},
+    {"index_type": "hnsw", "ef_search": 128},
+]
+
+
+def evaluate_index_tiers(embeddings: np.ndarray, queries: np.ndarray, k: int = 10,
+                         tiers: Optional[List[Dict]] = None) -> List[Dict]:
+    """Measure recall@k against exact search and per-query latency for each index tier.
+    
+    Each tier is a dict of FAISSVectorStore keyword arguments; ``nprobe`` and
+    ``ef_search`` are applied at search time so one build serves several rows.
+    """
+    if not isinstance(embeddings, np.ndarray) or embeddings.ndim != 2 or len(embeddings) == 0:
+        raise ValueError("embeddings must be a non-empty 2D array")
+    if not isinstance(queries, np.ndarray) or queries.ndim != 2 or len(queries) == 0:
+        raise ValueError("queries must be a non-empty 2D array")
+    if k <= 0:
+        raise ValueError("k must be greater than 0")
+    
+    embeddings = embeddings.astype(np.float32, copy=False)
+    queries = queries.astype(np.float32, copy=False)
+    k = min(k, len(embeddings))
+    tiers = tiers or DEFAULT_TIERS
+    
+    # Stores are only searched in memory, but FAISSVectorStore insists on an index directory
+    with tempfile.TemporaryDirectory(prefix="faiss_tiers_") as workdir:
+        return _evaluate(embeddings, queries, k, tiers, workdir)
+
+
+def _evaluate(embeddings: np.ndarray, queries: np.ndarray, k: int, tiers: List[Dict],
+              workdir: str) -> List[Dict]:
+    _, ground_truth = _build_store({"index_type": "flat"}, embeddings, workdir).search_ids(queries, k=k)
+    
+    report = []
+    built = {}
+    for tier in tiers:
+        build_params = {key: value for key, value in tier.items() if key not in ("nprobe", "ef_search")}
+        build_key = tuple(sorted(build_params.items()))
+        
+        if build_key not in built:
+            start = time.perf_counter()
+            store = _build_store(build_params, embeddings, workdir)
+            built[build_key] = (store, time.perf_counter() - start)
+        store, build_seconds = built[build_key]
+        
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, ground_truth):
+            start = time.perf_counter()
+            _, ids = store.search_ids(query, k=k, nprobe=tier.get("nprobe"), ef_search=tier.get("ef_search"))
+            latencies.append(time.perf_counter() - start)
+            hits += len(set(ids[0].tolist()) & set(expected.tolist()))
+        
+        latencies_ms = np.array(latencies) * 1000
+        report.append({
+            "tier": tier,
+            "index_type": store.get_index_type(),
+            "recall_at_k": hits / (len(queries) * k),
+            "mean_latency_ms": float(latencies_ms.mean()),
+            "p99_latency_ms": float(np.percentile(latencies_ms, 99)),
+            "build_seconds": build_seconds
+        })
+    
+    return report
+
+
+def format_index_report(report: List[Dict]) -> str:
+    lines = [f"{'tier':<40} {'built as':<10} {'recall@k':>9} {'mean ms':>9} {'p99 ms':>9} {'build s':>9}"]
+    for row in report:
+        tier = ", ".join(f"{key}={value}" for key, value in row["tier"].items())
+        lines.append(
+            f"{tier:<40} {row['index_type']:<10} {row['recall_at_k']:>9.3f} "
+            f"{row['mean_latency_ms']:>9.3f} {row['p99_latency_ms']:>9.3f} {row['build_seconds']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _build_store(params: Dict, embeddings: np.ndarray, workdir: str) -> FAISSVectorStore:
+    store = FAISSVectorStore(index_path=workdir, **params)
+    store.embedding_dimension = embeddings.shape[1]
+    store.index = store.build_index(embeddings)
+    store.index.add(embeddings)
+    return store
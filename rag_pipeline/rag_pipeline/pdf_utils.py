@@ -1,20 +1,44 @@
+import io
 import PyPDF2
-from typing import List
+from typing import BinaryIO, Iterator
+
+
+def _iter_reader_pages(file: BinaryIO) -> Iterator[str]:
+    reader = PyPDF2.PdfReader(file)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[str]:
+    """Yield the text of each page of a PDF file, one page at a time"""
+    try:
+        with open(pdf_path, 'rb') as file:
+            yield from _iter_reader_pages(file)
+    except Exception as e:
+        raise RuntimeError(f"Failed to extract text from PDF: {str(e)}")
+
+
+def iter_pdf_pages_from_bytes(pdf_bytes: bytes) -> Iterator[str]:
+    """Yield the text of each page of an in-memory PDF"""
+    try:
+        yield from _iter_reader_pages(io.BytesIO(pdf_bytes))
+    except Exception as e:
+        raise RuntimeError(f"Failed to extract text: {str(e)}")
+
+
+def _join_pages(pages: Iterator[str]) -> str:
+    # Join once instead of growing a string page by page
+    text = "\n".join(pages)
+    if not text.strip():
+        raise ValueError("No text found in PDF")
+    return text.strip()
 
 
 def extract_text_from_pdf(pdf_path: str) -> str:
     """Extract text from PDF file"""
     try:
-        text = ""
         with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        
-        if not text.strip():
-            raise ValueError("No text found in PDF")
-        
-        return text.strip()
+            return _join_pages(_iter_reader_pages(file))
     except Exception as e:
         raise RuntimeError(f"Failed to extract text from PDF: {str(e)}")
 
@@ -22,17 +46,6 @@ def extract_text_from_pdf(pdf_path: str) -> str:
 def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
     """Extract text from PDF bytes"""
     try:
-        import io
-        file = io.BytesIO(pdf_bytes)
-        reader = PyPDF2.PdfReader(file)
-        
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        
-        if not text.strip():
-            raise ValueError("No text found in PDF")
-        
-        return text.strip()
+        return _join_pages(_iter_reader_pages(io.BytesIO(pdf_bytes)))
     except Exception as e:
         raise RuntimeError(f"Failed to extract text: {str(e)}")
@@ -1,50 +1,209 @@
 import os
-from typing import Dict, Optional
+import time
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
 from rag_pipeline.chunker import TextChunker
 from rag_pipeline.embeddings import EmbeddingModel
+from rag_pipeline.embedding_cache import QueryEmbeddingCache
 from rag_pipeline.vector_store import FAISSVectorStore
 from rag_pipeline.retriever import Retriever
 
 
+def _chunk_locations(infos: List[Dict]) -> List[tuple]:
+    return [(info["page_start"], info["page_end"], info["start"], info["end"]) for info in infos]
+
+
 class RAGSystem:
+    
+    CHUNK_UNITS = ("chars", "tokens")
+    
     def __init__(self, chunk_size: int = 800, chunk_overlap: int = 100, 
                  embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
-                 device: str = "cpu", index_path: str = "faiss_index", retrieval_k: int = 5):
+                 device: str = "cpu", index_path: str = "faiss_index", retrieval_k: int = 5,
+                 use_mmap: bool = False, index_type: str = "flat", nprobe: int = 16, ef_search: int = 64,
+                 index_params: Optional[Dict] = None, compact_after_segments: int = 32,
+                 embedding_cache_dir: Optional[str] = None, embedding_cache_dtype: str = "float32",
+                 query_cache_size: int = 1024, chunk_unit: str = "chars"):
+        
+        if chunk_unit not in self.CHUNK_UNITS:
+            raise ValueError(f"Unsupported chunk_unit '{chunk_unit}'. Supported: {', '.join(self.CHUNK_UNITS)}")
         
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.chunk_unit = chunk_unit
         self.index_path = index_path
         self.retrieval_k = retrieval_k
         self.is_built = False
         
-        self.chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        self.embedding_model = EmbeddingModel(model_name=embedding_model, device=device)
-        self.vector_store = FAISSVectorStore(index_path=index_path)
-        self.retriever = Retriever(vector_store=self.vector_store, embedding_model=self.embedding_model, k=retrieval_k)
+        self.embedding_model = EmbeddingModel(
+            model_name=embedding_model, device=device,
+            cache_dir=embedding_cache_dir, cache_dtype=embedding_cache_dtype
+        )
+        self.chunker = self._make_chunker(chunk_size, chunk_overlap, chunk_unit)
+        self.chunk_size, self.chunk_overlap = self.chunker.chunk_size, self.chunker.chunk_overlap
+        self.vector_store = FAISSVectorStore(
+            index_path=index_path, use_mmap=use_mmap, index_type=index_type,
+            nprobe=nprobe, ef_search=ef_search, compact_after_segments=compact_after_segments,
+            **(index_params or {})
+        )
+        self.query_cache = None
+        if query_cache_size > 0:
+            self.query_cache = QueryEmbeddingCache(
+                embedding_model, max_entries=query_cache_size, shared=self.embedding_model.cache
+            )
+        self.retriever = Retriever(
+            vector_store=self.vector_store, embedding_model=self.embedding_model, k=retrieval_k,
+            query_cache=self.query_cache
+        )
+    
+    def _make_chunker(self, chunk_size: int, chunk_overlap: int, chunk_unit: str) -> TextChunker:
+        if chunk_unit == "chars":
+            return TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        
+        # Token chunks are capped at what the model embeds; longer ones would be truncated
+        token_counter = self.embedding_model.token_counter
+        if token_counter is None or not self.embedding_model.max_seq_length:
+            raise ValueError("chunk_unit='tokens' requires an embedding model with a tokenizer")
+        max_tokens = min(chunk_size + token_counter.special_tokens(), self.embedding_model.max_seq_length)
+        return TextChunker.for_tokenizer(token_counter, max_tokens, chunk_overlap=chunk_overlap)
     
     def build_from_text(self, text: str) -> Dict:
         if not text or not isinstance(text, str) or not text.strip():
             raise ValueError("Text cannot be empty")
         
         try:
-            chunks = self.chunker.chunk_text(text)
-            if not chunks:
+            infos = self.chunker.get_chunks_with_info(text)
+            if not infos:
                 raise ValueError("No chunks generated")
             
+            chunks = [info["text"] for info in infos]
             embeddings = self.embedding_model.encode_batch(chunks)
-            self.vector_store.create_index(embeddings, chunks)
+            self.vector_store.create_index(embeddings, chunks, locations=_chunk_locations(infos))
             self.is_built = True
             
             return {
                 "status": "success",
                 "chunk_count": len(chunks),
                 "embedding_dimension": self.embedding_model.get_embeddings_dimension(),
-                "text_length": len(text)
+                "text_length": len(text),
+                "index_type": self.vector_store.get_index_type(),
+                "truncation": self.embedding_model.truncation_stats(chunks)
             }
         except Exception as e:
             self.is_built = False
             raise RuntimeError(f"Build failed: {str(e)}")
     
+    def _chunk_and_embed(self, text: str, document_id: Optional[str] = None):
+        if not text or not isinstance(text, str) or not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        infos = self.chunker.get_chunks_with_info(text, document_id=document_id)
+        if not infos:
+            raise ValueError("No chunks generated")
+        chunks = [info["text"] for info in infos]
+        return chunks, self.embedding_model.encode_batch(chunks), _chunk_locations(infos)
+    
+    def add_document(self, text: str, document_id: str) -> Dict:
+        return self.upsert_document(text, document_id, replace=False)
+    
+    def upsert_document(self, text: str, document_id: str, replace: bool = True) -> Dict:
+        if not document_id or not isinstance(document_id, str):
+            raise ValueError("document_id must be a non-empty string")
+        
+        chunks, embeddings, locations = self._chunk_and_embed(text, document_id)
+        try:
+            if replace:
+                chunk_ids = self.vector_store.upsert(document_id, embeddings, chunks, locations=locations)
+            else:
+                chunk_ids = self.vector_store.add_documents(document_id, embeddings, chunks, locations=locations)
+            self.is_built = True
+            
+            return {
+                "status": "success",
+                "document_id": document_id,
+                "chunk_count": len(chunks),
+                "chunk_ids": chunk_ids,
+                "vector_count": self.vector_store.get_vector_count(),
+                "truncation": self.embedding_model.truncation_stats(chunks)
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to index document: {str(e)}")
+    
+    def ingest_pages(self, pages: Iterable[str], document_id: str, replace: bool = True,
+                     batch_size: int = 256) -> Dict:
+        """Chunk, embed and index a document as its pages arrive.
+        
+        Chunks are embedded and appended in batches of ``batch_size``, so a very
+        long PDF is indexed in bounded memory and its first batches are
+        searchable before the last page has been parsed. With ``replace`` the
+        document's previous chunks are removed before the first batch is added.
+        Each chunk is stored with its page range and offsets, so answers can be
+        cited and searches filtered by page.
+        """
+        if not document_id or not isinstance(document_id, str):
+            raise ValueError("document_id must be a non-empty string")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0")
+        
+        try:
+            if replace and self.vector_store.index is not None:
+                self.vector_store.remove_document(document_id)
+            
+            chunks = self.chunker.chunk_pages(pages, document_id=document_id)
+            chunk_ids: List[int] = []
+            text_length = 0
+            truncated, max_tokens = 0, 0
+            # One segment per batch; compacting mid-document would rewrite the snapshot repeatedly
+            with self.vector_store.deferred_compaction():
+                while True:
+                    infos = list(islice(chunks, batch_size))
+                    if not infos:
+                        break
+                    batch = [info["text"] for info in infos]
+                    embeddings = self.embedding_model.encode_batch(batch)
+                    chunk_ids.extend(self.vector_store.add_documents(
+                        document_id, embeddings, batch, locations=_chunk_locations(infos)
+                    ))
+                    text_length += sum(len(chunk) for chunk in batch)
+                    self.is_built = True
+                    
+                    stats = self.embedding_model.truncation_stats(batch)
+                    if stats:
+                        truncated += stats["truncated_chunks"]
+                        max_tokens = max(max_tokens, stats["max_tokens"])
+            
+            if not chunk_ids:
+                raise ValueError("No chunks generated")
+            
+            return {
+                "status": "success",
+                "document_id": document_id,
+                "chunk_count": len(chunk_ids),
+                "chunk_ids": chunk_ids,
+                "chunked_text_length": text_length,
+                "vector_count": self.vector_store.get_vector_count(),
+                "truncation": self._truncation_report(len(chunk_ids), truncated, max_tokens)
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to index document: {str(e)}")
+    
+    def _truncation_report(self, chunk_count: int, truncated: int, max_tokens: int) -> Optional[Dict]:
+        if self.embedding_model.get_truncation_stats() is None:
+            return None
+        return {
+            "chunk_count": chunk_count,
+            "truncated_chunks": truncated,
+            "truncated_pct": round(100 * truncated / chunk_count, 2) if chunk_count else 0.0,
+            "max_tokens": max_tokens,
+            "max_seq_length": self.embedding_model.max_seq_length
+        }
+    
+    def remove_document(self, document_id: str) -> int:
+        return self.vector_store.remove_document(document_id)
+    
+    def compact_index(self) -> None:
+        self.vector_store.compact()
+    
     def load_existing(self) -> bool:
         try:
             success = self.vector_store.load_index()
@@ -54,7 +213,12 @@ class RAGSystem:
         except Exception:
             return False
     
-    def query(self, question: str, k: Optional[int] = None) -> Dict:
+    @staticmethod
+    def _citations(results: List[dict]) -> List[str]:
+        return list(dict.fromkeys(result["citation"] for result in results if result.get("citation")))
+    
+    def query(self, question: str, k: Optional[int] = None, nprobe: Optional[int] = None,
+              ef_search: Optional[int] = None, document_ids=None, pages=None) -> Dict:
         if not self.is_built:
             raise RuntimeError("RAG system not built. Call build_from_text() first.")
         
@@ -63,15 +227,30 @@ class RAGSystem:
         
         try:
             search_k = k if k is not None else self.retrieval_k
-            results = self.retriever.retrieve(question, k=search_k)
-            context = self.retriever.build_context(question, k=search_k)
+            
+            # Embed and search once; the context is assembled from the same hits
+            start = time.perf_counter()
+            query_embedding = self.retriever.embed_query(question)
+            embedded = time.perf_counter()
+            results = self.retriever.search_embedding(query_embedding, k=search_k, nprobe=nprobe, ef_search=ef_search,
+                                                      document_ids=document_ids, pages=pages)
+            searched = time.perf_counter()
+            context = self.retriever.format_context(results)
+            assembled = time.perf_counter()
             
             return {
                 "status": "success",
                 "question": question,
                 "context": context,
                 "source_documents": results,
-                "retrieval_count": len(results)
+                "citations": self._citations(results),
+                "retrieval_count": len(results),
+                "timings": {
+                    "embed_ms": (embedded - start) * 1000,
+                    "search_ms": (searched - embedded) * 1000,
+                    "assemble_ms": (assembled - searched) * 1000,
+                    "total_ms": (assembled - start) * 1000
+                }
             }
         except Exception as e:
             return {
@@ -79,19 +258,54 @@ class RAGSystem:
                 "question": question,
                 "context": "",
                 "source_documents": [],
+                "citations": [],
                 "retrieval_count": 0,
                 "error": str(e)
             }
     
+    def query_batch(self, questions: List[str], k: Optional[int] = None, nprobe: Optional[int] = None,
+                    ef_search: Optional[int] = None, document_ids=None, pages=None) -> List[Dict]:
+        if not self.is_built:
+            raise RuntimeError("RAG system not built. Call build_from_text() first.")
+        
+        search_k = k if k is not None else self.retrieval_k
+        batch_results = self.retriever.retrieve_batch(questions, k=search_k, nprobe=nprobe, ef_search=ef_search,
+                                                      document_ids=document_ids, pages=pages)
+        
+        return [
+            {
+                "status": "success",
+                "question": question,
+                "context": self.retriever.format_context(results),
+                "source_documents": results,
+                "citations": self._citations(results),
+                "retrieval_count": len(results)
+            }
+            for question, results in zip(questions, batch_results)
+        ]
+    
     def reset(self) -> None:
         try:
             for file in os.listdir(self.index_path):
                 file_path = os.path.join(self.index_path, file)
                 if os.path.isfile(file_path):
                     os.remove(file_path)
+            self.vector_store.segments.clear()
             self.is_built = False
         except Exception as e:
             raise RuntimeError(f"Reset failed: {str(e)}")
     
     def get_vector_count(self) -> int:
         return self.vector_store.get_vector_count()
+    
+    def get_index_info(self) -> Dict:
+        return self.vector_store.get_index_info()
+    
+    def get_truncation_stats(self) -> Optional[Dict]:
+        return self.embedding_model.get_truncation_stats()
+    
+    def get_cache_stats(self) -> Dict:
+        return {
+            "query_cache": self.query_cache.get_stats() if self.query_cache is not None else None,
+            "embedding_cache": self.embedding_model.get_cache_stats()
+        }
@@ -6,7 +6,7 @@ class Retriever:
     
     DEFAULT_K = 5
     
-    def __init__(self, vector_store, embedding_model, k: int = DEFAULT_K):
+    def __init__(self, vector_store, embedding_model, k: int = DEFAULT_K, query_cache=None):
         if vector_store is None or embedding_model is None:
             raise ValueError("vector_store and embedding_model required")
         if k <= 0:
@@ -15,35 +15,123 @@ class Retriever:
         self.vector_store = vector_store
         self.embedding_model = embedding_model
         self.k = k
+        self.query_cache = query_cache
     
-    def retrieve(self, query: str, k: Optional[int] = None) -> List[dict]:
-        if not query or not isinstance(query, str) or not query.strip():
-            raise ValueError("Query must be a non-empty string")
+    def embed_query(self, query: str) -> np.ndarray:
+        if self.query_cache is None:
+            return self.embedding_model.get_query_embedding(query)
+        
+        query_embedding = self.query_cache.get(query)
+        if query_embedding is None:
+            query_embedding = self.embedding_model.get_query_embedding(query)
+            self.query_cache.put(query, query_embedding)
+        return query_embedding
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        if self.query_cache is None:
+            return self.embedding_model.encode_batch(queries)
         
+        embeddings = [self.query_cache.get(query) for query in queries]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            fresh = self.embedding_model.encode_batch([queries[i] for i in missing])
+            for i, embedding in zip(missing, fresh):
+                self.query_cache.put(queries[i], embedding)
+                embeddings[i] = embedding
+        return np.stack(embeddings)
+    
+    def _resolve_k(self, k: Optional[int]) -> int:
         search_k = k if k is not None else self.k
         if search_k <= 0:
             raise ValueError("k must be greater than 0")
+        return search_k
+    
+    def _format_results(self, distances: List[float], chunk_ids: List[int], texts: List[str]) -> List[dict]:
+        results = []
+        for rank, (distance, chunk_id, text) in enumerate(zip(distances, chunk_ids, texts), 1):
+            similarity_score = 1 / (1 + distance)
+            result = {
+                'text': text,
+                'score': float(similarity_score),
+                'distance': float(distance),
+                'rank': rank
+            }
+            metadata = self.vector_store.get_chunk_metadata(chunk_id)
+            if metadata:
+                result.update(metadata)
+                result['citation'] = self.format_citation(metadata)
+            results.append(result)
+        return results
+    
+    @staticmethod
+    def format_citation(metadata: dict) -> Optional[str]:
+        """Cite a chunk as "document, p. 3" or "document, pp. 3-4" from its stored metadata."""
+        page_start, page_end = metadata.get('page_start'), metadata.get('page_end')
+        pages = None
+        if page_start is not None:
+            pages = f"p. {page_start}" if page_end in (None, page_start) else f"pp. {page_start}-{page_end}"
+        parts = [part for part in (metadata.get('document_id'), pages) if part]
+        return ", ".join(parts) or None
+    
+    def retrieve(self, query: str, k: Optional[int] = None, nprobe: Optional[int] = None,
+                 ef_search: Optional[int] = None, document_ids=None, pages=None) -> List[dict]:
+        if not query or not isinstance(query, str) or not query.strip():
+            raise ValueError("Query must be a non-empty string")
+        
+        search_k = self._resolve_k(k)
         
         try:
-            query_embedding = self.embedding_model.get_query_embedding(query)
-            distances, texts = self.vector_store.search(query_embedding, k=search_k)
-            
-            results = []
-            for rank, (distance, text) in enumerate(zip(distances, texts), 1):
-                similarity_score = 1 / (1 + distance)
-                results.append({
-                    'text': text,
-                    'score': float(similarity_score),
-                    'distance': float(distance),
-                    'rank': rank
-                })
-            
-            return results
+            query_embedding = self.embed_query(query)
+            return self.search_embedding(query_embedding, k=search_k, nprobe=nprobe, ef_search=ef_search,
+                                         document_ids=document_ids, pages=pages)
         except Exception as e:
             raise RuntimeError(f"Retrieval failed: {str(e)}")
     
-    def build_context(self, query: str, k: Optional[int] = None, separator: str = "\n\n---\n\n") -> str:
-        results = self.retrieve(query, k=k)
+    def search_embedding(self, query_embedding: np.ndarray, k: Optional[int] = None,
+                         nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                         document_ids=None, pages=None) -> List[dict]:
+        """Search with an already computed query embedding, skipping the model call.
+        
+        ``document_ids`` and ``pages`` restrict the search to those documents and
+        that inclusive page range; the filter is applied inside the index.
+        """
+        if query_embedding.ndim == 1:
+            query_embedding = query_embedding.reshape(1, -1)
+        distances, chunk_ids, texts = self.vector_store.search_chunks(
+            query_embedding[:1], k=self._resolve_k(k), nprobe=nprobe, ef_search=ef_search,
+            document_ids=document_ids, pages=pages
+        )[0]
+        return self._format_results(distances, chunk_ids, texts)
+    
+    def retrieve_batch(self, queries: List[str], k: Optional[int] = None, nprobe: Optional[int] = None,
+                       ef_search: Optional[int] = None, document_ids=None, pages=None) -> List[List[dict]]:
+        """Embed all queries in one forward pass and search them with one FAISS call."""
+        if not isinstance(queries, list) or not queries:
+            raise ValueError("Queries must be a non-empty list")
+        if any(not isinstance(query, str) or not query.strip() for query in queries):
+            raise ValueError("Every query must be a non-empty string")
+        
+        search_k = self._resolve_k(k)
+        
+        try:
+            query_embeddings = self._embed_queries(queries)
+            hits = self.vector_store.search_chunks(
+                query_embeddings, k=search_k, nprobe=nprobe, ef_search=ef_search,
+                document_ids=document_ids, pages=pages
+            )
+            return [self._format_results(distances, chunk_ids, texts) for distances, chunk_ids, texts in hits]
+        except Exception as e:
+            raise RuntimeError(f"Batch retrieval failed: {str(e)}")
+    
+    def build_context(self, query: str, k: Optional[int] = None, separator: str = "\n\n---\n\n",
+                      nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                      document_ids=None, pages=None) -> str:
+        results = self.retrieve(query, k=k, nprobe=nprobe, ef_search=ef_search,
+                                document_ids=document_ids, pages=pages)
+        return self.format_context(results, separator=separator)
+    
+    @staticmethod
+    def format_context(results: List[dict], separator: str = "\n\n---\n\n") -> str:
         if not results:
             return ""
         context_parts = [result['text'] for result in results]
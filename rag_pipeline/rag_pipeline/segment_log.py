@@ -0,0 +1,78 @@
+import os
+import glob
+from typing import Dict, Iterator, List, Optional, Sequence
+import numpy as np
+from rag_pipeline.chunk_store import ChunkTextStore
+
+
+class SegmentLog:
+    """Append-only delta segments recorded between full index snapshots.
+    
+    Each ``add_documents``/``remove_document``/``upsert`` call writes one small
+    ``.npz`` file holding only the chunks it touched, so persisting a change
+    costs time proportional to that change rather than to the corpus.
+    Segments are replayed in order on load and dropped by compaction.
+    """
+    
+    DIRECTORY = "segments"
+    PATTERN = "segment_*.npz"
+    
+    def __init__(self, index_path: str):
+        self.directory = os.path.join(index_path, self.DIRECTORY)
+    
+    def _paths(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, self.PATTERN)))
+    
+    def count(self) -> int:
+        return len(self._paths())
+    
+    def append(self, document_id: str, ids: Optional[np.ndarray] = None,
+               embeddings: Optional[np.ndarray] = None, texts: Sequence[str] = (),
+               removed_ids: Sequence[int] = (), locations: Optional[np.ndarray] = None) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        
+        encoded = [text.encode("utf-8") for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        if encoded:
+            offsets[1:] = np.cumsum([len(text) for text in encoded])
+        
+        paths = self._paths()
+        sequence = int(os.path.basename(paths[-1])[8:-4]) + 1 if paths else 1
+        path = os.path.join(self.directory, f"segment_{sequence:08d}.npz")
+        
+        with open(path + ".tmp", 'wb') as f:
+            np.savez(
+                f,
+                document_id=np.array(document_id),
+                ids=np.asarray(ids if ids is not None else [], dtype=np.int64),
+                embeddings=np.asarray(embeddings if embeddings is not None else np.empty((0, 0)), dtype=np.float32),
+                text_blob=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+                text_offsets=offsets,
+                removed_ids=np.asarray(list(removed_ids), dtype=np.int64),
+                locations=ChunkTextStore.as_locations(locations, count=len(encoded))
+            )
+        os.replace(path + ".tmp", path)
+        return path
+    
+    def replay(self) -> Iterator[Dict]:
+        for path in self._paths():
+            with np.load(path, allow_pickle=False) as segment:
+                blob = segment["text_blob"].tobytes()
+                offsets = segment["text_offsets"]
+                # Segments written before chunk locations were tracked have none
+                locations = segment["locations"] if "locations" in segment.files else None
+                yield {
+                    "document_id": str(segment["document_id"]),
+                    "ids": segment["ids"],
+                    "embeddings": segment["embeddings"],
+                    "texts": [
+                        blob[int(offsets[i]):int(offsets[i + 1])].decode("utf-8")
+                        for i in range(len(offsets) - 1)
+                    ],
+                    "removed_ids": segment["removed_ids"],
+                    "locations": ChunkTextStore.as_locations(locations, count=len(offsets) - 1)
+                }
+    
+    def clear(self) -> None:
+        for path in self._paths():
+            os.remove(path)
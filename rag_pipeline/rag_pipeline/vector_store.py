@@ -1,22 +1,72 @@
 import os
 import numpy as np
 import pickle
-from typing import List, Tuple, Optional
+from contextlib import contextmanager
+from typing import List, Tuple, Optional, Dict, Iterator, Sequence, Union
 import faiss
+from rag_pipeline.chunk_store import ChunkTextStore
+from rag_pipeline.segment_log import SegmentLog
 
 
 class FAISSVectorStore:
     
-    def __init__(self, index_path: str = "faiss_index"):
+    INDEX_FILE = "faiss.index"
+    LEGACY_METADATA_FILE = "metadata.pkl"
+    INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+    
+    # FAISS warns below ~39 training points per IVF centroid
+    MIN_POINTS_PER_CENTROID = 39
+    
+    # Filters leaving at most this many chunks are searched exhaustively; approximate
+    # indexes would only see the few allowed vectors their probes happen to reach
+    EXACT_FILTER_MAX = 4096
+    
+    def __init__(self, index_path: str = "faiss_index", use_mmap: bool = False,
+                 index_type: str = "flat", nlist: int = 1024, pq_m: int = 16, pq_nbits: int = 8,
+                 hnsw_m: int = 32, ef_construction: int = 200, nprobe: int = 16,
+                 ef_search: int = 64, train_sample_size: int = 100_000, compact_after_segments: int = 32):
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {', '.join(self.INDEX_TYPES)}")
+        if nlist <= 0 or pq_m <= 0 or pq_nbits <= 0 or hnsw_m <= 0:
+            raise ValueError("Index parameters must be greater than 0")
+        if nprobe <= 0 or ef_search <= 0 or ef_construction <= 0 or train_sample_size <= 0:
+            raise ValueError("Search and training parameters must be greater than 0")
+        if compact_after_segments <= 0:
+            raise ValueError("compact_after_segments must be greater than 0")
+        
         self.index_path = index_path
+        self.use_mmap = use_mmap
+        self.index_type = index_type
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.train_sample_size = train_sample_size
+        self.compact_after_segments = compact_after_segments
         self.index = None
         self.metadata = None
         self.embedding_dimension = None
+        self.segments = SegmentLog(index_path)
+        self._mapped = False
+        self._compaction_deferred = 0
+        self._reset_delta()
         
         if not os.path.exists(index_path):
             os.makedirs(index_path, exist_ok=True)
     
-    def create_index(self, embeddings: np.ndarray, texts: List[str]) -> None:
+    def _reset_delta(self) -> None:
+        # Changes since the last snapshot: chunks added, snapshot chunks removed,
+        # and removed IDs the index itself cannot drop (HNSW) and must be filtered out
+        self._added = {}
+        self._removed = set()
+        self._tombstones = set()
+        self._next_id = 0
+    
+    @staticmethod
+    def _validate_batch(embeddings: np.ndarray, texts: List[str]) -> np.ndarray:
         if not isinstance(embeddings, np.ndarray) or not isinstance(texts, list):
             raise ValueError("Invalid input types")
         
@@ -25,76 +75,560 @@ class FAISSVectorStore:
         
         if embeddings.dtype != np.float32:
             embeddings = embeddings.astype(np.float32)
+        return embeddings
+    
+    def create_index(self, embeddings: np.ndarray, texts: List[str],
+                     document_id: Optional[str] = None, locations=None) -> None:
+        embeddings = self._validate_batch(embeddings, texts)
+        locations = ChunkTextStore.as_locations(locations, count=len(texts))
         
         try:
             self.embedding_dimension = embeddings.shape[1]
-            self.index = faiss.IndexFlatL2(self.embedding_dimension)
-            self.index.add(embeddings)
-            self.metadata = texts
+            self.index = faiss.IndexIDMap2(self.build_index(embeddings))
+            self._mapped = False
+            self.index.add_with_ids(embeddings, np.arange(len(texts), dtype=np.int64))
+            self._reset_delta()
+            self.metadata = None
+            self._added = {
+                chunk_id: (text, document_id, tuple(location))
+                for chunk_id, (text, location) in enumerate(zip(texts, locations.tolist()))
+            }
+            self._next_id = len(texts)
             self.save_index()
         except Exception as e:
             raise RuntimeError(f"Failed to create index: {str(e)}")
     
+    def add_documents(self, document_id: str, embeddings: np.ndarray, texts: List[str],
+                      locations=None) -> List[int]:
+        """Append one document's chunks and return their stable chunk IDs.
+        
+        ``locations`` holds one ``(page_start, page_end, start, end)`` row per
+        chunk (``None``/``-1`` where unknown) and is what search filters and
+        citations are built from.
+        """
+        return self.upsert(document_id, embeddings, texts, replace=False, locations=locations)
+    
+    def remove_document(self, document_id: str) -> int:
+        """Delete every chunk of a document and return how many were removed."""
+        if not document_id:
+            raise ValueError("document_id cannot be empty")
+        
+        try:
+            removed_ids = self.get_document_chunk_ids(document_id)
+            if not removed_ids:
+                return 0
+            
+            self._ensure_writable()
+            self._require_id_map()
+            self._remove_ids(removed_ids)
+            self.segments.append(document_id, removed_ids=removed_ids)
+            self._maybe_compact()
+            return len(removed_ids)
+        except Exception as e:
+            raise RuntimeError(f"Failed to remove document: {str(e)}")
+    
+    def upsert(self, document_id: str, embeddings: np.ndarray, texts: List[str],
+               replace: bool = True, locations=None) -> List[int]:
+        """Replace a document's chunks with new ones, persisted as a single delta segment."""
+        if not document_id:
+            raise ValueError("document_id cannot be empty")
+        embeddings = self._validate_batch(embeddings, texts)
+        locations = ChunkTextStore.as_locations(locations, count=len(texts))
+        if len(locations) != len(texts):
+            raise ValueError("locations and texts must have the same length")
+        
+        if self.index is None:
+            self.create_index(embeddings, texts, document_id=document_id, locations=locations)
+            return list(range(len(texts)))
+        
+        if embeddings.shape[1] != self.embedding_dimension:
+            raise ValueError(f"Expected {self.embedding_dimension}-dimensional embeddings")
+        
+        try:
+            self._ensure_writable()
+            self._require_id_map()
+            removed_ids = self.get_document_chunk_ids(document_id) if replace else []
+            if removed_ids:
+                self._remove_ids(removed_ids)
+            
+            ids = np.arange(self._next_id, self._next_id + len(texts), dtype=np.int64)
+            self._add_with_ids(document_id, ids, embeddings, texts, locations)
+            
+            self.segments.append(document_id, ids=ids, embeddings=embeddings, texts=texts,
+                                 removed_ids=removed_ids, locations=locations)
+            self._maybe_compact()
+            return ids.tolist()
+        except Exception as e:
+            raise RuntimeError(f"Failed to upsert document: {str(e)}")
+    
+    def _add_with_ids(self, document_id: str, ids: np.ndarray, embeddings: np.ndarray,
+                      texts: List[str], locations: np.ndarray) -> None:
+        self.index.add_with_ids(embeddings, ids)
+        for chunk_id, text, location in zip(ids.tolist(), texts, locations.tolist()):
+            self._added[chunk_id] = (text, document_id, tuple(location))
+        if len(ids):
+            self._next_id = max(self._next_id, int(ids.max()) + 1)
+    
+    def _remove_ids(self, chunk_ids: List[int]) -> None:
+        if self.get_index_type() in ("ivf_flat", "ivf_pq"):
+            # IndexIDMap2 renumbers its ID map as if the inner index shifted the remaining
+            # vectors down, which IVF lists do not do; hide them until compaction instead
+            self._tombstones.update(chunk_ids)
+        else:
+            try:
+                self.index.remove_ids(np.asarray(chunk_ids, dtype=np.int64))
+            except RuntimeError:
+                # HNSW graphs cannot drop vectors; hide them until the next compaction rebuilds the index
+                self._tombstones.update(chunk_ids)
+        
+        for chunk_id in chunk_ids:
+            if self._added.pop(chunk_id, None) is None:
+                self._removed.add(chunk_id)
+    
+    def _ensure_writable(self) -> None:
+        # Memory-mapped indexes are read-only (IVF lists refuse new entries); until the
+        # first change the file still matches the index, so reread it into RAM
+        if self._mapped:
+            self.index = faiss.read_index(os.path.join(self.index_path, self.INDEX_FILE))
+            self._mapped = False
+    
+    def _require_id_map(self) -> None:
+        if self.index is None or hasattr(self.index, "id_map"):
+            return
+        
+        # Indexes saved before chunk IDs existed use positions as IDs; rewrap them once
+        if self.get_index_type() in ("ivf_flat", "ivf_pq"):
+            count = self.index.ntotal
+            self.index = self._copy_ivf(self.index, np.arange(count, dtype=np.int64), np.ones(count, dtype=bool))
+            return
+        try:
+            vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        except RuntimeError:
+            raise RuntimeError("Index was saved without chunk IDs and cannot be reconstructed; rebuild it with create_index()")
+        
+        index = faiss.IndexIDMap2(self.build_index(vectors))
+        index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+        self.index = index
+    
+    def get_document_chunk_ids(self, document_id: str) -> List[int]:
+        chunk_ids = []
+        if isinstance(self.metadata, ChunkTextStore):
+            hidden = self._removed | self._tombstones
+            chunk_ids = [chunk_id for chunk_id in self.metadata.ids_for_document(document_id).tolist()
+                         if chunk_id not in hidden]
+        chunk_ids.extend(chunk_id for chunk_id, (_, doc, _) in self._added.items() if doc == document_id)
+        return chunk_ids
+    
+    def filter_ids(self, document_ids: Union[str, Sequence[str], None] = None,
+                   pages: Union[int, Tuple[int, int], None] = None) -> Optional[np.ndarray]:
+        """IDs of live chunks from ``document_ids`` overlapping the inclusive page range ``pages``.
+        
+        Returns None when no filter is given, meaning every chunk is allowed.
+        """
+        if document_ids is None and pages is None:
+            return None
+        if isinstance(document_ids, str):
+            document_ids = [document_ids]
+        if isinstance(pages, int):
+            pages = (pages, pages)
+        
+        selected = np.array([], dtype=np.int64)
+        if isinstance(self.metadata, ChunkTextStore):
+            selected = self.metadata.select(document_ids, pages)
+            hidden = self._removed | self._tombstones
+            if hidden and len(selected):
+                selected = selected[~np.isin(selected, np.fromiter(hidden, dtype=np.int64))]
+        
+        added = [
+            chunk_id for chunk_id, (_, doc, location) in self._added.items()
+            if (document_ids is None or doc in document_ids)
+            and (pages is None or 0 <= location[0] <= pages[1] and location[1] >= pages[0])
+        ]
+        return np.concatenate([selected, np.asarray(added, dtype=np.int64)])
+    
+    def get_chunk_text(self, chunk_id: int) -> Optional[str]:
+        if chunk_id in self._added:
+            return self._added[chunk_id][0]
+        if chunk_id in self._removed or self.metadata is None:
+            return None
+        if isinstance(self.metadata, ChunkTextStore):
+            return self.metadata.get(chunk_id)
+        return self.metadata[chunk_id] if 0 <= chunk_id < len(self.metadata) else None
+    
+    def get_chunk_metadata(self, chunk_id: int) -> Optional[Dict]:
+        """Document ID, page range and character offsets of a chunk, read from the columnar store."""
+        location = None
+        if chunk_id in self._added:
+            _, document_id, location = self._added[chunk_id]
+        elif chunk_id in self._removed or self.metadata is None:
+            return None
+        elif isinstance(self.metadata, ChunkTextStore):
+            position = self.metadata.position(chunk_id)
+            if position < 0:
+                return None
+            document_id = self.metadata.document_at(position)
+            location = self.metadata.location_at(position).tolist()
+        elif 0 <= chunk_id < len(self.metadata):
+            document_id = None
+        else:
+            return None
+        
+        metadata = {"chunk_id": chunk_id, "document_id": document_id}
+        for field, value in zip(ChunkTextStore.LOCATION_FIELDS, location or [-1] * 4):
+            metadata[field] = value if value >= 0 else None
+        return metadata
+    
+    def _live_records(self) -> Iterator[Tuple[int, str, Optional[str], Sequence[int]]]:
+        unknown = (-1,) * len(ChunkTextStore.LOCATION_FIELDS)
+        if isinstance(self.metadata, ChunkTextStore):
+            for chunk_id, text, document_id, location in self.metadata.records():
+                if chunk_id not in self._removed:
+                    yield chunk_id, text, document_id, location
+        elif self.metadata is not None:
+            for chunk_id, text in enumerate(self.metadata):
+                if chunk_id not in self._removed:
+                    yield chunk_id, text, None, unknown
+        for chunk_id, (text, document_id, location) in self._added.items():
+            yield chunk_id, text, document_id, location
+    
+    def _maybe_compact(self) -> None:
+        if self._compaction_deferred:
+            return
+        if self.segments.count() >= self.compact_after_segments:
+            self.compact()
+    
+    @contextmanager
+    def deferred_compaction(self):
+        """Hold automatic compaction until the block ends, e.g. while one document is added in batches."""
+        self._compaction_deferred += 1
+        try:
+            yield self
+        finally:
+            self._compaction_deferred -= 1
+            if not self._compaction_deferred:
+                self._maybe_compact()
+    
+    def compact(self) -> None:
+        """Fold all delta segments into a fresh snapshot of the index and chunk store."""
+        self.save_index()
+    
+    def build_index(self, embeddings: np.ndarray):
+        """Create an empty index of the configured tier, trained on a sample of embeddings."""
+        num_vectors, dimension = embeddings.shape
+        index_type = self.index_type
+        nlist = min(self.nlist, num_vectors // self.MIN_POINTS_PER_CENTROID)
+        
+        # Small corpora cannot train a quantizer; exact search is fast enough for them anyway
+        if index_type in ("ivf_flat", "ivf_pq") and nlist < 2:
+            index_type = "flat"
+        if index_type == "ivf_pq" and num_vectors < 2 ** self.pq_nbits:
+            index_type = "flat"
+        
+        if index_type == "flat":
+            return faiss.IndexFlatL2(dimension)
+        
+        if index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dimension, self.hnsw_m)
+            index.hnsw.efConstruction = self.ef_construction
+            return index
+        
+        if index_type == "ivf_flat":
+            index = faiss.index_factory(dimension, f"IVF{nlist},Flat")
+        else:
+            if dimension % self.pq_m != 0:
+                raise ValueError(f"pq_m ({self.pq_m}) must divide the embedding dimension ({dimension})")
+            index = faiss.index_factory(dimension, f"IVF{nlist},PQ{self.pq_m}x{self.pq_nbits}")
+        
+        index.train(self._training_sample(embeddings))
+        return index
+    
+    def _training_sample(self, embeddings: np.ndarray) -> np.ndarray:
+        if len(embeddings) <= self.train_sample_size:
+            return embeddings
+        rng = np.random.default_rng(0)
+        sample_ids = rng.choice(len(embeddings), size=self.train_sample_size, replace=False)
+        return embeddings[np.sort(sample_ids)]
+    
+    def get_index_type(self) -> Optional[str]:
+        if self.index is None:
+            return None
+        
+        index = faiss.downcast_index(self.index)
+        if hasattr(index, "id_map"):
+            index = faiss.downcast_index(index.index)
+        if isinstance(index, faiss.IndexHNSW):
+            return "hnsw"
+        if isinstance(index, faiss.IndexIVFPQ):
+            return "ivf_pq"
+        if isinstance(index, faiss.IndexIVF):
+            return "ivf_flat"
+        return "flat"
+    
+    def get_index_info(self) -> Dict:
+        return {
+            "configured_type": self.index_type,
+            "index_type": self.get_index_type(),
+            "vector_count": self.get_vector_count(),
+            "dimension": self.embedding_dimension,
+            "nprobe": self.nprobe,
+            "ef_search": self.ef_search
+        }
+    
     def save_index(self) -> None:
-        if self.index is None or self.metadata is None:
+        if self.index is None:
             raise RuntimeError("No index to save")
         
         try:
-            index_file = os.path.join(self.index_path, "faiss.index")
-            metadata_file = os.path.join(self.index_path, "metadata.pkl")
+            index_file = os.path.join(self.index_path, self.INDEX_FILE)
+            legacy_metadata_file = os.path.join(self.index_path, self.LEGACY_METADATA_FILE)
+            
+            # Never rewrite the file a mapped index is still reading from
+            self._ensure_writable()
+            self._require_id_map()
+            if self._tombstones:
+                self._rebuild_without_tombstones()
+            
+            ids, texts, document_ids, locations = [], [], [], []
+            for chunk_id, text, document_id, location in self._live_records():
+                ids.append(chunk_id)
+                texts.append(text)
+                document_ids.append(document_id)
+                locations.append(location)
             
             faiss.write_index(self.index, index_file)
-            with open(metadata_file, 'wb') as f:
-                pickle.dump(self.metadata, f)
+            ChunkTextStore.write(self.index_path, texts, ids=ids, document_ids=document_ids,
+                                 locations=ChunkTextStore.as_locations(locations, count=len(ids)))
+            self.segments.clear()
+            
+            # The offset-indexed chunk store supersedes the pickled list
+            if os.path.exists(legacy_metadata_file):
+                os.remove(legacy_metadata_file)
+            
+            next_id = self._next_id
+            self._reset_delta()
+            self._next_id = max(next_id, max(ids, default=-1) + 1)
+            self.metadata = ChunkTextStore.open(self.index_path, use_mmap=self.use_mmap)
         except Exception as e:
             raise RuntimeError(f"Failed to save index: {str(e)}")
     
-    def load_index(self) -> bool:
+    def _rebuild_without_tombstones(self) -> None:
+        ids = faiss.vector_to_array(self.index.id_map)
+        keep = ~np.isin(ids, np.fromiter(self._tombstones, dtype=np.int64))
+        
+        if self.get_index_type() in ("ivf_flat", "ivf_pq"):
+            self.index = self._copy_ivf(self.index.index, ids, keep)
+        else:
+            # HNSW stores the raw vectors, so rebuilding from them loses nothing
+            vectors = self.index.index.reconstruct_n(0, self.index.ntotal)
+            index = faiss.IndexIDMap2(self.build_index(vectors[keep]))
+            index.add_with_ids(vectors[keep], ids[keep])
+            self.index = index
+        self._tombstones = set()
+    
+    @staticmethod
+    def _copy_ivf(index, chunk_ids: np.ndarray, keep: np.ndarray):
+        """Wrap a copy of an IVF index holding only the ``keep`` entries in an ID map.
+        
+        ``chunk_ids[i]`` is the chunk ID of the entry stored under list ID ``i``.
+        The trained quantizers and the stored codes are reused as they are, so
+        compaction never retrains on, or re-encodes, already quantized vectors.
+        """
+        fresh = faiss.clone_index(index)
+        fresh.reset()
+        wrapped = faiss.IndexIDMap2(fresh)
+        
+        source, target = faiss.extract_index_ivf(index), faiss.extract_index_ivf(fresh)
+        invlists = source.invlists
+        positions = np.cumsum(keep) - 1
+        for list_no in range(source.nlist):
+            size = invlists.list_size(list_no)
+            if not size:
+                continue
+            ids_ptr, codes_ptr = invlists.get_ids(list_no), invlists.get_codes(list_no)
+            list_ids = faiss.rev_swig_ptr(ids_ptr, size).copy()
+            codes = faiss.rev_swig_ptr(codes_ptr, size * invlists.code_size).reshape(size, -1).copy()
+            invlists.release_ids(list_no, ids_ptr)
+            invlists.release_codes(list_no, codes_ptr)
+            
+            kept = keep[list_ids]
+            if kept.any():
+                new_ids = np.ascontiguousarray(positions[list_ids[kept]], dtype=np.int64)
+                new_codes = np.ascontiguousarray(codes[kept])
+                target.invlists.add_entries(list_no, len(new_ids), faiss.swig_ptr(new_ids), faiss.swig_ptr(new_codes))
+        
+        count = int(keep.sum())
+        target.ntotal = fresh.ntotal = wrapped.ntotal = count
+        faiss.copy_array_to_vector(np.ascontiguousarray(chunk_ids[keep], dtype=np.int64), wrapped.id_map)
+        wrapped.construct_rev_map()
+        return wrapped
+    
+    def load_index(self, use_mmap: Optional[bool] = None) -> bool:
+        if use_mmap is None:
+            use_mmap = self.use_mmap
+        
         try:
-            index_file = os.path.join(self.index_path, "faiss.index")
-            metadata_file = os.path.join(self.index_path, "metadata.pkl")
+            index_file = os.path.join(self.index_path, self.INDEX_FILE)
+            legacy_metadata_file = os.path.join(self.index_path, self.LEGACY_METADATA_FILE)
             
             if not os.path.exists(index_file):
                 return False
             
-            self.index = faiss.read_index(index_file)
+            # Replaying delta segments adds to the index, which needs a writable copy
+            has_segments = self.segments.count() > 0
+            self.index, self._mapped = self._read_index(index_file, use_mmap and not has_segments)
+            self._reset_delta()
+            self.metadata = None
             
-            if os.path.exists(metadata_file):
-                with open(metadata_file, 'rb') as f:
+            if ChunkTextStore.exists(self.index_path):
+                self.metadata = ChunkTextStore.open(self.index_path, use_mmap=use_mmap)
+                chunk_ids = self.metadata.chunk_ids()
+                self._next_id = int(chunk_ids[-1]) + 1 if len(chunk_ids) else 0
+            elif os.path.exists(legacy_metadata_file):
+                with open(legacy_metadata_file, 'rb') as f:
                     self.metadata = pickle.load(f)
+                self._next_id = len(self.metadata)
             
             if self.index:
                 self.embedding_dimension = self.index.d
             
+            if has_segments:
+                self._require_id_map()
+            for segment in self.segments.replay():
+                removed_ids = segment["removed_ids"].tolist()
+                if removed_ids:
+                    self._remove_ids(removed_ids)
+                if len(segment["ids"]):
+                    self._add_with_ids(segment["document_id"], segment["ids"],
+                                       segment["embeddings"], segment["texts"], segment["locations"])
+            
             return True
         except Exception:
             return False
     
-    def search(self, query_embedding: np.ndarray, k: int = 5) -> Tuple[List[float], List[str]]:
+    @staticmethod
+    def _read_index(index_file: str, use_mmap: bool):
+        """Read an index, memory-mapped when possible; also return whether it was mapped."""
+        if use_mmap:
+            try:
+                return faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY), True
+            except RuntimeError:
+                # Older FAISS builds cannot map every index type; read it into RAM instead
+                pass
+        return faiss.read_index(index_file), False
+    
+    def _search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                       selector=None):
+        index_type = self.get_index_type()
+        if index_type in ("ivf_flat", "ivf_pq"):
+            return faiss.SearchParametersIVF(nprobe=nprobe or self.nprobe, sel=selector)
+        if index_type == "hnsw":
+            return faiss.SearchParametersHNSW(efSearch=ef_search or self.ef_search, sel=selector)
+        if selector is not None:
+            return faiss.SearchParameters(sel=selector)
+        return None
+    
+    def search_ids(self, query_embeddings: np.ndarray, k: int = 5, nprobe: Optional[int] = None,
+                   ef_search: Optional[int] = None,
+                   allowed_ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Raw FAISS search; ``allowed_ids`` restricts it to those chunk IDs inside the index."""
         if self.index is None:
             raise RuntimeError("Index not loaded")
         
-        if k <= 0 or k > self.index.ntotal:
-            k = min(k, self.index.ntotal)
+        if query_embeddings.dtype != np.float32:
+            query_embeddings = query_embeddings.astype(np.float32)
+        
+        if query_embeddings.ndim == 1:
+            query_embeddings = query_embeddings.reshape(1, -1)
+        
+        # The selector must stay referenced until the search returns
+        selector = None
+        if allowed_ids is not None:
+            selector = faiss.IDSelectorBatch(np.ascontiguousarray(allowed_ids, dtype=np.int64))
+        
+        params = self._search_params(nprobe=nprobe, ef_search=ef_search, selector=selector)
+        if params is None:
+            return self.index.search(query_embeddings, k)
+        return self.index.search(query_embeddings, k, params=params)
+    
+    def search(self, query_embedding: np.ndarray, k: int = 5, nprobe: Optional[int] = None,
+               ef_search: Optional[int] = None, document_ids=None, pages=None) -> Tuple[List[float], List[str]]:
+        if query_embedding.ndim == 1:
+            query_embedding = query_embedding.reshape(1, -1)
+        return self.search_batch(query_embedding[:1], k=k, nprobe=nprobe, ef_search=ef_search,
+                                 document_ids=document_ids, pages=pages)[0]
+    
+    def search_batch(self, query_embeddings: np.ndarray, k: int = 5, nprobe: Optional[int] = None,
+                     ef_search: Optional[int] = None, document_ids=None,
+                     pages=None) -> List[Tuple[List[float], List[str]]]:
+        """Search an (n, d) matrix of queries with a single FAISS call."""
+        hits = self.search_chunks(query_embeddings, k=k, nprobe=nprobe, ef_search=ef_search,
+                                  document_ids=document_ids, pages=pages)
+        return [(distances, texts) for distances, _, texts in hits]
+    
+    def search_chunks(self, query_embeddings: np.ndarray, k: int = 5, nprobe: Optional[int] = None,
+                      ef_search: Optional[int] = None, document_ids=None,
+                      pages=None) -> List[Tuple[List[float], List[int], List[str]]]:
+        """Like ``search_batch`` but also return chunk IDs, for ``get_chunk_metadata``.
+        
+        ``document_ids`` and ``pages`` (an inclusive ``(first, last)`` range or a
+        single page) are applied inside the index, so filtered searches still
+        return up to ``k`` hits.
+        """
+        if self.index is None:
+            raise RuntimeError("Index not loaded")
+        if query_embeddings.ndim == 1:
+            query_embeddings = query_embeddings.reshape(1, -1)
+        
+        allowed_ids = self.filter_ids(document_ids, pages)
+        if allowed_ids is not None and len(allowed_ids) == 0:
+            return [([], [], []) for _ in range(len(query_embeddings))]
+        
+        # Over-fetch so that hidden tombstoned chunks do not shrink the result list
+        fetch_k = min(k + len(self._tombstones), self.index.ntotal)
         
         try:
-            if query_embedding.dtype != np.float32:
-                query_embedding = query_embedding.astype(np.float32)
-            
-            if query_embedding.ndim == 1:
-                query_embedding = query_embedding.reshape(1, -1)
-            
-            distances, indices = self.index.search(query_embedding, k)
-            distances = distances[0].tolist()
-            
-            results = []
-            for idx in indices[0]:
-                if idx >= 0 and idx < len(self.metadata):
-                    results.append(self.metadata[idx])
-            
-            return distances, results
+            index_type = self.get_index_type()
+            narrow = allowed_ids is not None and len(allowed_ids) <= self.EXACT_FILTER_MAX
+            if narrow and index_type in ("ivf_flat", "ivf_pq"):
+                # Probing every list is exact for the allowed chunks; the selector skips the rest
+                nprobe = faiss.extract_index_ivf(self.index).nlist
+            if narrow and index_type == "hnsw":
+                distances, indices = self._search_subset(query_embeddings, allowed_ids, fetch_k)
+            else:
+                distances, indices = self.search_ids(query_embeddings, k=fetch_k, nprobe=nprobe,
+                                                     ef_search=ef_search, allowed_ids=allowed_ids)
+            return [
+                self._collect_hits(row_distances, row_ids, k)
+                for row_distances, row_ids in zip(distances.tolist(), indices.tolist())
+            ]
         except Exception as e:
             raise RuntimeError(f"Search failed: {str(e)}")
     
+    def _search_subset(self, query_embeddings: np.ndarray, chunk_ids: np.ndarray,
+                       k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if query_embeddings.dtype != np.float32:
+            query_embeddings = query_embeddings.astype(np.float32)
+        vectors = self.index.reconstruct_batch(chunk_ids)
+        distances, positions = faiss.knn(query_embeddings, vectors, min(k, len(chunk_ids)))
+        return distances, np.where(positions >= 0, chunk_ids[positions], -1)
+    
+    def _collect_hits(self, distances: List[float], chunk_ids: List[int],
+                      k: int) -> Tuple[List[float], List[int], List[str]]:
+        result_distances = []
+        result_ids = []
+        results = []
+        for distance, chunk_id in zip(distances, chunk_ids):
+            # Approximate indexes pad with -1 when fewer than k neighbours are found
+            if chunk_id < 0 or chunk_id in self._tombstones:
+                continue
+            text = self.get_chunk_text(chunk_id)
+            if text is not None:
+                result_distances.append(distance)
+                result_ids.append(chunk_id)
+                results.append(text)
+            if len(results) == k:
+                break
+        return result_distances, result_ids, results
+    
     def get_vector_count(self) -> int:
-        return self.index.ntotal if self.index else 0
+        return self.index.ntotal - len(self._tombstones) if self.index else 0
@@ -0,0 +1,113 @@
+"""
+Tests for TextChunker offsets
+Run from the rag_pipeline directory: python -m pytest tests
+"""
+
+import random
+
+import pytest
+
+from rag_pipeline.chunker import TextChunker
+
+# ==================== FIXTURES ====================
+
+WORDS = ["refund", "policy", ".", "the", "a", "warranty", "of", "to", "and", "in", "covers", "days"]
+SEPARATORS = [" ", " ", " ", "\n", "\n\n", "", "  \n"]
+
+
+def random_text(seed: int, words: int = 300) -> str:
+    """Short repetitive words and mixed separators, so chunks repeat and overlap"""
+    rng = random.Random(seed)
+    return "".join(rng.choice(WORDS) + rng.choice(SEPARATORS) for _ in range(words))
+
+
+# ==================== SPAN TESTS ====================
+
+class TestChunkSpans:
+    """chunk_spans must report where each chunk really is"""
+
+    @pytest.mark.parametrize("chunk_size,chunk_overlap", [(5, 2), (20, 5), (30, 10), (50, 20), (60, 0), (800, 100)])
+    def test_spans_are_exact_slices(self, chunk_size, chunk_overlap):
+        """Every chunk is text[start:end], in the splitter's order"""
+        chunker = TextChunker(chunk_size, chunk_overlap)
+        for seed in range(50):
+            text = random_text(seed, 300 if chunk_size < 800 else 3000)
+            spans = chunker.chunk_spans(text)
+            assert [chunk for _, _, chunk in spans] == chunker.chunk_text(text)
+            for start, end, chunk in spans:
+                assert 0 <= start < end <= len(text)
+                assert text[start:end] == chunk
+            assert [start for start, _, _ in spans] == sorted(start for start, _, _ in spans)
+
+    def test_chunk_inside_previous_overlap(self):
+        """A chunk that lies entirely inside the previous chunk's overlap keeps its own position"""
+        chunker = TextChunker(30, 10)
+        nested = 0
+        for seed in range(50):
+            text = random_text(seed)
+            spans = chunker.chunk_spans(text)
+            for (previous_start, previous_end, _), (start, end, chunk) in zip(spans, spans[1:]):
+                if end <= previous_end:
+                    nested += 1
+                    assert previous_start <= start
+                    assert text[start:end] == chunk
+        assert nested > 0
+
+    def test_spans_with_length_function(self):
+        """Offsets stay exact when sizes are counted in other units"""
+        chunker = TextChunker(8, 3, length_function=lambda text: len(text.split()))
+        for seed in range(20):
+            text = random_text(seed)
+            for start, end, chunk in chunker.chunk_spans(text):
+                assert text[start:end] == chunk
+
+
+# ==================== PAGE STREAM TESTS ====================
+
+def random_pages(seed: int):
+    """Pages with text, blank pages and whitespace-only pages"""
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(rng.randint(1, 25)):
+        kind = rng.random()
+        if kind < 0.15:
+            pages.append("")
+        elif kind < 0.25:
+            pages.append(rng.choice(["  ", "\n\n", " \n "]))
+        else:
+            pages.append(random_text(rng.randint(0, 10 ** 6), rng.randint(1, 60)))
+    return pages
+
+
+class TestChunkPages:
+    """chunk_pages offsets are into the pages joined with newlines"""
+
+    @pytest.mark.parametrize("chunk_size,chunk_overlap,window", [(30, 10, 30), (50, 20, 120), (200, 50, 400)])
+    def test_offsets_index_joined_pages(self, chunk_size, chunk_overlap, window):
+        """Chunks carried across windows keep the text between pages"""
+        chunker = TextChunker(chunk_size, chunk_overlap)
+        for seed in range(60):
+            pages = random_pages(seed)
+            joined = "\n".join(pages)
+            page_starts = []
+            position = 0
+            for page in pages:
+                page_starts.append(position)
+                position += len(page) + 1
+
+            infos = list(chunker.chunk_pages(pages, window=window))
+            assert [info["chunk_id"] for info in infos] == list(range(len(infos)))
+            for info in infos:
+                assert joined[info["start"]:info["end"]] == info["text"]
+                assert 1 <= info["page_start"] <= info["page_end"] <= len(pages)
+                assert page_starts[info["page_start"] - 1] <= info["start"]
+                assert info["end"] <= page_starts[info["page_end"] - 1] + len(pages[info["page_end"] - 1])
+
+    def test_single_window_matches_chunk_text(self):
+        """With one window the stream is chunk_text on the joined pages"""
+        chunker = TextChunker(50, 10)
+        for seed in range(30):
+            pages = random_pages(seed)
+            joined = "\n".join(pages)
+            infos = chunker.chunk_pages(pages, window=len(joined) + 1)
+            assert [info["text"] for info in infos] == chunker.chunk_text(joined)
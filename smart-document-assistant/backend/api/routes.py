@@ -2,7 +2,11 @@
 API Routes - Define all API endpoints
 """
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from itertools import islice
+from typing import Optional, Tuple
+import json
 import logging
 import os
 import sys
@@ -13,12 +17,18 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from api.schemas import (
     UploadResponse, QuestionRequest, QuestionResponse,
-    TranslateRequest, TranslateResponse, HealthResponse, SessionInfoResponse, ChatMessage
+    TranslateRequest, TranslateResponse, HealthResponse, SessionInfoResponse, ChatMessage,
+    UploadStatusResponse, MetricsResponse
 )
 from api.utils import save_upload_file, cleanup_temp_file, validate_pdf_file
 from services.pdf_processor import PDFProcessor
 from services.rag_pipeline import RAGPipeline
+from services.embedding_service import get_query_cache_stats
+from services.model_registry import model_registry
+from services.ingest_jobs import ingest_jobs, IngestJob, IngestQueueFullError
 from services.deepseek_service import DeepSeekService
+from services.retry_policy import retry_metrics
+from services.answer_cache import answer_cache
 from services.translator import TranslatorService
 from services.language_detector import is_response_in_language, validate_language_strict, log_language_decision
 from services.mock_responses import enable_mock_mode
@@ -26,13 +36,54 @@ from models.session_store import session_store, ChatMessage as StoredChatMessage
 
 router = APIRouter()
 
+# Characters generated between incremental language checks while streaming
+LANGUAGE_CHECK_CHARS = 80
+
+# Chunks embedded and indexed together while a PDF is ingested
+INGEST_BATCH_CHUNKS = int(os.getenv("INGEST_BATCH_CHUNKS", "64"))
+
+# "chars" cuts 500-character chunks; "tokens" cuts chunks that fit the embedding model's max sequence length
+CHUNK_UNIT = os.getenv("CHUNK_UNIT", "chars")
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+
 # Global instances
 pdf_processor = PDFProcessor()
 translator_service = TranslatorService()
 deepseek_service = None  # Lazy initialized
 
-# Session-specific RAG pipelines
-rag_pipelines = {}
+
+def get_session(session_id: str):
+    """
+    Get a session, restoring it from the persistent vector store if needed
+    
+    Sessions are kept in memory, but their chunks live in the shared
+    persistent collection, so after a restart a session is rebuilt from
+    its stored chunk metadata instead of being re-uploaded.
+    """
+    session = session_store.get_session(session_id)
+    if session:
+        return session
+    
+    try:
+        metadata = RAGPipeline.get_session_metadata(session_id)
+    except Exception as e:
+        logging.error(f"Failed to look up session {session_id} in vector store: {str(e)}")
+        return None
+    
+    if metadata is None:
+        return None
+    
+    logging.info(f"[SESSION] Restored session {session_id} from persistent vector store")
+    return session_store.restore_session(session_id, document_name=metadata.get("document_name", ""))
+
+
+def discard_session_chunks(session_id: str) -> None:
+    """Remove any chunks a failed upload left in the shared collection"""
+    answer_cache.invalidate(session_id)
+    try:
+        RAGPipeline(session_id).clear()
+    except Exception as e:
+        logging.warning(f"Failed to discard chunks for session {session_id}: {str(e)}")
 
 
 def get_deepseek_service():
@@ -52,38 +103,151 @@ async def health_check():
     """
     Health check endpoint
     """
+    cache_stats = {"query_embeddings": get_query_cache_stats(), "answers": answer_cache.get_stats()}
+    models = model_registry.get_stats()
+    
     try:
         service = get_deepseek_service()
-        is_connected = service.test_connection()
+        is_connected = await service.atest_connection()
         
         if is_connected:
             return HealthResponse(
                 status="healthy",
-                message="All services operational (DeepSeek API connected)"
+                message="All services operational (DeepSeek API connected)",
+                cache_stats=cache_stats,
+                models=models
             )
         else:
             return HealthResponse(
                 status="degraded",
-                message="DeepSeek API connection failed"
+                message="DeepSeek API connection failed",
+                cache_stats=cache_stats,
+                models=models
             )
     except Exception as e:
         logging.error(f"Health check failed: {str(e)}")
         return HealthResponse(
             status="unhealthy",
-            message=f"Error: {str(e)}"
+            message=f"Error: {str(e)}",
+            cache_stats=cache_stats,
+            models=models
+        )
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics():
+    """
+    Service metrics: LLM retry and language repair rates per language, cache hit ratios and ingest load
+    """
+    return MetricsResponse(
+        llm_retries=retry_metrics.get_stats(),
+        answer_cache=answer_cache.get_stats(),
+        query_cache=get_query_cache_stats(),
+        ingest=ingest_jobs.get_stats()
+    )
+
+
+def chunk_document(pages, embedding_service):
+    """
+    Chunk numbered pages in the configured CHUNK_UNIT
+    
+    Args:
+        pages: (page number, text) pairs in document order
+        embedding_service: Embedding service whose tokenizer sizes token chunks
+    
+    Returns:
+        Iterator of chunk dicts with text, page_start, page_end, start and end
+    """
+    if CHUNK_UNIT == "tokens":
+        if embedding_service.supports_token_chunking():
+            return pdf_processor.chunk_token_pages(
+                pages,
+                embedding_service.tokenizer,
+                max_tokens=embedding_service.max_tokens,
+                overlap=min(CHUNK_OVERLAP_TOKENS, embedding_service.max_tokens - 1)
+            )
+        logging.warning("[INGEST] CHUNK_UNIT=tokens needs a fast tokenizer; chunking by characters")
+    return pdf_processor.chunk_pages(pages)
+
+
+def ingest_document(job: IngestJob, temp_file_path: str, document_name: str) -> None:
+    """
+    Extract, clean, chunk and index an uploaded PDF (runs in the ingest pool)
+    
+    Args:
+        job: Ingest job; its ID is the session ID
+        temp_file_path: Path of the saved upload
+        document_name: Original file name
+    """
+    session_id = job.job_id
+    try:
+        # Pages stream through cleaning, chunking and embedding, so only one
+        # page and one batch of chunks are held at a time and the first
+        # batches are searchable before the last page is parsed
+        job.stage = "extracting"
+        rag_pipeline = RAGPipeline(session_id)
+        
+        def cleaned_pages():
+            for page_number, page_text in pdf_processor.iter_numbered_pages(temp_file_path):
+                job.pages_processed += 1
+                cleaned = pdf_processor.clean_text(page_text)
+                if cleaned:
+                    yield page_number, cleaned
+        
+        # Chunks keep their page range and offsets so answers can cite them
+        chunks = chunk_document(cleaned_pages(), rag_pipeline.embedding_service)
+        while True:
+            batch = list(islice(chunks, INGEST_BATCH_CHUNKS))
+            if not batch:
+                break
+            job.stage = "embedding"
+            texts = [chunk.pop("text") for chunk in batch]
+            job.truncated_chunks += rag_pipeline.embedding_service.count_truncated(texts)
+            rag_pipeline.add_documents(
+                texts,
+                metadata=batch,
+                document_name=document_name,
+                start_index=job.chunks_indexed
+            )
+            job.chunks_indexed += len(batch)
+            job.stage = "extracting"
+        
+        if not job.chunks_indexed:
+            raise ValueError("Failed to extract text from PDF. File may be empty or corrupted.")
+        
+        # Answers given while the document was partially indexed may be incomplete
+        answer_cache.invalidate(session_id)
+        logging.info(
+            f"[INGEST] Indexed {job.chunks_indexed} chunks from {job.pages_processed} pages "
+            f"({job.truncated_chunks} truncated by the embedding model)"
         )
+        job.stage = "done"
+    
+    except Exception:
+        # Delete session on error; the failed job keeps the reason for polling
+        session_store.delete_session(session_id)
+        discard_session_chunks(session_id)
+        raise
+    
+    finally:
+        # Clean up temporary file
+        cleanup_temp_file(temp_file_path)
 
 
 @router.post("/upload-pdf", response_model=UploadResponse)
 async def upload_pdf(file: UploadFile = File(...)):
     """
-    Upload and process PDF file
+    Upload a PDF and queue it for processing
+    
+    Extraction, chunking and embedding are CPU-bound, so they run in the
+    bounded ingest pool instead of on the event loop. Poll
+    ``/upload-status/{job_id}`` until the job is completed.
     
     Args:
         file: PDF file to upload
-        
+    
     Returns:
-        Upload response with session ID
+        Upload response with session ID and ingest job ID
     """
     # Validate file
     if not validate_pdf_file(file):
@@ -94,90 +258,90 @@ async def upload_pdf(file: UploadFile = File(...)):
     
     # Create session
     session_id = session_store.create_session()
+    session_store.update_session(session_id, document_name=file.filename)
+    
+    # Save uploaded file
+    temp_file_path = await save_upload_file(file)
+    if not temp_file_path:
+        session_store.delete_session(session_id)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to save uploaded file"
+        )
     
-    temp_file_path = None
     try:
-        # Save uploaded file
-        temp_file_path = await save_upload_file(file)
-        if not temp_file_path:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to save uploaded file"
-            )
-        
-        # Extract text from PDF
-        text = pdf_processor.extract_text(temp_file_path)
-        if not text:
-            raise HTTPException(
-                status_code=400,
-                detail="Failed to extract text from PDF. File may be empty or corrupted."
-            )
-        
-        # Clean text
-        text = pdf_processor.clean_text(text)
-        
-        # Chunk text
-        chunks = pdf_processor.chunk_text(text)
-        
-        # Create RAG pipeline for this session
-        rag_pipeline = RAGPipeline()
-        rag_pipeline.create_collection(f"session_{session_id}")
-        rag_pipeline.add_documents(chunks)
-        
-        # Store in RAG pipelines
-        rag_pipelines[session_id] = rag_pipeline
-        
-        # Update session
-        session_store.update_session(
+        job = ingest_jobs.submit(
             session_id,
-            document_name=file.filename,
-            document_text=text
-        )
-        
-        return UploadResponse(
-            success=True,
-            session_id=session_id,
-            message=f"Successfully processed '{file.filename}'",
+            lambda job: ingest_document(job, temp_file_path, file.filename),
             document_name=file.filename
         )
-    
-    except HTTPException:
-        # Delete session on error
-        session_store.delete_session(session_id)
-        if session_id in rag_pipelines:
-            del rag_pipelines[session_id]
-        raise
-    
-    except Exception as e:
-        # Delete session on error
+    except IngestQueueFullError as e:
+        # Backpressure: refuse new work rather than queueing without bound
         session_store.delete_session(session_id)
-        if session_id in rag_pipelines:
-            del rag_pipelines[session_id]
+        cleanup_temp_file(temp_file_path)
         raise HTTPException(
-            status_code=500,
-            detail=f"Error processing PDF: {str(e)}"
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "5"}
         )
     
-    finally:
-        # Clean up temporary file
-        if temp_file_path:
-            cleanup_temp_file(temp_file_path)
+    return UploadResponse(
+        success=True,
+        session_id=session_id,
+        message=f"Processing '{file.filename}'",
+        document_name=file.filename,
+        job_id=job.job_id,
+        status=job.status
+    )
 
 
-@router.post("/ask-question", response_model=QuestionResponse)
-async def ask_question(request: QuestionRequest):
+@router.get("/upload-status/{job_id}", response_model=UploadStatusResponse)
+async def upload_status(job_id: str):
     """
-    Ask a question about the uploaded document
+    Get the status of an upload's ingest job
     
     Args:
-        request: Question request with session ID and question
-        
+        job_id: Job ID returned by /upload-pdf
+    
     Returns:
-        Answer from the document
+        Job status, current stage and error if it failed
     """
+    job = ingest_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="Upload job not found"
+        )
+    
+    return UploadStatusResponse(**job.to_dict())
+
+
+def validate_question_request(request: QuestionRequest) -> None:
+    """
+    Check that a question can be answered: document indexed, session valid, language supported
+    
+    Args:
+        request: Question request
+    
+    Raises:
+        HTTPException: 409 until the first chunks are indexed, 400/404 otherwise
+    """
+    # Refuse questions until part of the document is searchable
+    job = ingest_jobs.get_job(request.session_id)
+    if job and job.in_progress and not job.chunks_indexed:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Document is still being processed ({job.stage or job.status}). Please wait."
+        )
+    
     # Validate session
-    session = session_store.get_session(request.session_id)
+    session = get_session(request.session_id)
     if not session:
+        if job and job.error:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error processing PDF: {job.error}"
+            )
         raise HTTPException(
             status_code=404,
             detail="Session not found or expired"
@@ -190,6 +354,47 @@ async def ask_question(request: QuestionRequest):
             detail="Invalid language. Supported: en, hi, mr"
         )
     
+    # Validate page range
+    pages = question_pages(request)
+    if pages and (pages[0] < 1 or pages[1] < pages[0]):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid page range. page_start must be at least 1 and not after page_end"
+        )
+
+
+def question_pages(request: QuestionRequest) -> Optional[Tuple[int, int]]:
+    """Inclusive page range a question is limited to, or None to search the whole document"""
+    if request.page_start is None and request.page_end is None:
+        return None
+    first = request.page_start if request.page_start is not None else 1
+    last = request.page_end if request.page_end is not None else sys.maxsize
+    return first, last
+
+
+def store_exchange(session_id: str, question: str, answer: str, language: str) -> None:
+    """Append a question and its answer to the session's chat history"""
+    try:
+        session_store.add_message(session_id, "user", question)
+        session_store.add_message(session_id, "assistant", answer)
+        session_store.update_session(session_id, language=language)
+    except Exception as e:
+        logging.warning(f"[WARNING] Failed to update chat history: {str(e)}")
+
+
+@router.post("/ask-question", response_model=QuestionResponse)
+async def ask_question(request: QuestionRequest):
+    """
+    Ask a question about the uploaded document
+    
+    Args:
+        request: Question request with session ID and question
+    
+    Returns:
+        Answer from the document
+    """
+    validate_question_request(request)
+    
     try:
         # STEP 1: Log the incoming request
         logging.info("=" * 60)
@@ -200,18 +405,32 @@ async def ask_question(request: QuestionRequest):
         logging.info(f"[SESSION_ID] {request.session_id}")
         
         # STEP 2: Get RAG pipeline for session
-        rag_pipeline = rag_pipelines.get(request.session_id)
-        if not rag_pipeline:
-            logging.error(f"RAG pipeline not found for session: {request.session_id}")
-            raise HTTPException(
-                status_code=500,
-                detail="RAG pipeline not initialized for this session"
+        rag_pipeline = RAGPipeline(request.session_id)
+        pages = question_pages(request)
+        
+        # Reuse the answer to a near-identical earlier question about this document;
+        # answers limited to a page range are not cached. Embedding is CPU-bound,
+        # so it runs off the event loop
+        question_embedding = await run_in_threadpool(rag_pipeline.embedding_service.embed_query, request.question)
+        cached = None if pages else answer_cache.lookup(request.session_id, request.language, question_embedding)
+        if cached:
+            logging.info(f"[ANSWER_CACHE] Answering from cache (matched: {cached.question[:50]})")
+            store_exchange(request.session_id, request.question, cached.answer, request.language)
+            return QuestionResponse(
+                success=True,
+                answer=cached.answer,
+                original_answer=cached.answer,
+                language=request.language,
+                sources=cached.sources,
+                cached=True
             )
         
         # STEP 3: Retrieve context from documents
         logging.info("[STEP 1] Retrieving context from RAG pipeline...")
         try:
-            context = rag_pipeline.get_context(request.question, top_k=3)
+            context, sources = await run_in_threadpool(
+                rag_pipeline.get_context_with_sources, request.question, 3, pages
+            )
             logging.info(f"[CONTEXT] Retrieved {len(context)} characters")
             logging.info(f"[CONTEXT_PREVIEW] {context[:200]}..." if len(context) > 200 else f"[CONTEXT_PREVIEW] {context}")
         except Exception as e:
@@ -246,7 +465,7 @@ async def ask_question(request: QuestionRequest):
         logging.info(f"[API_KEY_LOADED] {bool(service.api_key)}")
         
         try:
-            original_answer = service.generate_response(
+            original_answer = await service.agenerate_response(
                 prompt=request.question,
                 context=context,
                 language=request.language
@@ -261,7 +480,7 @@ async def ask_question(request: QuestionRequest):
             
             logging.info(f"[SUCCESS] Generated answer with {len(original_answer)} characters")
             logging.info(f"[ANSWER_PREVIEW] {original_answer[:200]}..." if len(original_answer) > 200 else f"[ANSWER_PREVIEW] {original_answer}")
-            
+        
         except HTTPException:
             raise
         except Exception as e:
@@ -297,18 +516,18 @@ async def ask_question(request: QuestionRequest):
             logging.warning(f"[WARNING] Response may not be in requested language ({request.language})")
             logging.warning(f"[WARNING] Detected language: {detected_language}")
             # Note: We still use the response as the model tried its best
+        elif not pages:
+            # Only answers in the requested language are worth serving again
+            answer_cache.store(
+                request.session_id, request.language, request.question, question_embedding, original_answer,
+                sources=sources
+            )
         
         logging.info(f"[LANGUAGE_FINAL] Answer language: {request.language}")
         
         # STEP 8: Store in chat history
         logging.info("[STEP 5] Storing in chat history...")
-        try:
-            session_store.add_message(request.session_id, "user", request.question)
-            session_store.add_message(request.session_id, "assistant", original_answer)
-            session_store.update_session(request.session_id, language=request.language)
-            logging.info("[SUCCESS] Chat history updated")
-        except Exception as e:
-            logging.warning(f"[WARNING] Failed to update chat history: {str(e)}")
+        store_exchange(request.session_id, request.question, original_answer, request.language)
         
         # STEP 9: Return success response
         logging.info("[FINAL] Returning successful response")
@@ -318,7 +537,8 @@ async def ask_question(request: QuestionRequest):
             success=True,
             answer=answer,
             original_answer=original_answer,
-            language=request.language
+            language=request.language,
+            sources=sources
         )
     
     except HTTPException:
@@ -332,6 +552,143 @@ async def ask_question(request: QuestionRequest):
         )
 
 
+def format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/ask-question/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Ask a question and stream the answer as Server-Sent Events
+    
+    Events:
+        token: {"token": str} for each generated piece of text
+        language: {"valid", "detected", "confidence"} each time the accumulated answer is re-checked
+        done: {"success", "answer", "language", "language_valid"} once the answer is complete
+        error: {"message"} if generation fails
+    
+    Args:
+        request: Question request with session ID and question
+    
+    Returns:
+        text/event-stream response
+    """
+    validate_question_request(request)
+    
+    logging.info(f"[STREAM] Question for session {request.session_id} ({request.language})")
+    
+    # Embedding the question is CPU-bound; keep it off the event loop
+    rag_pipeline = RAGPipeline(request.session_id)
+    pages = question_pages(request)
+    question_embedding = await run_in_threadpool(rag_pipeline.embedding_service.embed_query, request.question)
+    
+    cached = None if pages else answer_cache.lookup(request.session_id, request.language, question_embedding)
+    if cached:
+        logging.info(f"[STREAM] Answering from cache (matched: {cached.question[:50]})")
+        store_exchange(request.session_id, request.question, cached.answer, request.language)
+        
+        async def cached_answer():
+            yield format_sse("token", {"token": cached.answer})
+            yield format_sse("done", {
+                "success": True,
+                "answer": cached.answer,
+                "language": request.language,
+                "language_valid": True,
+                "detected_language": request.language,
+                "sources": cached.sources,
+                "cached": True
+            })
+        return StreamingResponse(cached_answer(), media_type="text/event-stream")
+    
+    context, sources = await run_in_threadpool(rag_pipeline.get_context_with_sources, request.question, 3, pages)
+    
+    if not context or context.strip() == "":
+        logging.warning("[STREAM] No relevant context found for question")
+        
+        async def no_context():
+            yield format_sse("done", {
+                "success": False,
+                "answer": "",
+                "language": request.language,
+                "message": "No relevant information found in the document."
+            })
+        return StreamingResponse(no_context(), media_type="text/event-stream")
+    
+    try:
+        service = get_deepseek_service()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"API key not configured or service initialization failed: {str(e)}"
+        )
+    
+    async def events():
+        answer = ""
+        checked_length = 0
+        is_valid, detected_language, confidence = False, "unknown", 0.0
+        
+        try:
+            async for token in service.astream_response(
+                prompt=request.question,
+                context=context,
+                language=request.language
+            ):
+                answer += token
+                yield format_sse("token", {"token": token})
+                
+                # Re-check the language on the growing prefix every LANGUAGE_CHECK_CHARS characters
+                if len(answer) - checked_length >= LANGUAGE_CHECK_CHARS:
+                    checked_length = len(answer)
+                    is_valid, detected_language, confidence = is_response_in_language(answer, request.language)
+                    yield format_sse("language", {
+                        "valid": is_valid,
+                        "detected": detected_language,
+                        "confidence": confidence
+                    })
+        except Exception as e:
+            logging.error(f"[STREAM] Generation failed: {str(e)}")
+            yield format_sse("error", {"message": f"Failed to generate response: {str(e)}"})
+            return
+        
+        if not answer:
+            yield format_sse("error", {"message": "Failed to generate response from DeepSeek API."})
+            return
+        
+        if checked_length != len(answer):
+            is_valid, detected_language, confidence = is_response_in_language(answer, request.language)
+        log_language_decision(
+            language=request.language,
+            context_size=len(context),
+            question=request.question,
+            detected_in_response=detected_language,
+            is_valid=is_valid
+        )
+        
+        # Store in chat history once the full answer is known
+        store_exchange(request.session_id, request.question, answer, request.language)
+        if is_valid and not pages:
+            answer_cache.store(
+                request.session_id, request.language, request.question, question_embedding, answer,
+                sources=sources
+            )
+        
+        yield format_sse("done", {
+            "success": True,
+            "answer": answer,
+            "language": request.language,
+            "language_valid": is_valid,
+            "detected_language": detected_language,
+            "sources": sources
+        })
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/translate", response_model=TranslateResponse)
 async def translate(request: TranslateRequest):
     """
@@ -339,7 +696,7 @@ async def translate(request: TranslateRequest):
     
     Args:
         request: Translation request
-        
+    
     Returns:
         Translated text
     """
@@ -372,11 +729,11 @@ async def get_session_info(session_id: str):
     
     Args:
         session_id: Session ID
-        
+    
     Returns:
         Session information
     """
-    session = session_store.get_session(session_id)
+    session = get_session(session_id)
     if not session:
         raise HTTPException(
             status_code=404,
@@ -414,16 +771,18 @@ async def delete_session(session_id: str):
     
     Args:
         session_id: Session ID
-        
+    
     Returns:
         Success status
     """
     try:
         success = session_store.delete_session(session_id)
+        answer_cache.invalidate(session_id)
         
-        # Clean up RAG pipeline
-        if session_id in rag_pipelines:
-            del rag_pipelines[session_id]
+        # Remove the session's chunks from the shared collection
+        if RAGPipeline.session_exists(session_id):
+            RAGPipeline(session_id).clear()
+            success = True
         
         if success:
             return {"success": True, "message": "Session deleted"}
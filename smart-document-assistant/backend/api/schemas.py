@@ -2,7 +2,7 @@
 API Schemas - Request/Response models
 """
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 
 class UploadResponse(BaseModel):
@@ -11,6 +11,23 @@ class UploadResponse(BaseModel):
     session_id: str
     message: str
     document_name: str
+    job_id: Optional[str] = None
+    status: str = "completed"  # queued, processing, completed, failed
+
+
+class UploadStatusResponse(BaseModel):
+    """Status of a PDF ingest job"""
+    job_id: str
+    document_name: str
+    status: str  # queued, processing, completed, failed
+    stage: str = ""
+    pages_processed: int = 0
+    chunks_indexed: int = 0
+    truncated_chunks: int = 0  # chunks longer than the embedding model's max sequence length
+    truncated_pct: float = 0.0
+    error: Optional[str] = None
+    created_at: str
+    finished_at: Optional[str] = None
 
 
 class QuestionRequest(BaseModel):
@@ -18,6 +35,18 @@ class QuestionRequest(BaseModel):
     session_id: str
     question: str
     language: str = "en"  # en, hi, mr
+    page_start: Optional[int] = None  # restrict retrieval to pages page_start..page_end
+    page_end: Optional[int] = None
+
+
+class SourceChunk(BaseModel):
+    """Where a chunk used to answer a question came from"""
+    document_name: str = ""
+    chunk_id: Optional[int] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
 
 
 class QuestionResponse(BaseModel):
@@ -27,6 +56,8 @@ class QuestionResponse(BaseModel):
     original_answer: str
     language: str
     message: Optional[str] = None
+    cached: bool = False
+    sources: List[SourceChunk] = []
 
 
 class TranslateRequest(BaseModel):
@@ -47,6 +78,16 @@ class HealthResponse(BaseModel):
     """Response for health check"""
     status: str
     message: str
+    cache_stats: Optional[Dict[str, Any]] = None
+    models: Optional[Dict[str, Any]] = None
+
+
+class MetricsResponse(BaseModel):
+    """Response for service metrics"""
+    llm_retries: Dict[str, Any]
+    answer_cache: Dict[str, Any]
+    query_cache: Dict[str, Any]
+    ingest: Dict[str, Any]
 
 
 class ChatMessage(BaseModel):
@@ -86,6 +86,14 @@ async def startup_event():
     else:
         logger.warning("DeepSeek API key not found in environment")
     
+    # Load the embedding model once up front so the first upload does not pay for it
+    try:
+        from services.embedding_service import EmbeddingService
+        EmbeddingService()
+        logger.info("Embedding model preloaded into the shared model registry")
+    except Exception as e:
+        logger.warning(f"Embedding model preload failed, it will load on first upload: {str(e)}")
+    
     # Log voice module status
     if VOICE_MODULE_AVAILABLE:
         logger.info("Voice module available - speech recognition and text-to-speech enabled")
@@ -111,6 +119,16 @@ async def root():
 async def shutdown_event():
     """Run on shutdown"""
     logger.info("Shutting down BhashaSetu application...")
+    from services.ingest_jobs import ingest_jobs
+    ingest_jobs.shutdown()
+    
+    # Query embeddings are written to the persistent cache in batches
+    from services.embedding_service import query_cache
+    query_cache.flush()
+    
+    from api.routes import deepseek_service
+    if deepseek_service is not None:
+        await deepseek_service.aclose()
 
 
 if __name__ == "__main__":
@@ -37,6 +37,15 @@ class SessionStore:
         self.sessions[session_id] = SessionData(session_id=session_id)
         return session_id
     
+    def restore_session(self, session_id: str, **kwargs) -> SessionData:
+        """Re-register a session whose documents are still indexed (e.g. after a restart)"""
+        session = SessionData(session_id=session_id)
+        for key, value in kwargs.items():
+            if hasattr(session, key):
+                setattr(session, key, value)
+        self.sessions[session_id] = session
+        return session
+    
     def get_session(self, session_id: str) -> SessionData:
         """Get session by ID"""
         return self.sessions.get(session_id)
@@ -0,0 +1,206 @@
+"""
+Answer Cache - Reuse answers to near-identical questions about the same document
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+import itertools
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedAnswer:
+    """An answer stored with the embedding of the question it answered"""
+    session_id: str
+    language: str
+    question: str
+    answer: str
+    embedding: np.ndarray
+    sources: List[Dict] = field(default_factory=list)
+    created_at: float = field(default_factory=time.monotonic)
+    similarity: float = 1.0
+
+
+class AnswerCache:
+    """Semantic cache of answers keyed by (session, language, question embedding)"""
+    
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 2000
+    ):
+        """
+        Initialize the answer cache
+        
+        Args:
+            similarity_threshold: Minimum cosine similarity for a question to reuse an answer
+            ttl_seconds: Seconds an answer stays valid
+            max_entries: Answers kept before the least recently used ones are evicted
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        # Every entry in LRU order, plus the entry IDs of each (session, language)
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, str], List[int]] = {}
+    
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def lookup(self, session_id: str, language: str, embedding: Sequence[float]) -> Optional[CachedAnswer]:
+        """
+        Find an answer to a near-identical question
+        
+        Args:
+            session_id: Session (document) the question is about
+            language: Requested answer language
+            embedding: Question embedding
+        
+        Returns:
+            Best cached answer above the similarity threshold, or None
+        """
+        query = self._normalize(embedding)
+        
+        with self._lock:
+            self._expire(session_id, language)
+            ids = self._buckets.get((session_id, language))
+            if not ids:
+                self.misses += 1
+                return None
+            
+            similarities = np.stack([self._entries[entry_id].embedding for entry_id in ids]) @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+            
+            entry_id = ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            entry = self._entries[entry_id]
+        
+        logger.info(f"[ANSWER_CACHE] ✓ Hit for session {session_id} (similarity {similarities[best]:.3f})")
+        return replace(entry, similarity=float(similarities[best]))
+    
+    def store(
+        self,
+        session_id: str,
+        language: str,
+        question: str,
+        embedding: Sequence[float],
+        answer: str,
+        sources: Optional[Sequence[Dict]] = None
+    ) -> None:
+        """
+        Cache an answer
+        
+        Args:
+            session_id: Session (document) the question is about
+            language: Answer language
+            question: Question text
+            embedding: Question embedding
+            answer: Generated answer
+            sources: Chunks the answer was generated from, returned again on a hit
+        """
+        if self.max_entries <= 0:
+            return
+        
+        entry = CachedAnswer(
+            session_id=session_id,
+            language=language,
+            question=question,
+            answer=answer,
+            embedding=self._normalize(embedding),
+            sources=[dict(source) for source in sources or []]
+        )
+        
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = entry
+            self._buckets.setdefault((session_id, language), []).append(entry_id)
+            
+            while len(self._entries) > self.max_entries:
+                oldest_id, oldest = self._entries.popitem(last=False)
+                self._remove_from_bucket(oldest_id, oldest)
+                self.evictions += 1
+    
+    def _remove_from_bucket(self, entry_id: int, entry: CachedAnswer) -> None:
+        key = (entry.session_id, entry.language)
+        ids = self._buckets.get(key)
+        if ids is None:
+            return
+        ids.remove(entry_id)
+        if not ids:
+            del self._buckets[key]
+    
+    def _expire(self, session_id: str, language: str) -> None:
+        """Drop expired answers of one bucket (caller holds the lock)"""
+        ids = self._buckets.get((session_id, language))
+        if not ids:
+            return
+        
+        cutoff = time.monotonic() - self.ttl_seconds
+        for entry_id in [entry_id for entry_id in ids if self._entries[entry_id].created_at < cutoff]:
+            self._remove_from_bucket(entry_id, self._entries.pop(entry_id))
+            self.expired += 1
+    
+    def invalidate(self, session_id: str) -> int:
+        """
+        Drop every cached answer of a session
+        
+        Args:
+            session_id: Session ID
+        
+        Returns:
+            Number of answers dropped
+        """
+        with self._lock:
+            keys = [key for key in self._buckets if key[0] == session_id]
+            dropped = 0
+            for key in keys:
+                for entry_id in self._buckets.pop(key):
+                    del self._entries[entry_id]
+                    dropped += 1
+        return dropped
+    
+    def get_stats(self) -> Dict:
+        """Return entry count, hit/miss counters and hit ratio"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "similarity_threshold": self.similarity_threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global answer cache instance
+answer_cache = AnswerCache(
+    similarity_threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+)
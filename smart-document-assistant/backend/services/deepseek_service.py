@@ -1,12 +1,17 @@
 """
 DeepSeek Service - Integration with DeepSeek API for LLM responses
 """
+import asyncio
 import requests
+import httpx
+import json
 import logging
-from typing import Optional
+import time
+from typing import AsyncIterator, Dict, Optional, Tuple
 import os
-from .language_detector import get_strict_language_instruction, validate_language_strict
+from .language_detector import LANGUAGE_PATTERNS, get_strict_language_instruction, validate_language_strict
 from .mock_responses import get_mock_response
+from .retry_policy import REPAIR_NONE, REPAIR_REGENERATE, CallRecord, RetryBudget, RetryPolicy, retry_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -14,22 +19,79 @@ logger = logging.getLogger(__name__)
 class DeepSeekService:
     """Handles communication with DeepSeek API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
         """
         Initialize DeepSeek service
         
         Args:
             api_key: DeepSeek API key (if not provided, uses env variable)
+            base_url: API root, e.g. a local stub server (default: DEEPSEEK_BASE_URL or the DeepSeek API)
+            max_concurrency: Completions in flight at once on the async path (default: DEEPSEEK_MAX_CONCURRENCY or 32)
+            timeout: Per-call deadline in seconds, including time spent waiting for a slot (default: DEEPSEEK_TIMEOUT or 30)
+            retry_policy: Transport retry and language repair limits (default: RetryPolicy.from_env())
         """
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
         
         if not self.api_key:
             raise ValueError("DEEPSEEK_API_KEY not provided or set in environment")
         
-        self.base_url = "https://api.deepseek.com/chat/completions"
+        api_root = base_url or os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+        self.api_root = api_root.rstrip('/')
+        self.base_url = f"{self.api_root}/chat/completions"
         self.model = "deepseek-chat"
         self.enable_fallback = True  # Enable fallback mode if API fails
-        self.max_language_validation_retries = 2  # Retry up to 2 times if wrong language detected
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        
+        self.max_concurrency = max_concurrency or int(os.getenv("DEEPSEEK_MAX_CONCURRENCY", "32"))
+        self.timeout = timeout or float(os.getenv("DEEPSEEK_TIMEOUT", "30"))
+        
+        # Keep-alive connections: the sync path reuses one session, the async
+        # path one pooled client created on first use inside the event loop
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    def _get_async_client(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """
+        Get the pooled async HTTP client and the concurrency limiter
+        
+        Returns:
+            Shared AsyncClient (HTTP/2, from httpx[http2]) and semaphore
+        """
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                ),
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            logger.info(f"[DEEPSEEK] Async HTTP/2 client ready (max_concurrency={self.max_concurrency})")
+        return self._async_client, self._semaphore
+    
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self._session.close()
     
     def _generate_fallback_response(self, prompt: str, context: str = "", language: str = "en") -> str:
         """
@@ -40,7 +102,7 @@ class DeepSeekService:
             prompt: User question
             context: Document context
             language: Target language (en, hi, mr)
-            
+        
         Returns:
             Language-appropriate response in the requested language
         """
@@ -64,17 +126,16 @@ class DeepSeekService:
         else:
             return "I don't have enough context to answer your question. Please check the document content."
     
-    def generate_response(
+    def _build_request(
         self,
         prompt: str,
-        context: str = "",
-        language: str = "en",
-        temperature: float = 0.7,
-        max_tokens: int = 1024,
-        retry_attempt: int = 1
-    ) -> Optional[str]:
+        context: str,
+        language: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Dict:
         """
-        Generate response from DeepSeek API with strict language enforcement
+        Build the chat-completions payload with strict language enforcement
         
         Args:
             prompt: User question
@@ -82,26 +143,15 @@ class DeepSeekService:
             language: Target language (en, hi, mr)
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
-            retry_attempt: Current retry attempt number
-            
+        
         Returns:
-            Response text or None if request fails
+            Chat-completions payload
         """
-        try:
-            # Validate inputs
-            if not prompt or not prompt.strip():
-                logger.error("[VALIDATE] Prompt is empty")
-                return None
-            
-            if not self.api_key:
-                logger.error("[VALIDATE] API key not available")
-                return None
-            
-            # Get strict language instruction
-            language_instruction = get_strict_language_instruction(language)
-            
-            # Prepare the system message with strict language enforcement
-            system_message = f"""You are a helpful assistant. Answer questions based on the provided context accurately and concisely.
+        # Get strict language instruction
+        language_instruction = get_strict_language_instruction(language)
+        
+        # Prepare the system message with strict language enforcement
+        system_message = f"""You are a helpful assistant. Answer questions based on the provided context accurately and concisely.
 
 {language_instruction}
 
@@ -109,34 +159,313 @@ Important rules:
 - Do NOT mention document chunks or references in your answer.
 - Provide a natural, flowing response.
 - NEVER mix languages - stick to {language} only."""
+
+        if context and context.strip():
+            system_message += f"\n\nContext from the document:\n{context}"
+        else:
+            logger.warning("[DEEPSEEK] No context provided for API call")
+        
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_message
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        
+        return payload
+    
+    def _build_repair_request(
+        self,
+        answer: str,
+        prompt: str,
+        context: str,
+        language: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Dict:
+        """
+        Build the payload that repairs an answer given in the wrong language
+        
+        In translate mode only the first answer is sent, with an instruction
+        to translate it, so the document context is not paid for again. In
+        regenerate mode the full question is asked again at a higher temperature.
+        
+        Args:
+            answer: Answer that failed language validation
+            prompt: User question
+            context: Document context/retrieved information
+            language: Target language (en, hi, mr)
+            temperature: Sampling temperature of the first attempt
+            max_tokens: Maximum tokens in response
+        
+        Returns:
+            Chat-completions payload
+        """
+        if self.retry_policy.language_repair == REPAIR_REGENERATE:
+            return self._build_request(prompt, context, language, min(temperature + 0.3, 1.5), max_tokens)
+        
+        language_name = LANGUAGE_PATTERNS.get(language, LANGUAGE_PATTERNS["en"])["name"]
+        system_message = f"""Translate the user's text into {language_name}. Keep the meaning, names and numbers unchanged.
+
+{get_strict_language_instruction(language)}
+
+Output only the translation."""
+
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_message
+                },
+                {
+                    "role": "user",
+                    "content": answer
+                }
+            ],
+            "temperature": 0.2,
+            "max_tokens": max_tokens
+        }
+    
+    @staticmethod
+    def _extract_answer(result: Dict) -> Optional[str]:
+        """
+        Extract the answer text from a chat-completions response
+        
+        Args:
+            result: Parsed chat-completions response
+        
+        Returns:
+            Answer text or None if the response has no choices
+        """
+        if "choices" not in result or len(result["choices"]) == 0:
+            logger.error(f"[DEEPSEEK] Unexpected response format: {result}")
+            return None
+        
+        answer = result["choices"][0]["message"]["content"]
+        logger.info(f"[DEEPSEEK] Answer extracted: {len(answer)} chars")
+        return answer
+    
+    @staticmethod
+    def _check_language(answer: str, language: str) -> bool:
+        """
+        Strictly validate the language of an answer
+        
+        Args:
+            answer: Answer text
+            language: Target language (en, hi, mr)
+        
+        Returns:
+            True if the answer is confidently in the target language
+        """
+        is_valid = validate_language_strict(answer, language, min_confidence=0.7)
+        
+        if is_valid:
+            logger.info(f"[DEEPSEEK] ✓ Language validation PASSED for {language}")
+        else:
+            logger.warning(f"[DEEPSEEK] ✗ Language validation FAILED - response appears to be in wrong language")
+        return is_valid
+    
+    def _should_repair(self, call: CallRecord, budget: RetryBudget) -> bool:
+        """
+        Decide whether a wrong-language answer gets another repair pass
+        
+        Args:
+            call: Calls made so far for this answer
+            budget: Remaining time budget
+        
+        Returns:
+            True if the policy and the budget allow a repair
+        """
+        policy = self.retry_policy
+        if policy.language_repair == REPAIR_NONE or call.repairs >= policy.max_language_repairs:
+            logger.error("[DEEPSEEK] No language repairs left, returning possibly wrong-language response")
+            return False
+        if budget.remaining() <= 0:
+            logger.error("[DEEPSEEK] Retry budget spent, returning possibly wrong-language response")
+            return False
+        
+        logger.info(
+            f"[DEEPSEEK] Repairing language by {policy.language_repair} "
+            f"(attempt {call.repairs + 1}/{policy.max_language_repairs})"
+        )
+        return True
+    
+    def _retry_delay(self, retry: int, budget: RetryBudget, error: Exception) -> Optional[float]:
+        """
+        Get the backoff before retrying a failed request
+        
+        Args:
+            retry: Retries already made for this request
+            budget: Remaining time budget
+            error: Transport or HTTP error that failed the request
+        
+        Returns:
+            Seconds to wait, or None if the request should not be retried
+        """
+        policy = self.retry_policy
+        if retry >= policy.max_transport_retries:
+            return None
+        
+        delay = policy.backoff(retry)
+        if not budget.allows(delay):
+            return None
+        
+        logger.warning(
+            f"[DEEPSEEK] {type(error).__name__}: {str(error)} - retrying in {delay:.2f}s "
+            f"({retry + 1}/{policy.max_transport_retries})"
+        )
+        return delay
+    
+    def _post(self, payload: Dict, budget: RetryBudget, call: CallRecord) -> Dict:
+        """
+        Send a chat-completions request, retrying transport errors with backoff
+        
+        Args:
+            payload: Chat-completions payload
+            budget: Time budget shared by every attempt for this answer
+            call: Record the attempts are counted in
+        
+        Returns:
+            Parsed response
+        
+        Raises:
+            requests.exceptions.RequestException: If retries or the budget run out
+        """
+        retry = 0
+        while True:
+            timeout = min(self.timeout, budget.remaining())
+            if timeout <= 0:
+                raise requests.exceptions.Timeout("Retry budget exhausted")
             
-            if context and context.strip():
-                system_message += f"\n\nContext from the document:\n{context}"
-            else:
-                logger.warning("[DEEPSEEK] No context provided for API call")
+            call.llm_calls += 1
+            try:
+                response = self._session.post(self.base_url, json=payload, timeout=timeout)
+                logger.info(f"[DEEPSEEK] Response status: {response.status_code}")
+                
+                if response.status_code != 200:
+                    logger.error(f"[DEEPSEEK] HTTP {response.status_code}: {response.text}")
+                    if response.status_code == 402:
+                        logger.warning("[DEEPSEEK] Insufficient balance")
+                
+                if not self.retry_policy.is_retryable_status(response.status_code):
+                    response.raise_for_status()
+                    return response.json()
+                error = requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                error = e
             
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+            delay = self._retry_delay(retry, budget, error)
+            if delay is None:
+                raise error
+            retry += 1
+            call.transport_retries += 1
+            time.sleep(delay)
+    
+    async def _apost(self, payload: Dict, budget: RetryBudget, call: CallRecord) -> Dict:
+        """
+        Async version of _post using the pooled client
+        
+        The per-attempt deadline covers waiting for a concurrency slot plus
+        the request itself.
+        
+        Args:
+            payload: Chat-completions payload
+            budget: Time budget shared by every attempt for this answer
+            call: Record the attempts are counted in
+        
+        Returns:
+            Parsed response
+        
+        Raises:
+            asyncio.TimeoutError, httpx.HTTPError: If retries or the budget run out
+        """
+        client, semaphore = self._get_async_client()
+        
+        async def post() -> httpx.Response:
+            async with semaphore:
+                return await client.post(self.base_url, json=payload)
+        
+        retry = 0
+        while True:
+            timeout = min(self.timeout, budget.remaining())
+            if timeout <= 0:
+                raise asyncio.TimeoutError("Retry budget exhausted")
+            
+            call.llm_calls += 1
+            try:
+                response = await asyncio.wait_for(post(), timeout=timeout)
+                logger.info(f"[DEEPSEEK] Response status: {response.status_code}")
+                
+                if response.status_code != 200:
+                    logger.error(f"[DEEPSEEK] HTTP {response.status_code}: {response.text}")
+                    if response.status_code == 402:
+                        logger.warning("[DEEPSEEK] Insufficient balance")
+                
+                if not self.retry_policy.is_retryable_status(response.status_code):
+                    response.raise_for_status()
+                    return response.json()
+                error = httpx.HTTPStatusError(
+                    f"HTTP {response.status_code}", request=response.request, response=response
+                )
+            except (asyncio.TimeoutError, httpx.TransportError) as e:
+                error = e
             
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": system_message
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "temperature": temperature,
-                "max_tokens": max_tokens
-            }
+            delay = self._retry_delay(retry, budget, error)
+            if delay is None:
+                raise error
+            retry += 1
+            call.transport_retries += 1
+            await asyncio.sleep(delay)
+    
+    def generate_response(
+        self,
+        prompt: str,
+        context: str = "",
+        language: str = "en",
+        temperature: float = 0.7,
+        max_tokens: int = 1024
+    ) -> Optional[str]:
+        """
+        Generate response from DeepSeek API with strict language enforcement
+        
+        Transport errors are retried with backoff and an answer in the wrong
+        language is repaired as configured by the retry policy, all within
+        the policy's total time budget.
+        
+        Args:
+            prompt: User question
+            context: Document context/retrieved information
+            language: Target language (en, hi, mr)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+        
+        Returns:
+            Response text or None if request fails
+        """
+        # Validate inputs
+        if not prompt or not prompt.strip():
+            logger.error("[VALIDATE] Prompt is empty")
+            return None
+        
+        if not self.api_key:
+            logger.error("[VALIDATE] API key not available")
+            return None
+        
+        call = CallRecord(language=language)
+        budget = self.retry_policy.start()
+        try:
+            payload = self._build_request(prompt, context, language, temperature, max_tokens)
             
-            logger.info(f"[DEEPSEEK] Attempt {retry_attempt}")
             logger.info(f"[DEEPSEEK] Model: {self.model}")
             logger.info(f"[DEEPSEEK] Language: {language}")
             logger.info(f"[DEEPSEEK] Payload size: {len(str(payload))} chars")
@@ -144,104 +473,219 @@ Important rules:
             
             # Make the API request
             logger.info("[DEEPSEEK] Sending request to DeepSeek API...")
-            response = requests.post(
-                self.base_url,
-                json=payload,
-                headers=headers,
-                timeout=30
-            )
-            
-            logger.info(f"[DEEPSEEK] Response status: {response.status_code}")
+            answer = self._extract_answer(self._post(payload, budget, call))
             
-            # Check for HTTP errors
-            if response.status_code != 200:
-                error_detail = response.text
-                logger.error(f"[DEEPSEEK] HTTP {response.status_code}: {error_detail}")
+            # STRICT LANGUAGE VALIDATION
+            call.language_valid = answer is not None and self._check_language(answer, language)
+            while answer is not None and not call.language_valid and self._should_repair(call, budget):
+                call.repairs += 1
+                repair_started = time.monotonic()
+                try:
+                    repair_payload = self._build_repair_request(answer, prompt, context, language, temperature, max_tokens)
+                    repaired = self._extract_answer(self._post(repair_payload, budget, call))
+                except requests.exceptions.RequestException as e:
+                    # The first answer is still usable, so keep it
+                    logger.error(f"[DEEPSEEK] Language repair failed: {str(e)}")
+                    repaired = None
+                finally:
+                    call.repair_seconds += time.monotonic() - repair_started
                 
-                # Check for specific errors
-                if response.status_code == 402:
-                    logger.warning("[DEEPSEEK] Insufficient balance - switching to fallback mode")
-                    if self.enable_fallback:
-                        logger.info("[DEEPSEEK] Generating fallback response...")
-                        return self._generate_fallback_response(prompt, context, language)
-                
-                response.raise_for_status()
-            
-            result = response.json()
-            logger.info(f"[DEEPSEEK] Response received: {len(str(result))} chars")
+                if repaired is None:
+                    break
+                answer = repaired
+                call.language_valid = self._check_language(answer, language)
             
-            # Extract response content
-            if "choices" in result and len(result["choices"]) > 0:
-                answer = result["choices"][0]["message"]["content"]
-                logger.info(f"[DEEPSEEK] Answer extracted: {len(answer)} chars")
-                
-                # STRICT LANGUAGE VALIDATION
-                is_valid = validate_language_strict(answer, language, min_confidence=0.7)
-                
-                if is_valid:
-                    logger.info(f"[DEEPSEEK] ✓ Language validation PASSED for {language}")
-                    return answer
-                else:
-                    logger.warning(f"[DEEPSEEK] ✗ Language validation FAILED")
-                    logger.warning(f"[DEEPSEEK] Response appears to be in wrong language")
-                    
-                    # Retry with increased strictness
-                    if retry_attempt < self.max_language_validation_retries:
-                        logger.info(f"[DEEPSEEK] Retrying with stricter prompt (attempt {retry_attempt + 1}/{self.max_language_validation_retries})")
-                        
-                        # Increase temperature slightly to encourage more distinct language
-                        retry_temp = min(temperature + 0.3, 1.5)
-                        return self.generate_response(
-                            prompt=prompt,
-                            context=context,
-                            language=language,
-                            temperature=retry_temp,
-                            max_tokens=max_tokens,
-                            retry_attempt=retry_attempt + 1
-                        )
-                    else:
-                        logger.error(f"[DEEPSEEK] Max retries reached, returning possibly wrong-language response")
-                        # Return anyway as fallback
-                        return answer
-                
-            logger.error(f"[DEEPSEEK] Unexpected response format: {result}")
-            return None
+            call.repaired = call.repairs > 0 and call.language_valid
         
         except requests.exceptions.Timeout:
-            logger.error("[DEEPSEEK] Request timeout (30 seconds)")
-            if self.enable_fallback:
-                logger.info("[DEEPSEEK] Using fallback response due to timeout")
-                return self._generate_fallback_response(prompt, context, language)
-            return None
+            logger.error(f"[DEEPSEEK] Request timeout ({self.timeout:g} seconds)")
+            reason = "timeout"
         except requests.exceptions.ConnectionError as e:
             logger.error(f"[DEEPSEEK] Connection error: {str(e)}")
-            if self.enable_fallback:
-                logger.info("[DEEPSEEK] Using fallback response due to connection error")
-                return self._generate_fallback_response(prompt, context, language)
-            return None
+            reason = "connection error"
         except requests.exceptions.HTTPError as e:
             logger.error(f"[DEEPSEEK] HTTP error: {str(e)}")
-            try:
-                logger.error(f"[DEEPSEEK] Response body: {e.response.text}")
-            except:
-                pass
-            if self.enable_fallback:
-                logger.info("[DEEPSEEK] Using fallback response due to HTTP error")
-                return self._generate_fallback_response(prompt, context, language)
-            return None
+            reason = "HTTP error"
         except requests.exceptions.RequestException as e:
             logger.error(f"[DEEPSEEK] Request failed: {str(e)}")
-            if self.enable_fallback:
-                logger.info("[DEEPSEEK] Using fallback response due to request error")
-                return self._generate_fallback_response(prompt, context, language)
-            return None
+            reason = "request error"
         except Exception as e:
             logger.error(f"[DEEPSEEK] Unexpected error: {str(e)}")
             logger.exception("Full traceback:")
-            if self.enable_fallback:
-                logger.info("[DEEPSEEK] Using fallback response due to unexpected error")
-                return self._generate_fallback_response(prompt, context, language)
+            reason = "unexpected error"
+        else:
+            retry_metrics.record(call)
+            return answer
+        
+        call.fallback = self.enable_fallback
+        retry_metrics.record(call)
+        if self.enable_fallback:
+            logger.info(f"[DEEPSEEK] Using fallback response due to {reason}")
+            return self._generate_fallback_response(prompt, context, language)
+        return None
+    
+    async def agenerate_response(
+        self,
+        prompt: str,
+        context: str = "",
+        language: str = "en",
+        temperature: float = 0.7,
+        max_tokens: int = 1024
+    ) -> Optional[str]:
+        """
+        Generate response without blocking the event loop
+        
+        Same behaviour as generate_response, but uses the pooled keep-alive
+        async client. At most max_concurrency completions are in flight.
+        
+        Args:
+            prompt: User question
+            context: Document context/retrieved information
+            language: Target language (en, hi, mr)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+        
+        Returns:
+            Response text or None if request fails
+        """
+        # Validate inputs
+        if not prompt or not prompt.strip():
+            logger.error("[VALIDATE] Prompt is empty")
             return None
+        
+        call = CallRecord(language=language)
+        budget = self.retry_policy.start()
+        try:
+            payload = self._build_request(prompt, context, language, temperature, max_tokens)
+            logger.info(f"[DEEPSEEK] Async request ({language}, {len(str(payload))} chars)")
+            
+            answer = self._extract_answer(await self._apost(payload, budget, call))
+            
+            call.language_valid = answer is not None and self._check_language(answer, language)
+            while answer is not None and not call.language_valid and self._should_repair(call, budget):
+                call.repairs += 1
+                repair_started = time.monotonic()
+                try:
+                    repair_payload = self._build_repair_request(answer, prompt, context, language, temperature, max_tokens)
+                    repaired = self._extract_answer(await self._apost(repair_payload, budget, call))
+                except (asyncio.TimeoutError, httpx.HTTPError) as e:
+                    # The first answer is still usable, so keep it
+                    logger.error(f"[DEEPSEEK] Language repair failed: {str(e)}")
+                    repaired = None
+                finally:
+                    call.repair_seconds += time.monotonic() - repair_started
+                
+                if repaired is None:
+                    break
+                answer = repaired
+                call.language_valid = self._check_language(answer, language)
+            
+            call.repaired = call.repairs > 0 and call.language_valid
+        
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            logger.error(f"[DEEPSEEK] Request deadline exceeded ({self.timeout:g} seconds)")
+            reason = "timeout"
+        except httpx.HTTPStatusError as e:
+            logger.error(f"[DEEPSEEK] HTTP error: {str(e)}")
+            reason = "HTTP error"
+        except httpx.TransportError as e:
+            logger.error(f"[DEEPSEEK] Connection error: {str(e)}")
+            reason = "connection error"
+        except Exception as e:
+            logger.error(f"[DEEPSEEK] Unexpected error: {str(e)}")
+            logger.exception("Full traceback:")
+            reason = "unexpected error"
+        else:
+            retry_metrics.record(call)
+            return answer
+        
+        call.fallback = self.enable_fallback
+        retry_metrics.record(call)
+        if self.enable_fallback:
+            logger.info(f"[DEEPSEEK] Using fallback response due to {reason}")
+            return self._generate_fallback_response(prompt, context, language)
+        return None
+    
+    async def astream_response(
+        self,
+        prompt: str,
+        context: str = "",
+        language: str = "en",
+        temperature: float = 0.7,
+        max_tokens: int = 1024
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response token by token (chat-completions with stream=true)
+        
+        Language is not validated here because tokens are forwarded as they
+        arrive; callers check the accumulated text. If the request fails
+        before any token was produced, the fallback response is yielded
+        instead when fallback is enabled.
+        
+        Args:
+            prompt: User question
+            context: Document context/retrieved information
+            language: Target language (en, hi, mr)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+        
+        Yields:
+            Content deltas as they arrive
+        """
+        if not prompt or not prompt.strip():
+            logger.error("[VALIDATE] Prompt is empty")
+            return
+        
+        payload = self._build_request(prompt, context, language, temperature, max_tokens)
+        payload["stream"] = True
+        client, semaphore = self._get_async_client()
+        
+        produced = False
+        reason = None
+        try:
+            logger.info(f"[DEEPSEEK] Streaming request ({language}, {len(str(payload))} chars)")
+            # The deadline bounds the wait for a free slot; httpx's timeout bounds each read
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.timeout)
+            try:
+                async with client.stream("POST", self.base_url, json=payload) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", errors="replace")
+                        logger.error(f"[DEEPSEEK] HTTP {response.status_code}: {body}")
+                        response.raise_for_status()
+                    
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        
+                        choices = json.loads(data).get("choices") or [{}]
+                        token = (choices[0].get("delta") or {}).get("content")
+                        if token:
+                            produced = True
+                            yield token
+            finally:
+                semaphore.release()
+            logger.info("[DEEPSEEK] ✓ Stream finished")
+            return
+        
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            logger.error(f"[DEEPSEEK] Stream deadline exceeded ({self.timeout:g} seconds)")
+            reason = "timeout"
+        except httpx.HTTPStatusError as e:
+            logger.error(f"[DEEPSEEK] HTTP error: {str(e)}")
+            reason = "HTTP error"
+        except httpx.TransportError as e:
+            logger.error(f"[DEEPSEEK] Connection error: {str(e)}")
+            reason = "connection error"
+        
+        if produced:
+            # Part of the answer already reached the client; it cannot be swapped out
+            raise RuntimeError(f"Stream interrupted by {reason}")
+        if self.enable_fallback:
+            logger.info(f"[DEEPSEEK] Using fallback response due to {reason}")
+            yield self._generate_fallback_response(prompt, context, language)
     
     def test_connection(self) -> bool:
         """
@@ -265,7 +709,26 @@ Important rules:
             else:
                 logger.error("[TEST_CONNECTION] ✗ Connection failed - no response")
                 return False
-                
+        
         except Exception as e:
             logger.error(f"[TEST_CONNECTION] Connection test failed: {str(e)}")
             return False
+    
+    async def atest_connection(self) -> bool:
+        """
+        Probe the DeepSeek API without blocking the event loop
+        
+        Lists the available models instead of running a completion, so the
+        probe costs no tokens and stays out of retry_metrics.
+        
+        Returns:
+            True if the API answered the probe
+        """
+        try:
+            client, _ = self._get_async_client()
+            response = await client.get(f"{self.api_root}/models", timeout=5.0)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.error(f"[TEST_CONNECTION] Connection probe failed: {str(e)}")
+            return False
@@ -0,0 +1,22 @@
+"""
+Embedding Cache - Persistent content-addressed cache for chunk embeddings
+
+The implementation is shared with the rag_pipeline library, which sits next
+to smart-document-assistant/ in the repository. Importing it loads only
+numpy, not FAISS.
+"""
+from pathlib import Path
+import sys
+
+RAG_PIPELINE_ROOT = Path(__file__).resolve().parents[3] / "rag_pipeline"
+if str(RAG_PIPELINE_ROOT) not in sys.path:
+    sys.path.insert(0, str(RAG_PIPELINE_ROOT))
+
+from rag_pipeline.embedding_cache import (  # noqa: E402
+    EmbeddingCache,
+    QueryEmbeddingCache,
+    cache_key,
+    normalize_text
+)
+
+__all__ = ["EmbeddingCache", "QueryEmbeddingCache", "cache_key", "normalize_text"]
@@ -1,11 +1,65 @@
 """
 Embedding Service - Generate embeddings using Sentence Transformers
 """
-from typing import List
+from typing import Dict, List, Optional
 import logging
+import os
+import threading
+
+import numpy as np
+
+from .embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from .model_registry import model_registry
 
 logger = logging.getLogger(__name__)
 
+# Set EMBEDDING_CACHE_DIR to an empty string to disable the persistent cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "embedding_cache")
+
+# Shared by every EmbeddingService so hot questions stay cached across sessions
+query_cache = QueryEmbeddingCache(max_entries=int(os.getenv("QUERY_CACHE_SIZE", "1024")))
+
+# One persistent cache per model; worker processes share its files and take turns writing
+_embedding_caches: Dict[str, Optional[EmbeddingCache]] = {}
+_embedding_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str, dimension: int) -> Optional[EmbeddingCache]:
+    """
+    Get the process-wide persistent embedding cache for a model
+    
+    Args:
+        model_name: Embedding model name
+        dimension: Embedding dimension
+    
+    Returns:
+        Shared EmbeddingCache, or None when caching is disabled or unavailable
+    """
+    with _embedding_caches_lock:
+        if model_name in _embedding_caches:
+            return _embedding_caches[model_name]
+        
+        cache = None
+        cache_dir = os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if cache_dir:
+            try:
+                cache = EmbeddingCache(
+                    # Models get their own subdirectory so switching models keeps both caches
+                    os.path.join(cache_dir, model_name.replace("/", "__")),
+                    model_name=model_name,
+                    dimension=dimension,
+                    dtype=os.getenv("EMBEDDING_CACHE_DTYPE", "float32"),
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+                )
+            except Exception as e:
+                # The cache is an optimisation; embedding still works without it
+                logger.warning(f"[EMBEDDING] Embedding cache disabled: {str(e)}")
+        
+        if cache is not None:
+            logger.info(f"[EMBED_CACHE] Opened {cache.cache_dir} ({len(cache)} entries, {cache.dtype})")
+        _embedding_caches[model_name] = cache
+        return cache
+
 
 class EmbeddingService:
     """Handles text embedding generation"""
@@ -18,32 +72,43 @@ class EmbeddingService:
             model_name: Name of the Sentence Transformer model to use
         """
         try:
-            # Lazy import to avoid tensorflow issues
-            from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer(model_name)
-            logger.info(f"Loaded embedding model: {model_name}")
+            self.model = model_registry.get_embedding_model(model_name)
         except Exception as e:
             logger.error(f"Error loading embedding model: {str(e)}")
             raise
+        
+        self.model_name = model_name
+        self.cache = get_embedding_cache(model_name, self.model.get_sentence_embedding_dimension())
+        
+        # Inputs longer than max_seq_length tokens are silently truncated by the model
+        self.tokenizer = getattr(self.model, "tokenizer", None)
+        self.max_seq_length = getattr(self.model, "max_seq_length", None)
+        
+        if query_cache.shared is None:
+            query_cache.shared = self.cache
     
-    def embed_text(self, text: str) -> List[float]:
+    def embed_query(self, query: str) -> List[float]:
         """
-        Generate embedding for a single text
+        Generate embedding for a user query, reusing cached embeddings of repeated questions
         
         Args:
-            text: Text to embed
-            
+            query: User query
+        
         Returns:
             Embedding vector
         """
+        embedding = query_cache.get(query, model_name=self.model_name)
+        if embedding is not None:
+            logger.info("[EMBEDDING] ✓ Query embedding served from cache")
+            return embedding.tolist()
+        
         try:
-            logger.info(f"[EMBEDDING] Embedding text: {len(text)} chars")
-            embedding = self.model.encode(text)
-            result = embedding.tolist()
-            logger.info(f"[EMBEDDING] ✓ Embedding generated: {len(result)} dimensions")
-            return result
+            logger.info(f"[EMBEDDING] Embedding query: {len(query)} chars")
+            embedding = self.model.encode(query)
+            query_cache.put(query, embedding, model_name=self.model_name)
+            return embedding.tolist()
         except Exception as e:
-            logger.error(f"[EMBEDDING] Error generating embedding: {str(e)}")
+            logger.error(f"[EMBEDDING] Error generating query embedding: {str(e)}")
             raise
     
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
@@ -52,7 +117,7 @@ class EmbeddingService:
         
         Args:
             texts: List of texts to embed
-            
+        
         Returns:
             List of embedding vectors
         """
@@ -61,7 +126,10 @@ class EmbeddingService:
             total_chars = sum(len(t) for t in texts)
             logger.info(f"[EMBEDDING] Total characters: {total_chars}")
             
-            embeddings = self.model.encode(texts)
+            if self.cache is None:
+                embeddings = self.model.encode(texts)
+            else:
+                embeddings = self._embed_with_cache(texts)
             result = [emb.tolist() for emb in embeddings]
             
             logger.info(f"[EMBEDDING] ✓ Generated {len(result)} embeddings of {len(result[0]) if result else 0} dimensions each")
@@ -69,3 +137,66 @@ class EmbeddingService:
         except Exception as e:
             logger.error(f"[EMBEDDING] Error generating embeddings: {str(e)}")
             raise
+    
+    def _embed_with_cache(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed texts, running the model only for texts missing from the cache
+        
+        Args:
+            texts: List of texts to embed
+        
+        Returns:
+            Embedding vectors in input order
+        """
+        embeddings = self.cache.get_many(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        logger.info(f"[EMBEDDING] Cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        
+        if missing:
+            fresh = self.model.encode([texts[i] for i in missing])
+            self.cache.put_many([texts[i] for i in missing], fresh)
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+        
+        return embeddings
+    
+    @property
+    def max_tokens(self) -> Optional[int]:
+        """Tokens a chunk may hold besides the model's special tokens, or None without a tokenizer"""
+        if self.tokenizer is None or not self.max_seq_length:
+            return None
+        return self.max_seq_length - self.tokenizer.num_special_tokens_to_add(pair=False)
+    
+    def supports_token_chunking(self) -> bool:
+        """Check whether chunks can be cut on token offsets (needs a fast tokenizer)"""
+        return self.max_tokens is not None and getattr(self.tokenizer, "is_fast", False)
+    
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """
+        Count the tokens the model sees for each text, in one batched tokenizer call
+        
+        Args:
+            texts: Texts to measure
+        
+        Returns:
+            Token counts including special tokens
+        """
+        if self.tokenizer is None or not texts:
+            return []
+        encoded = self.tokenizer(texts, add_special_tokens=True, verbose=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def count_truncated(self, texts: List[str]) -> int:
+        """Return how many texts are longer than the model's max sequence length"""
+        if not self.max_seq_length:
+            return 0
+        return sum(count > self.max_seq_length for count in self.count_tokens(texts))
+    
+    def get_cache_stats(self) -> Optional[Dict]:
+        """Return embedding cache counters, or None when the cache is disabled"""
+        return self.cache.get_stats() if self.cache is not None else None
+
+
+def get_query_cache_stats() -> Dict:
+    """Return query embedding cache counters for the health endpoint"""
+    return query_cache.get_stats()
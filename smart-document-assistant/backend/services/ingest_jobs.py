@@ -0,0 +1,154 @@
+"""
+Ingest Jobs - Bounded background pool for CPU-bound document ingestion
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from collections import OrderedDict
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class IngestQueueFullError(Exception):
+    """Raised when the ingest pool already has its maximum number of jobs in flight"""
+    pass
+
+
+@dataclass
+class IngestJob:
+    job_id: str
+    document_name: str = ""
+    status: str = QUEUED
+    stage: str = ""
+    pages_processed: int = 0
+    chunks_indexed: int = 0
+    truncated_chunks: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    
+    @property
+    def in_progress(self) -> bool:
+        return self.status in (QUEUED, PROCESSING)
+    
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "document_name": self.document_name,
+            "status": self.status,
+            "stage": self.stage,
+            "pages_processed": self.pages_processed,
+            "chunks_indexed": self.chunks_indexed,
+            "truncated_chunks": self.truncated_chunks,
+            "truncated_pct": round(100 * self.truncated_chunks / self.chunks_indexed, 2) if self.chunks_indexed else 0.0,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class IngestJobManager:
+    """Runs ingest jobs off the event loop with a hard cap on jobs in flight"""
+    
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, max_finished: int = 1000):
+        """
+        Initialize the ingest pool
+        
+        Args:
+            max_workers: Jobs processed concurrently
+            max_pending: Jobs allowed in flight (running + queued) before uploads are rejected
+            max_finished: Finished jobs whose status is kept for polling
+        """
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.max_finished = max_finished
+        
+        # Threads rather than processes: the embedding model is loaded once per
+        # process by the model registry, and torch / pdfminer release the GIL
+        # for most of their work
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+    
+    def submit(self, job_id: str, fn: Callable[[IngestJob], None], document_name: str = "") -> IngestJob:
+        """
+        Queue an ingest job
+        
+        Args:
+            job_id: Job ID (the upload's session ID)
+            fn: Work to run; receives the job so it can report its stage
+            document_name: Name of the uploaded document
+        
+        Returns:
+            The queued job
+        
+        Raises:
+            IngestQueueFullError: If max_pending jobs are already in flight
+        """
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                raise IngestQueueFullError(
+                    f"{self._in_flight} documents are already being processed. Please retry shortly."
+                )
+            self._in_flight += 1
+            job = IngestJob(job_id=job_id, document_name=document_name)
+            self._jobs[job_id] = job
+        
+        logger.info(f"[INGEST] Queued job {job_id} ({document_name})")
+        self._executor.submit(self._run, job, fn)
+        return job
+    
+    def _run(self, job: IngestJob, fn: Callable[[IngestJob], None]) -> None:
+        job.status = PROCESSING
+        try:
+            fn(job)
+            job.status = COMPLETED
+            logger.info(f"[INGEST] ✓ Job {job.job_id} completed")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"[INGEST] Job {job.job_id} failed: {str(e)}")
+        finally:
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._in_flight -= 1
+                self._prune()
+    
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond max_finished"""
+        finished = [job_id for job_id, job in self._jobs.items() if not job.in_progress]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+    
+    def get_job(self, job_id: str) -> Optional[IngestJob]:
+        """Get a job by ID"""
+        return self._jobs.get(job_id)
+    
+    def get_stats(self) -> Dict:
+        """Return pool size and jobs in flight"""
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight
+        }
+    
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for running jobs"""
+        self._executor.shutdown(wait=True)
+
+
+# Global ingest pool instance
+ingest_jobs = IngestJobManager(
+    max_workers=int(os.getenv("INGEST_WORKERS", "2")),
+    max_pending=int(os.getenv("INGEST_MAX_PENDING", "8"))
+)
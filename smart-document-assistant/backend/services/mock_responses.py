@@ -77,5 +77,15 @@ def enable_mock_mode(service):
         logger.info(f"[MOCK] Response length: {len(response)} characters")
         return response
     
+    async def mocked_agenerate(prompt, context="", language="en", **kwargs):
+        """Mock implementation of agenerate_response"""
+        return mocked_generate(prompt, context, language, **kwargs)
+    
+    async def mocked_astream(prompt, context="", language="en", **kwargs):
+        """Mock implementation of astream_response (yields the whole answer at once)"""
+        yield mocked_generate(prompt, context, language, **kwargs)
+    
     service.generate_response = mocked_generate
+    service.agenerate_response = mocked_agenerate
+    service.astream_response = mocked_astream
     logger.info("[MOCK_MODE] Service ready - using mock responses for all API calls")
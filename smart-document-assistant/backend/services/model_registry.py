@@ -0,0 +1,119 @@
+"""
+Model Registry - Process-wide cache of loaded embedding models
+"""
+from typing import Any, Dict
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Loads each embedding model once and shares it across sessions and pipelines"""
+    
+    def __init__(self):
+        """Initialize an empty registry"""
+        self._models: Dict[str, Any] = {}
+        self._info: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+    
+    def get_embedding_model(self, model_name: str):
+        """
+        Get a loaded Sentence Transformer model, loading it on first use
+        
+        Args:
+            model_name: Name of the Sentence Transformer model
+        
+        Returns:
+            Shared SentenceTransformer instance
+        """
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+        
+        with self._lock:
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+        
+        # Concurrent first requests for the same model wait for a single load
+        with load_lock:
+            model = self._models.get(model_name)
+            if model is not None:
+                return model
+            
+            # Lazy import to avoid tensorflow issues
+            from sentence_transformers import SentenceTransformer
+            
+            logger.info(f"[MODEL_REGISTRY] Loading embedding model: {model_name}")
+            start = time.perf_counter()
+            model = SentenceTransformer(model_name)
+            load_seconds = time.perf_counter() - start
+            
+            memory_bytes = self._model_memory_bytes(model)
+            self._info[model_name] = {
+                "model_name": model_name,
+                "load_seconds": round(load_seconds, 3),
+                "memory_mb": round(memory_bytes / (1024 * 1024), 2),
+                "dimension": model.get_sentence_embedding_dimension()
+            }
+            self._models[model_name] = model
+            logger.info(
+                f"[MODEL_REGISTRY] ✓ Loaded {model_name} in {load_seconds:.2f}s "
+                f"({self._info[model_name]['memory_mb']} MB)"
+            )
+            return model
+    
+    @staticmethod
+    def _model_memory_bytes(model) -> int:
+        """
+        Estimate the memory held by a model's weights
+        
+        Args:
+            model: Loaded torch module
+        
+        Returns:
+            Bytes used by parameters and buffers
+        """
+        try:
+            tensors = list(model.parameters()) + list(model.buffers())
+            return sum(t.numel() * t.element_size() for t in tensors)
+        except Exception as e:
+            logger.warning(f"[MODEL_REGISTRY] Could not measure model memory: {str(e)}")
+            return 0
+    
+    def is_loaded(self, model_name: str) -> bool:
+        """Check whether a model is already loaded"""
+        return model_name in self._models
+    
+    def get_stats(self) -> Dict:
+        """
+        Report loaded models and their memory
+        
+        Returns:
+            Per-model load time and memory plus the total
+        """
+        models = [dict(info) for info in self._info.values()]
+        return {
+            "loaded_models": len(models),
+            "total_memory_mb": round(sum(info["memory_mb"] for info in models), 2),
+            "models": models
+        }
+    
+    def unload(self, model_name: str) -> bool:
+        """
+        Drop a model from the registry
+        
+        Args:
+            model_name: Name of the model to unload
+        
+        Returns:
+            True if the model was loaded
+        """
+        with self._lock:
+            self._info.pop(model_name, None)
+            return self._models.pop(model_name, None) is not None
+
+
+# Global model registry instance
+model_registry = ModelRegistry()
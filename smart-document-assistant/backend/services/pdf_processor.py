@@ -2,7 +2,8 @@
 PDF Processing Service - Extract text from PDF files
 """
 import pdfplumber
-from typing import Optional
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,6 +12,41 @@ logger = logging.getLogger(__name__)
 class PDFProcessor:
     """Handles PDF text extraction and processing"""
     
+    @staticmethod
+    def iter_pages(file_path: str) -> Iterator[str]:
+        """
+        Extract text from a PDF file one page at a time
+        
+        Each page's parsed layout is released once its text is extracted, so
+        memory does not grow with the number of pages.
+        
+        Args:
+            file_path: Path to the PDF file
+        
+        Yields:
+            Text of each page that has any
+        """
+        for _, page_text in PDFProcessor.iter_numbered_pages(file_path):
+            yield page_text
+    
+    @staticmethod
+    def iter_numbered_pages(file_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Like iter_pages, but with the 1-based number of each page
+        
+        Args:
+            file_path: Path to the PDF file
+        
+        Yields:
+            (page number, text) of each page that has any
+        """
+        with pdfplumber.open(file_path) as pdf:
+            for page_number, page in enumerate(pdf.pages, 1):
+                page_text = page.extract_text()
+                page.flush_cache()
+                if page_text:
+                    yield page_number, page_text
+    
     @staticmethod
     def extract_text(file_path: str) -> Optional[str]:
         """
@@ -18,19 +54,13 @@ class PDFProcessor:
         
         Args:
             file_path: Path to the PDF file
-            
+        
         Returns:
             Extracted text or None if extraction fails
         """
         try:
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            return text.strip() if text else None
+            text = "\n".join(PDFProcessor.iter_pages(file_path))
+            return text.strip() or None
         
         except Exception as e:
             logger.error(f"Error extracting PDF text: {str(e)}")
@@ -43,7 +73,7 @@ class PDFProcessor:
         
         Args:
             text: Raw extracted text
-            
+        
         Returns:
             Cleaned text
         """
@@ -67,7 +97,7 @@ class PDFProcessor:
             text: Text to chunk
             chunk_size: Size of each chunk
             overlap: Overlap between chunks
-            
+        
         Returns:
             List of text chunks
         """
@@ -81,3 +111,174 @@ class PDFProcessor:
             start = end - overlap
         
         return chunks
+    
+    @staticmethod
+    def chunk_stream(texts: Iterable[str], chunk_size: int = 500, overlap: int = 50) -> Iterator[str]:
+        """
+        Split text arriving in pieces (e.g. cleaned pages) into overlapping chunks
+        
+        Produces the same chunks as chunk_text on the pieces joined with
+        newlines, but only keeps the text that has not been chunked yet.
+        
+        Args:
+            texts: Text pieces in document order
+            chunk_size: Size of each chunk
+            overlap: Overlap between chunks
+        
+        Yields:
+            Text chunks
+        """
+        for chunk in PDFProcessor.chunk_pages(enumerate(texts, 1), chunk_size, overlap):
+            yield chunk["text"]
+    
+    @staticmethod
+    def chunk_pages(
+        pages: Iterable[Tuple[int, str]],
+        chunk_size: int = 500,
+        overlap: int = 50
+    ) -> Iterator[Dict]:
+        """
+        Split numbered pages into overlapping chunks that know where they came from
+        
+        Chunks are the same as chunk_stream's; offsets are into the page texts
+        joined with newlines.
+        
+        Args:
+            pages: (page number, text) pairs in document order
+            chunk_size: Size of each chunk
+            overlap: Overlap between chunks
+        
+        Yields:
+            Dicts with text, page_start, page_end, start and end
+        """
+        step = chunk_size - overlap
+        buffer = ""
+        buffer_offset = 0
+        first = True
+        
+        # Document offsets where pages begin, trimmed to those the buffer still covers
+        page_offsets = []
+        page_numbers = []
+        
+        def make_chunk(start: int, end: int) -> Dict:
+            first_page = bisect_right(page_offsets, buffer_offset + start) - 1
+            last_page = bisect_right(page_offsets, buffer_offset + end - 1) - 1
+            return {
+                "text": buffer[start:end],
+                "page_start": page_numbers[first_page],
+                "page_end": page_numbers[last_page],
+                "start": buffer_offset + start,
+                "end": buffer_offset + end
+            }
+        
+        for page_number, text in pages:
+            if not first:
+                buffer += "\n"
+            first = False
+            page_offsets.append(buffer_offset + len(buffer))
+            page_numbers.append(page_number)
+            buffer += text
+            
+            # Emit every chunk that is complete, then drop the text behind the next start
+            start = 0
+            while len(buffer) - start >= chunk_size:
+                yield make_chunk(start, start + chunk_size)
+                start += step
+            buffer = buffer[start:]
+            buffer_offset += start
+            
+            keep = max(bisect_right(page_offsets, buffer_offset) - 1, 0)
+            del page_offsets[:keep], page_numbers[:keep]
+        
+        start = 0
+        while start < len(buffer):
+            yield make_chunk(start, min(start + chunk_size, len(buffer)))
+            start += step
+    
+    @staticmethod
+    def chunk_token_pages(
+        pages: Iterable[Tuple[int, str]],
+        tokenizer,
+        max_tokens: int = 254,
+        overlap: int = 32
+    ) -> Iterator[Dict]:
+        """
+        Split numbered pages into overlapping windows of model tokens
+        
+        Each chunk holds at most max_tokens tokens of the embedding model's
+        tokenizer, so none is truncated when embedded. Pages are tokenized as
+        they arrive; the untokenized tail is carried from a word start so
+        tokens are not split differently across pages.
+        
+        Args:
+            pages: (page number, text) pairs in document order
+            tokenizer: Fast (Rust) Hugging Face tokenizer of the embedding model
+            max_tokens: Tokens per chunk, excluding the model's special tokens
+            overlap: Tokens shared by consecutive chunks
+        
+        Yields:
+            Dicts with text, page_start, page_end, start and end, like chunk_pages
+        """
+        if max_tokens <= 0 or not 0 <= overlap < max_tokens:
+            raise ValueError("overlap must be less than max_tokens")
+        
+        step = max_tokens - overlap
+        buffer = ""
+        buffer_offset = 0
+        first = True
+        # Buffer offset of the next chunk's first token, and document offset where the last chunk ended
+        pending = 0
+        last_end = 0
+        
+        page_offsets = []
+        page_numbers = []
+        
+        def make_chunk(start: int, end: int) -> Dict:
+            first_page = bisect_right(page_offsets, buffer_offset + start) - 1
+            last_page = bisect_right(page_offsets, buffer_offset + end - 1) - 1
+            return {
+                "text": buffer[start:end],
+                "page_start": page_numbers[first_page],
+                "page_end": page_numbers[last_page],
+                "start": buffer_offset + start,
+                "end": buffer_offset + end
+            }
+        
+        def token_spans() -> list:
+            spans = tokenizer(buffer, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+            return [span for span in spans["offset_mapping"] if span[1] > span[0]]
+        
+        for page_number, text in pages:
+            if not first:
+                buffer += "\n"
+            first = False
+            page_offsets.append(buffer_offset + len(buffer))
+            page_numbers.append(page_number)
+            buffer += text
+            
+            # Pages end on a line break, so every token in the buffer is final
+            spans = token_spans()
+            i = next((idx for idx, span in enumerate(spans) if span[0] >= pending), len(spans))
+            while i + max_tokens <= len(spans):
+                chunk = make_chunk(spans[i][0], spans[i + max_tokens - 1][1])
+                last_end = chunk["end"]
+                yield chunk
+                i += step
+            pending = spans[i][0] if i < len(spans) else len(buffer)
+            
+            # Keep the buffer from the start of the word holding the next chunk's first token
+            cut = pending
+            while cut > 0 and not buffer[cut - 1].isspace():
+                cut -= 1
+            buffer = buffer[cut:]
+            buffer_offset += cut
+            pending -= cut
+            
+            keep = max(bisect_right(page_offsets, buffer_offset) - 1, 0)
+            del page_offsets[:keep], page_numbers[:keep]
+        
+        # The last, shorter chunk, unless the previous one already reached the end
+        spans = token_spans()
+        i = next((idx for idx, span in enumerate(spans) if span[0] >= pending), len(spans))
+        if i < len(spans) and buffer_offset + spans[-1][1] > last_end:
+            yield make_chunk(spans[i][0], spans[-1][1])
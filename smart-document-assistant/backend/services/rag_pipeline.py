@@ -3,112 +3,185 @@ RAG Pipeline Service - Complete RAG pipeline implementation
 """
 import chromadb
 from chromadb.config import Settings
-from typing import List, Tuple, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
+import os
+import threading
 from .embedding_service import EmbeddingService
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PERSIST_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "chroma_db")
+COLLECTION_NAME = os.getenv("CHROMA_COLLECTION", "documents")
+
+_client = None
+_collection = None
+_client_lock = threading.Lock()
+
+
+def get_shared_collection():
+    """
+    Get the persistent collection shared by every session
+    
+    All sessions live in one collection and are told apart by the
+    ``session_id`` metadata field, so a single HNSW index serves every
+    upload and indexed documents survive a restart.
+    
+    Returns:
+        ChromaDB collection
+    """
+    global _client, _collection
+    if _collection is not None:
+        return _collection
+    
+    with _client_lock:
+        if _collection is None:
+            persist_dir = os.getenv("CHROMA_PERSIST_DIR", DEFAULT_PERSIST_DIR)
+            _client = chromadb.PersistentClient(
+                path=persist_dir,
+                settings=Settings(anonymized_telemetry=False)
+            )
+            _collection = _client.get_or_create_collection(
+                name=COLLECTION_NAME,
+                metadata={"hnsw:space": "cosine"}
+            )
+            logger.info(f"[RAG] Opened persistent collection '{COLLECTION_NAME}' at {persist_dir}")
+    return _collection
+
 
 class RAGPipeline:
-    """Complete RAG pipeline with ChromaDB"""
+    """RAG pipeline over one session's chunks in the shared ChromaDB collection"""
     
-    def __init__(self):
-        """Initialize RAG pipeline"""
+    def __init__(self, session_id: str):
+        """
+        Initialize RAG pipeline
+        
+        Args:
+            session_id: Session whose chunks this pipeline reads and writes
+        """
+        self.session_id = session_id
         self.embedding_service = EmbeddingService()
+        self.collection = get_shared_collection()
+    
+    @staticmethod
+    def session_exists(session_id: str) -> bool:
+        """
+        Check whether a session has indexed chunks (e.g. from before a restart)
+        
+        Args:
+            session_id: Session ID
         
-        # Create in-memory ChromaDB client
-        self.client = chromadb.Client()
-        self.collection = None
+        Returns:
+            True if the shared collection holds chunks for the session
+        """
+        return RAGPipeline.get_session_metadata(session_id) is not None
     
-    def create_collection(self, collection_name: str = "documents") -> None:
+    @staticmethod
+    def get_session_metadata(session_id: str) -> Optional[dict]:
         """
-        Create or get a ChromaDB collection
+        Get the metadata stored with a session's first chunk
         
         Args:
-            collection_name: Name of the collection
+            session_id: Session ID
+        
+        Returns:
+            Chunk metadata, or None if the session has no chunks
         """
-        try:
-            # Delete existing collection if it exists
-            try:
-                self.client.delete_collection(name=collection_name)
-            except Exception:
-                pass
-            
-            # Create new collection
-            self.collection = self.client.create_collection(
-                name=collection_name,
-                metadata={"hnsw:space": "cosine"}
-            )
-            logger.info(f"Created collection: {collection_name}")
-        except Exception as e:
-            logger.error(f"Error creating collection: {str(e)}")
-            raise
+        result = get_shared_collection().get(
+            where={"session_id": session_id},
+            limit=1,
+            include=["metadatas"]
+        )
+        if result and result.get("metadatas"):
+            return result["metadatas"][0]
+        return None
     
-    def add_documents(self, chunks: List[str], metadata: Optional[List[dict]] = None) -> None:
+    def add_documents(
+        self,
+        chunks: List[str],
+        metadata: Optional[List[dict]] = None,
+        document_name: str = "",
+        start_index: int = 0
+    ) -> None:
         """
         Add documents/chunks to the RAG pipeline
         
         Args:
             chunks: List of text chunks
-            metadata: Optional metadata for each chunk
+            metadata: Optional metadata for each chunk (e.g. page_start, page_end,
+                start and end from PDFProcessor.chunk_pages)
+            document_name: Name of the source document
+            start_index: Position of the first chunk in the document, when adding it in batches
         """
-        if not self.collection:
-            self.create_collection()
-        
         try:
             # Generate embeddings
             embeddings = self.embedding_service.embed_texts(chunks)
             
-            # Prepare metadata
+            # Prepare metadata; session_id is what scopes retrieval to this session
             if not metadata:
-                metadata = [{"chunk_id": i} for i in range(len(chunks))]
+                metadata = [{} for _ in chunks]
+            metadata = [
+                {"chunk_id": start_index + i, **meta, "session_id": self.session_id, "document_name": document_name}
+                for i, meta in enumerate(metadata)
+            ]
             
             # Add to ChromaDB
             self.collection.add(
-                ids=[f"chunk_{i}" for i in range(len(chunks))],
+                ids=[f"{self.session_id}_chunk_{start_index + i}" for i in range(len(chunks))],
                 embeddings=embeddings,
                 documents=chunks,
                 metadatas=metadata
             )
             
-            logger.info(f"Added {len(chunks)} chunks to pipeline")
+            logger.info(f"Added {len(chunks)} chunks to pipeline for session {self.session_id}")
         except Exception as e:
             logger.error(f"Error adding documents: {str(e)}")
             raise
     
-    def retrieve_similar_chunks(
+    def _where(self, pages: Optional[Tuple[int, int]] = None) -> Dict:
+        """Chroma filter for this session, optionally limited to chunks overlapping a page range"""
+        if pages is None:
+            return {"session_id": self.session_id}
+        first, last = pages
+        return {"$and": [
+            {"session_id": self.session_id},
+            {"page_start": {"$lte": last}},
+            {"page_end": {"$gte": first}}
+        ]}
+    
+    def retrieve_chunks(
         self,
         query: str,
-        top_k: int = 3
-    ) -> List[str]:
+        top_k: int = 3,
+        pages: Optional[Tuple[int, int]] = None
+    ) -> List[Dict]:
         """
-        Retrieve the most similar chunks for a query
+        Retrieve the most similar chunks for a query with their stored metadata
         
         Args:
             query: User query
             top_k: Number of top chunks to retrieve
-            
+            pages: Optional inclusive (first, last) page range to search within
+        
         Returns:
-            List of similar chunks
+            Dicts with the chunk text, distance and metadata (page_start, page_end,
+            start, end, document_name) in order of similarity
         """
-        if not self.collection:
-            logger.warning("[RAG] No collection initialized")
-            return []
-        
         try:
             logger.info(f"[RAG] Retrieving top {top_k} chunks for query")
             logger.info(f"[RAG] Query length: {len(query)} chars")
             
             # Generate query embedding
-            query_embedding = self.embedding_service.embed_text(query)
+            query_embedding = self.embedding_service.embed_query(query)
             logger.info(f"[RAG] Query embedding generated: {len(query_embedding)} dimensions")
             
-            # Query ChromaDB
+            # Query ChromaDB; the session and page filters are applied inside the index
             logger.info(f"[RAG] Querying ChromaDB collection...")
             results = self.collection.query(
                 query_embeddings=[query_embedding],
-                n_results=top_k
+                n_results=top_k,
+                where=self._where(pages),
+                include=["documents", "metadatas", "distances"]
             )
             
             logger.info(f"[RAG] Query results received")
@@ -116,8 +189,13 @@ class RAGPipeline:
             # Extract documents
             if results and "documents" in results and len(results["documents"]) > 0:
                 documents = results["documents"][0]
+                metadatas = (results.get("metadatas") or [[]])[0] or [{}] * len(documents)
+                distances = (results.get("distances") or [[]])[0] or [None] * len(documents)
                 logger.info(f"[RAG] ✓ Retrieved {len(documents)} chunks")
-                return documents
+                return [
+                    {**(meta or {}), "text": document, "distance": distance}
+                    for document, meta, distance in zip(documents, metadatas, distances)
+                ]
             
             logger.warning(f"[RAG] ✗ No documents found in query results")
             return []
@@ -126,35 +204,99 @@ class RAGPipeline:
             logger.exception("Full traceback:")
             return []
     
-    def get_context(self, query: str, top_k: int = 3) -> str:
+    def retrieve_similar_chunks(
+        self,
+        query: str,
+        top_k: int = 3,
+        pages: Optional[Tuple[int, int]] = None
+    ) -> List[str]:
         """
-        Get formatted context for a query
+        Retrieve the most similar chunks for a query
         
         Args:
             query: User query
             top_k: Number of top chunks to retrieve
-            
+            pages: Optional inclusive (first, last) page range to search within
+        
         Returns:
-            Formatted context string
+            List of similar chunks
+        """
+        return [chunk["text"] for chunk in self.retrieve_chunks(query, top_k, pages)]
+    
+    @staticmethod
+    def format_pages(chunk: Dict) -> str:
+        """Page label of a retrieved chunk, e.g. "p. 3" or "pp. 3-4" (empty if unknown)"""
+        page_start, page_end = chunk.get("page_start"), chunk.get("page_end")
+        if page_start is None:
+            return ""
+        if page_end is None or page_end == page_start:
+            return f"p. {page_start}"
+        return f"pp. {page_start}-{page_end}"
+    
+    def get_context_with_sources(
+        self,
+        query: str,
+        top_k: int = 3,
+        pages: Optional[Tuple[int, int]] = None
+    ) -> Tuple[str, List[Dict]]:
+        """
+        Get formatted context for a query plus the sources it was built from
+        
+        Args:
+            query: User query
+            top_k: Number of top chunks to retrieve
+            pages: Optional inclusive (first, last) page range to search within
+        
+        Returns:
+            Context string with each chunk labelled by its pages, and one source
+            dict per chunk (document_name, chunk_id, pages and character offsets)
         """
         logger.info(f"[RAG] Getting formatted context for query: {query[:50]}...")
         
-        chunks = self.retrieve_similar_chunks(query, top_k)
+        chunks = self.retrieve_chunks(query, top_k, pages)
         
         if not chunks:
             logger.warning("[RAG] No chunks retrieved - returning empty context")
-            return ""
+            return "", []
         
-        context = "\n\n".join([f"[Chunk {i+1}]\n{chunk}" for i, chunk in enumerate(chunks)])
+        parts = []
+        for i, chunk in enumerate(chunks):
+            label = self.format_pages(chunk)
+            parts.append(f"[Chunk {i+1}{', ' + label if label else ''}]\n{chunk['text']}")
+        context = "\n\n".join(parts)
         logger.info(f"[RAG] Formatted context: {len(context)} chars from {len(chunks)} chunks")
-        return context
+        
+        sources = [
+            {
+                "document_name": chunk.get("document_name", ""),
+                "chunk_id": chunk.get("chunk_id"),
+                "page_start": chunk.get("page_start"),
+                "page_end": chunk.get("page_end"),
+                "start": chunk.get("start"),
+                "end": chunk.get("end")
+            }
+            for chunk in chunks
+        ]
+        return context, sources
+    
+    def get_context(self, query: str, top_k: int = 3, pages: Optional[Tuple[int, int]] = None) -> str:
+        """
+        Get formatted context for a query
+        
+        Args:
+            query: User query
+            top_k: Number of top chunks to retrieve
+            pages: Optional inclusive (first, last) page range to search within
+        
+        Returns:
+            Formatted context string
+        """
+        return self.get_context_with_sources(query, top_k, pages)[0]
     
     def clear(self) -> None:
-        """Clear the pipeline"""
-        if self.collection:
-            try:
-                self.client.delete_collection(name=self.collection.name)
-                self.collection = None
-                logger.info("Cleared RAG pipeline")
-            except Exception as e:
-                logger.error(f"Error clearing pipeline: {str(e)}")
+        """Delete this session's chunks from the shared collection"""
+        try:
+            self.collection.delete(where={"session_id": self.session_id})
+            logger.info(f"Cleared RAG pipeline for session {self.session_id}")
+        except Exception as e:
+            logger.error(f"Error clearing pipeline: {str(e)}")
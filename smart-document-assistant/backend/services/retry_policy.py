@@ -0,0 +1,180 @@
+"""
+Retry Policy - Bounded retries for LLM calls and per-language retry metrics
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How an answer in the wrong language is repaired
+REPAIR_TRANSLATE = "translate"
+REPAIR_REGENERATE = "regenerate"
+REPAIR_NONE = "none"
+REPAIR_MODES = (REPAIR_TRANSLATE, REPAIR_REGENERATE, REPAIR_NONE)
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RetryBudget:
+    """Wall-clock budget shared by every attempt made for one answer"""
+    
+    def __init__(self, total_seconds: float):
+        self.deadline = time.monotonic() + total_seconds
+    
+    def remaining(self) -> float:
+        """Seconds left before the budget is spent"""
+        return max(self.deadline - time.monotonic(), 0.0)
+    
+    def allows(self, seconds: float) -> bool:
+        """Check whether waiting ``seconds`` still leaves time for another call"""
+        return self.remaining() > seconds
+
+
+@dataclass
+class RetryPolicy:
+    """Limits on transport retries and language repairs for one answer"""
+    
+    total_budget: float = 45.0
+    max_transport_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 4.0
+    language_repair: str = REPAIR_TRANSLATE
+    max_language_repairs: int = 1
+    
+    def __post_init__(self):
+        if self.language_repair not in REPAIR_MODES:
+            raise ValueError(
+                f"Unsupported language repair '{self.language_repair}'. Supported: {', '.join(REPAIR_MODES)}"
+            )
+    
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """
+        Build a policy from environment variables
+        
+        Returns:
+            Policy configured by LLM_RETRY_BUDGET, LLM_MAX_TRANSPORT_RETRIES,
+            LLM_RETRY_BACKOFF, LLM_LANGUAGE_REPAIR and LLM_MAX_LANGUAGE_REPAIRS
+        """
+        return cls(
+            total_budget=float(os.getenv("LLM_RETRY_BUDGET", "45")),
+            max_transport_retries=int(os.getenv("LLM_MAX_TRANSPORT_RETRIES", "2")),
+            backoff_base=float(os.getenv("LLM_RETRY_BACKOFF", "0.5")),
+            language_repair=os.getenv("LLM_LANGUAGE_REPAIR", REPAIR_TRANSLATE),
+            max_language_repairs=int(os.getenv("LLM_MAX_LANGUAGE_REPAIRS", "1"))
+        )
+    
+    def start(self) -> RetryBudget:
+        """Start the budget for a new answer"""
+        return RetryBudget(self.total_budget)
+    
+    def backoff(self, retry: int) -> float:
+        """
+        Delay before a transport retry
+        
+        Args:
+            retry: Number of retries already made
+        
+        Returns:
+            Exponential backoff with jitter, capped at backoff_max
+        """
+        delay = min(self.backoff_base * (2 ** retry), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+    
+    @staticmethod
+    def is_retryable_status(status_code: int) -> bool:
+        """Check whether an HTTP status is worth retrying"""
+        return status_code in RETRYABLE_STATUS_CODES
+
+
+@dataclass
+class CallRecord:
+    """What one answer cost: LLM calls, retries and repairs"""
+    
+    language: str
+    llm_calls: int = 0
+    transport_retries: int = 0
+    repairs: int = 0
+    repaired: bool = False
+    language_valid: bool = False
+    fallback: bool = False
+    repair_seconds: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+
+
+class RetryMetrics:
+    """Per-language counters showing what language enforcement costs"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._languages: Dict[str, Dict] = {}
+    
+    def record(self, call: CallRecord) -> None:
+        """
+        Add a finished answer to the counters
+        
+        Args:
+            call: Record of the calls made for the answer
+        """
+        latency = time.monotonic() - call.started
+        with self._lock:
+            stats = self._languages.setdefault(call.language, {
+                "requests": 0,
+                "llm_calls": 0,
+                "transport_retries": 0,
+                "language_failures": 0,
+                "repairs": 0,
+                "repaired": 0,
+                "still_invalid": 0,
+                "fallbacks": 0,
+                "total_seconds": 0.0,
+                "repair_seconds": 0.0
+            })
+            stats["requests"] += 1
+            stats["llm_calls"] += call.llm_calls
+            stats["transport_retries"] += call.transport_retries
+            stats["repairs"] += call.repairs
+            stats["total_seconds"] += latency
+            stats["repair_seconds"] += call.repair_seconds
+            if call.fallback:
+                stats["fallbacks"] += 1
+            elif call.repairs or not call.language_valid:
+                stats["language_failures"] += 1
+                if call.repaired:
+                    stats["repaired"] += 1
+                elif not call.language_valid:
+                    stats["still_invalid"] += 1
+    
+    def get_stats(self) -> Dict:
+        """
+        Report retry rates per language
+        
+        Returns:
+            Counters plus the language retry rate, LLM calls per answer and
+            the average time spent on repairs
+        """
+        with self._lock:
+            languages = {language: dict(stats) for language, stats in self._languages.items()}
+        
+        for stats in languages.values():
+            requests = stats["requests"]
+            stats["language_retry_rate"] = round(stats["language_failures"] / requests, 4)
+            stats["calls_per_answer"] = round(stats["llm_calls"] / requests, 3)
+            stats["avg_latency_ms"] = round(stats["total_seconds"] * 1000 / requests, 1)
+            stats["avg_repair_ms"] = round(stats["repair_seconds"] * 1000 / requests, 1)
+            del stats["total_seconds"], stats["repair_seconds"]
+        return languages
+    
+    def reset(self) -> None:
+        """Clear every counter"""
+        with self._lock:
+            self._languages.clear()
+
+
+# Global retry metrics instance
+retry_metrics = RetryMetrics()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Local stub of the chat-completions API for exercising DeepSeekService
+
+Usage:
+    python stub_llm_server.py --port 9000 --delay 0.5
+    DEEPSEEK_BASE_URL=http://127.0.0.1:9000 DEEPSEEK_API_KEY=stub python run_server.py
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Chat-completions stub")
+app.state.delay = 0.0
+app.state.status_code = 200
+app.state.in_flight = 0
+app.state.max_in_flight = 0
+
+
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    """Answer like the chat-completions API, echoing the user message after a delay"""
+    body = await request.json()
+    
+    app.state.in_flight += 1
+    app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+    try:
+        await asyncio.sleep(app.state.delay)
+    finally:
+        app.state.in_flight -= 1
+    
+    if app.state.status_code != 200:
+        return JSONResponse(status_code=app.state.status_code, content={"error": {"message": "stub error"}})
+    
+    question = next((m["content"] for m in reversed(body.get("messages", [])) if m.get("role") == "user"), "")
+    answer = f"Stub answer to: {question}"
+    
+    if body.get("stream"):
+        return StreamingResponse(stream_tokens(answer, body.get("model", "stub")), media_type="text/event-stream")
+    
+    return {
+        "id": "stub-completion",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop"
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    }
+
+
+async def stream_tokens(answer: str, model: str):
+    """Emit the answer word by word as chat.completion.chunk events"""
+    for word in answer.split(" "):
+        chunk = {
+            "id": "stub-completion",
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(0.01)
+    yield "data: [DONE]\n\n"
+
+
+@app.get("/models")
+async def list_models():
+    """List models like the models API; /api/health probes this"""
+    if app.state.status_code != 200:
+        return JSONResponse(status_code=app.state.status_code, content={"error": {"message": "stub error"}})
+    return {"object": "list", "data": [{"id": "deepseek-chat", "object": "model", "owned_by": "stub"}]}
+
+
+@app.get("/stats")
+async def stats():
+    """Peak number of concurrent requests seen, to check client-side limits"""
+    return {"in_flight": app.state.in_flight, "max_in_flight": app.state.max_in_flight}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local chat-completions stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds before each reply")
+    parser.add_argument("--status-code", type=int, default=200, help="HTTP status to answer with")
+    args = parser.parse_args()
+    
+    app.state.delay = args.delay
+    app.state.status_code = args.status_code
+    
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Parity tests for language_detector.detect_language
+Run from the backend directory: python -m pytest tests
+"""
+
+import random
+
+import pytest
+
+from bench_language_detector import SAMPLES, reference_detect_language
+from services.language_detector import LANGUAGE_PATTERNS, detect_language
+
+# ==================== FIXTURES ====================
+
+TEXTS = [
+    "",
+    "   ",
+    "The answer is in the document.",
+    "THE ANSWER IS IN THE DOCUMENT.",
+    "हा दस्तऐवज महत्त्वाचा आहे.",
+    # Inflected forms only match as substrings: आहेत, जाते, हैं
+    "निकाल विश्वासार्ह आहेत आणि ते जाते",
+    "ये परिणाम विश्वसनीय हैं",
+    "Page 3: यह मॉडल है, and that is all",
+    "मॉडेल model आहे of the किंवा 42",
+    "१२३४ ५६७ ८९०",
+    "!!! ??? ...",
+] + [(sample * 40)[:size] for sample in SAMPLES.values() for size in (80, 1000, 4000)]
+
+
+def random_texts(count: int = 300, seed: int = 7):
+    """Random mixes of markers, Devanagari and Latin letters, digits and punctuation"""
+    rng = random.Random(seed)
+    markers = [marker for pattern in LANGUAGE_PATTERNS.values() for marker in pattern["markers"]]
+    alphabet = [chr(code) for code in range(0x0900, 0x0980)] + list("abcXYZ019 .,।")
+    texts = []
+    for _ in range(count):
+        parts = [
+            rng.choice(markers) if rng.random() < 0.4 else "".join(rng.choices(alphabet, k=rng.randint(1, 6)))
+            for _ in range(rng.randint(1, 30))
+        ]
+        texts.append(rng.choice(["", " "]).join(parts))
+    return texts
+
+
+# ==================== PARITY ====================
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_matches_reference_detector(text):
+    """Vectorised detector returns exactly what the original loop returned"""
+    assert detect_language(text) == reference_detect_language(text)
+
+
+def test_matches_reference_detector_on_random_text():
+    """Parity holds on random mixes of scripts and overlapping markers"""
+    mismatches = [text for text in random_texts() if detect_language(text) != reference_detect_language(text)]
+    assert mismatches == []
+
+
+def test_marathi_sample_detected_as_marathi():
+    """Benchmark Marathi sample is detected through its inflected markers"""
+    assert detect_language(SAMPLES["mr"]) == ("mr", pytest.approx(0.8))
@@ -1,6 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { useTheme } from '../context/ThemeContext';
-import { askQuestion } from '../services/api';
+import { askQuestionStream } from '../services/api';
 
 const Chat = ({ sessionId, documentName, currentLanguage, onLanguageChange }) => {
   const { isDark } = useTheme();
@@ -45,24 +45,43 @@ const Chat = ({ sessionId, documentName, currentLanguage, onLanguageChange }) =>
     try {
       console.log('Sending question:', inputValue);
       console.log('Language selected:', currentLanguage);
-      const response = await askQuestion(sessionId, inputValue, currentLanguage);
+      // Show the answer as it is generated
+      const assistantId = Date.now() + 1;
+      let started = false;
+      const response = await askQuestionStream(sessionId, inputValue, currentLanguage, (token) => {
+        if (!started) {
+          started = true;
+          setMessages((prev) => [
+            ...prev,
+            { id: assistantId, role: 'assistant', content: token, timestamp: new Date(), language: currentLanguage },
+          ]);
+        } else {
+          setMessages((prev) =>
+            prev.map((msg) => (msg.id === assistantId ? { ...msg, content: msg.content + token } : msg))
+          );
+        }
+      });
 
       if (response.success) {
         console.log(`[Chat] Response received in language: ${response.language}`);
         
-        if (response.language !== currentLanguage) {
-          console.warn(`[Chat] Language mismatch - requested ${currentLanguage}, got ${response.language}`);
+        if (!response.language_valid) {
+          console.warn(`[Chat] Language mismatch - requested ${currentLanguage}, detected ${response.detected_language}`);
         }
         
         const assistantMessage = {
-          id: Date.now() + 1,
+          id: assistantId,
           role: 'assistant',
           content: response.answer,
           timestamp: new Date(),
-          originalAnswer: response.original_answer,
+          originalAnswer: response.answer,
           language: response.language,
         };
-        setMessages((prev) => [...prev, assistantMessage]);
+        setMessages((prev) =>
+          started
+            ? prev.map((msg) => (msg.id === assistantId ? assistantMessage : msg))
+            : [...prev, assistantMessage]
+        );
       } else {
         const errorMessage = response.message || 'Failed to get response';
         console.error('Error response:', errorMessage);
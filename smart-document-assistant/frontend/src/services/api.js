@@ -33,6 +33,16 @@ export const uploadPDF = async (file) => {
       },
     });
     
+    // The backend processes the PDF in the background; wait until it is indexed
+    if (response.data.job_id) {
+      const job = await waitForUpload(response.data.job_id);
+      return {
+        ...response.data,
+        status: job.status,
+        message: `Successfully processed '${response.data.document_name}'`,
+      };
+    }
+    
     return response.data;
   } catch (error) {
     console.error('Upload failed:', error);
@@ -40,6 +50,25 @@ export const uploadPDF = async (file) => {
   }
 };
 
+// Poll an upload's ingest job until it completes or fails
+export const waitForUpload = async (jobId, intervalMs = 1000) => {
+  for (;;) {
+    const response = await api.get(`/upload-status/${jobId}`);
+    const job = response.data;
+    
+    if (job.status === 'completed') {
+      return job;
+    }
+    if (job.status === 'failed') {
+      const error = new Error(job.error || 'Failed to process PDF');
+      error.response = { data: { detail: job.error } };
+      throw error;
+    }
+    
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
 // Ask question
 export const askQuestion = async (sessionId, question, language = 'en') => {
   try {
@@ -72,6 +101,65 @@ export const askQuestion = async (sessionId, question, language = 'en') => {
   }
 };
 
+// Ask question and stream the answer (Server-Sent Events).
+// onToken is called with each piece of text; resolves with the final "done" payload.
+export const askQuestionStream = async (sessionId, question, language = 'en', onToken = () => {}) => {
+  const response = await fetch(`${API_BASE_URL}/ask-question/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      session_id: sessionId,
+      question: question,
+      language: language,
+    }),
+  });
+  
+  if (!response.ok) {
+    let detail = 'Failed to process question. Please try again.';
+    try {
+      detail = (await response.json()).detail || detail;
+    } catch (e) {
+      // Non-JSON error body
+    }
+    throw new Error(detail);
+  }
+  
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    
+    // Events are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      
+      let event = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      const payload = data ? JSON.parse(data) : {};
+      
+      if (event === 'token') {
+        onToken(payload.token);
+      } else if (event === 'done') {
+        return payload;
+      } else if (event === 'error') {
+        throw new Error(payload.message);
+      }
+    }
+  }
+  
+  throw new Error('Answer stream ended unexpectedly');
+};
+
 // Translate text
 export const translateText = async (text, targetLanguage) => {
   try {
@@ -4,13 +4,17 @@ FastAPI endpoints for integration with other services
 """
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Iterator, List, Optional
+import json
 import tempfile
 from pathlib import Path
 
-from pipeline import process_document
+from pipeline import DocumentProcessingPipeline, process_document
+from common.data_models import (
+    BatchSummary, ExtractionResult, PreprocessedResult, ProcessingPipeline, validate_fields
+)
 from common.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -22,22 +26,58 @@ app = FastAPI(
 )
 
 # ==================== REQUEST/RESPONSE MODELS ====================
+# Every request accepts an optional `fields` list selecting which result keys
+# to return (e.g. ["num_pages"] or ["preprocessing_result.sentences"]).
+# Large keys such as tokens are only serialized when selected.
 
 class ExtractionRequest(BaseModel):
     """Request model for text extraction"""
     file_path: str
     extraction_method: str = "hybrid"
+    fields: Optional[List[str]] = None
 
 class PreprocessingRequest(BaseModel):
     """Request model for text preprocessing"""
     text: str
     language: str = "en"
+    fields: Optional[List[str]] = None
 
 class ProcessingRequest(BaseModel):
     """Request model for complete processing"""
     file_path: str
     language: str = "en"
     extraction_method: str = "hybrid"
+    fields: Optional[List[str]] = None
+
+class BatchProcessingRequest(BaseModel):
+    """Request model for batch processing"""
+    file_paths: List[str]
+    language: str = "en"
+    extraction_method: str = "hybrid"
+    workers: Optional[int] = None
+    fields: Optional[List[str]] = None
+
+def select_fields(model: type, fields) -> Optional[List[str]]:
+    """
+    Validate a field selection for a result model
+    
+    Args:
+        model: Result dataclass the fields refer to
+        fields: List of field names, a comma-separated string, or None for all
+    
+    Returns:
+        List of field names, or None for all
+    
+    Raises:
+        HTTPException: 400 for an unknown field
+    """
+    if isinstance(fields, str):
+        fields = [name.strip() for name in fields.split(",") if name.strip()]
+    try:
+        validate_fields(model, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return fields
 
 # ==================== EXTRACTION ENDPOINTS ====================
 
@@ -51,11 +91,13 @@ async def extract(request: ExtractionRequest):
     
     Args:
         file_path: Path to PDF file
-        extraction_method: 'pypdf', 'pdfplumber', or 'hybrid'
+        extraction_method: 'pypdf', 'pdfplumber', 'hybrid' or 'parallel'
+        fields: Optional ExtractionResult keys to return
     
     Returns:
         JSON with extracted text and metadata
     """
+    fields = select_fields(ExtractionResult, request.fields)
     try:
         from text_extraction import extract_text
         
@@ -64,7 +106,7 @@ async def extract(request: ExtractionRequest):
             status_code=200,
             content={
                 "status": "success",
-                "data": result.to_dict()
+                "data": result.to_dict(fields)
             }
         )
     except Exception as e:
@@ -72,16 +114,18 @@ async def extract(request: ExtractionRequest):
         raise HTTPException(status_code=400, detail=f"Extraction failed: {str(e)}")
 
 @app.post("/api/v1/extract-file")
-async def extract_file(file: UploadFile = File(...)):
+async def extract_file(file: UploadFile = File(...), fields: Optional[str] = None):
     """
     Extract text from uploaded PDF file
     
     Args:
         file: PDF file upload
+        fields: Optional comma-separated ExtractionResult keys to return
     
     Returns:
         JSON with extracted text
     """
+    selected = select_fields(ExtractionResult, fields)
     try:
         from text_extraction import extract_text
         
@@ -97,7 +141,7 @@ async def extract_file(file: UploadFile = File(...)):
                 status_code=200,
                 content={
                     "status": "success",
-                    "data": result.to_dict()
+                    "data": result.to_dict(selected)
                 }
             )
         finally:
@@ -121,10 +165,12 @@ async def preprocess(request: PreprocessingRequest):
     Args:
         text: Raw text to preprocess
         language: Target language ('en', 'hi', 'mr')
+        fields: Optional PreprocessedResult keys to return
     
     Returns:
         JSON with cleaned text, sentences, tokens
     """
+    fields = select_fields(PreprocessedResult, request.fields)
     try:
         from text_preprocessing import preprocess_text
         
@@ -133,7 +179,7 @@ async def preprocess(request: PreprocessingRequest):
             status_code=200,
             content={
                 "status": "success",
-                "data": result.to_dict()
+                "data": result.to_dict(fields)
             }
         )
     except Exception as e:
@@ -154,10 +200,12 @@ async def process_full(request: ProcessingRequest):
         file_path: Path to PDF document
         language: Target language
         extraction_method: PDF extraction method
+        fields: Optional ProcessingPipeline keys to return
     
     Returns:
         JSON with extraction and preprocessing results
     """
+    fields = select_fields(ProcessingPipeline, request.fields)
     try:
         result = process_document(
             request.file_path,
@@ -169,17 +217,63 @@ async def process_full(request: ProcessingRequest):
             status_code=200,
             content={
                 "status": result.status,
-                "data": result.to_dict()
+                "data": result.to_dict(fields)
             }
         )
     except Exception as e:
         logger.error(f"Full processing endpoint error: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Processing failed: {str(e)}")
 
+def _batch_lines(request: BatchProcessingRequest) -> Iterator[str]:
+    """Yield one NDJSON line per finished document, then the batch summary"""
+    summary = BatchSummary(total_documents=len(request.file_paths))
+    pipeline = DocumentProcessingPipeline()
+    
+    for item in pipeline.process_many(
+        request.file_paths,
+        language=request.language,
+        extraction_method=request.extraction_method,
+        workers=request.workers
+    ):
+        summary.add(item)
+        yield json.dumps({"type": "document", **item.to_dict(request.fields)}, ensure_ascii=False) + "\n"
+    
+    logger.info(f"Batch processing finished: {summary.to_dict()}")
+    yield json.dumps({"type": "summary", **summary.to_dict()}) + "\n"
+
+@app.post("/api/v1/process-batch")
+async def process_batch(request: BatchProcessingRequest):
+    """
+    Process many documents across a worker pool
+    
+    Streams newline-delimited JSON as documents finish (not in request
+    order): one {"type": "document", ...} line per file with its status and
+    results, then a {"type": "summary", ...} line with counts and throughput
+    (docs_per_second, pages_per_second). A failed document is reported in
+    its line and does not stop the batch.
+    
+    Args:
+        file_paths: Paths to PDF documents
+        language: Target language
+        extraction_method: PDF extraction method
+        workers: Worker processes (defaults to BATCH_CONFIG)
+        fields: Optional ProcessingPipeline keys to return per document
+    
+    Returns:
+        application/x-ndjson stream
+    """
+    select_fields(ProcessingPipeline, request.fields)
+    if not request.file_paths:
+        raise HTTPException(status_code=400, detail="file_paths must not be empty")
+    
+    # A sync generator: Starlette runs it in a thread, keeping the event loop free
+    return StreamingResponse(_batch_lines(request), media_type="application/x-ndjson")
+
 @app.post("/api/v1/process-file")
 async def process_file(
     file: UploadFile = File(...),
-    language: str = "en"
+    language: str = "en",
+    fields: Optional[str] = None
 ):
     """
     Complete processing of uploaded PDF file
@@ -187,10 +281,12 @@ async def process_file(
     Args:
         file: PDF file upload
         language: Target language
+        fields: Optional comma-separated ProcessingPipeline keys to return
     
     Returns:
         JSON with complete processing results
     """
+    selected = select_fields(ProcessingPipeline, fields)
     try:
         # Save uploaded file temporarily
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
@@ -204,7 +300,7 @@ async def process_file(
                 status_code=200,
                 content={
                     "status": result.status,
-                    "data": result.to_dict()
+                    "data": result.to_dict(selected)
                 }
             )
         finally:
@@ -242,7 +338,8 @@ async def root():
             },
             "pipeline": {
                 "post": "/api/v1/process-full",
-                "post_file": "/api/v1/process-file"
+                "post_file": "/api/v1/process-file",
+                "post_batch": "/api/v1/process-batch"
             },
             "health": {
                 "get": "/health"
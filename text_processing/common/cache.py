@@ -0,0 +1,204 @@
+"""
+Result Cache for Smart Document Assistant
+Content-addressed storage of extraction and preprocessing results
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from dataclasses import fields as dataclass_fields
+from pathlib import Path
+from typing import Dict, Optional
+
+from common.logger import setup_logger
+from common.data_models import ExtractionResult, PreprocessedResult, TextSpans
+from config.settings import EXTRACTION_CONFIG, PREPROCESSING_CONFIG, NLP_CONFIG, STORAGE_CONFIG
+
+logger = setup_logger(__name__)
+
+# Settings that change how a file is read but not what comes out of it
+_EXTRACTION_RUNTIME_KEYS = {"parallel_workers", "parallel_min_pages", "timeout_seconds", "max_file_size_mb"}
+_NLP_RUNTIME_KEYS = {"batch_size", "n_process"}
+# PreprocessedResult fields stored as offsets into cleaned_text
+_SPAN_FIELDS = ("sentences", "tokens")
+
+
+def file_sha256(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    Hash a file's contents without reading it into memory at once
+    
+    Args:
+        file_path: Path to file
+        block_size: Bytes read per block
+        
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_hash(*configs: Dict) -> str:
+    """Short stable hash of configuration dictionaries"""
+    payload = json.dumps(configs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Content-addressed cache of ExtractionResult and PreprocessedResult
+    
+    Extraction results are keyed by file SHA-256 + extraction method +
+    extraction config hash; preprocessing results additionally by language
+    and preprocessing config hash. Renaming or moving a file keeps its
+    entries valid, while editing it or the relevant config misses.
+    Entries are gzip-compressed JSON written atomically under cache_dir.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        cache_extracted_text: Optional[bool] = None,
+        cache_preprocessed_text: Optional[bool] = None
+    ):
+        """
+        Initialize Result Cache
+        
+        Args:
+            cache_dir: Directory for cache entries
+            cache_extracted_text: Cache ExtractionResult objects
+            cache_preprocessed_text: Cache PreprocessedResult objects
+                    All default to STORAGE_CONFIG settings
+        """
+        self.cache_dir = Path(cache_dir or STORAGE_CONFIG["cache_dir"])
+        self.cache_extracted_text = (
+            STORAGE_CONFIG["cache_extracted_text"] if cache_extracted_text is None else cache_extracted_text
+        )
+        self.cache_preprocessed_text = (
+            STORAGE_CONFIG["cache_preprocessed_text"] if cache_preprocessed_text is None else cache_preprocessed_text
+        )
+        self.hits = 0
+        self.misses = 0
+        logger.info(f"ResultCache initialized at: {self.cache_dir}")
+    
+    @property
+    def enabled(self) -> bool:
+        return self.cache_extracted_text or self.cache_preprocessed_text
+    
+    @staticmethod
+    def extraction_key(file_hash: str, method: str) -> str:
+        """Key of an extraction result"""
+        config = {k: v for k, v in EXTRACTION_CONFIG.items() if k not in _EXTRACTION_RUNTIME_KEYS}
+        return f"{file_hash}-{method}-{config_hash(config)}"
+    
+    @staticmethod
+    def preprocessing_key(extraction_key: str, language: str) -> str:
+        """Key of a preprocessing result, derived from the extraction it was made from"""
+        nlp_config = {k: v for k, v in NLP_CONFIG.items() if k not in _NLP_RUNTIME_KEYS}
+        return f"{extraction_key}-{language}-{config_hash(PREPROCESSING_CONFIG, nlp_config)}"
+    
+    def _path(self, kind: str, key: str) -> Path:
+        # Fan out on the hash prefix so no directory grows too large
+        return self.cache_dir / kind / key[:2] / f"{key}.json.gz"
+    
+    def _load(self, kind: str, key: str) -> Optional[Dict]:
+        path = self._path(kind, key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path.name}: {str(e)}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+    
+    def _store(self, kind: str, key: str, data: Dict) -> None:
+        path = self._path(kind, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with gzip.open(os.fdopen(fd, "wb"), "wt", encoding="utf-8", compresslevel=6) as file:
+                    json.dump(data, file, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path.name}: {str(e)}")
+    
+    def get_extraction(self, key: str) -> Optional[ExtractionResult]:
+        """
+        Load a cached extraction result
+        
+        Args:
+            key: Key from extraction_key
+            
+        Returns:
+            ExtractionResult, or None on a miss or when extraction caching is off
+        """
+        if not self.cache_extracted_text:
+            return None
+        data = self._load("extraction", key)
+        return ExtractionResult.from_dict(data) if data is not None else None
+    
+    def put_extraction(self, key: str, result: ExtractionResult) -> None:
+        """Store an extraction result"""
+        if self.cache_extracted_text:
+            self._store("extraction", key, result.to_dict())
+    
+    def get_preprocessing(self, key: str, original_text: str) -> Optional[PreprocessedResult]:
+        """
+        Load a cached preprocessing result
+        
+        Args:
+            key: Key from preprocessing_key
+            original_text: Raw text the result was made from (not stored twice)
+            
+        Returns:
+            PreprocessedResult, or None on a miss or when preprocessing caching is off
+        """
+        if not self.cache_preprocessed_text:
+            return None
+        data = self._load("preprocessing", key)
+        if data is None:
+            return None
+        data["original_text"] = original_text
+        for name in _SPAN_FIELDS:
+            spans = data.pop(f"{name}_spans", None)
+            if spans is not None:
+                data[name] = TextSpans(data["cleaned_text"], array("I", spans[0]), array("I", spans[1]))
+        return PreprocessedResult.from_dict(data)
+    
+    def put_preprocessing(self, key: str, result: PreprocessedResult) -> None:
+        """
+        Store a preprocessing result
+        
+        The raw text is left out (the extraction entry holds it), and
+        sentences/tokens are stored as offsets into cleaned_text rather than
+        as strings.
+        """
+        if not self.cache_preprocessed_text:
+            return
+        
+        data = result.to_dict(
+            [f.name for f in dataclass_fields(PreprocessedResult) if f.name not in ("original_text", *_SPAN_FIELDS)]
+        )
+        for name in _SPAN_FIELDS:
+            items = getattr(result, name)
+            if isinstance(items, TextSpans) and items.text is result.cleaned_text:
+                data[f"{name}_spans"] = [items.starts.tolist(), items.ends.tolist()]
+            else:
+                data[name] = list(items)
+        self._store("preprocessing", key, data)
@@ -3,11 +3,135 @@ Data Models for Smart Document Assistant
 Standardized data structures for integration between modules
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+import time
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field, fields as dataclass_fields
+from typing import ClassVar, Iterable, Iterator, List, Dict, Optional, Union
 from datetime import datetime
 
-@dataclass
+def parse_fields(fields: Optional[Iterable[str]]) -> Optional[Dict[str, Optional[List[str]]]]:
+    """
+    Group a field selection by top-level name
+    
+    "a" selects all of a, "a.b" only b inside a. None selects everything.
+    
+    Returns:
+        Mapping of top-level name to nested selection (None for all of it),
+        or None when fields is None
+    """
+    if fields is None:
+        return None
+    selected = {}
+    for name in fields:
+        top, _, rest = name.partition(".")
+        if not rest:
+            selected[top] = None
+        elif top not in selected or selected[top] is not None:
+            selected.setdefault(top, []).append(rest)
+    return selected
+
+def validate_fields(model: type, fields: Optional[Iterable[str]]) -> None:
+    """
+    Check a field selection against a model's to_dict keys
+    
+    Raises:
+        ValueError: Naming the first unknown field
+    """
+    selected = parse_fields(fields)
+    if selected is None:
+        return
+    names = {f.name for f in dataclass_fields(model)}
+    nested = getattr(model, "NESTED_MODELS", {})
+    for name, sub_fields in selected.items():
+        if name not in names:
+            raise ValueError(f"Unknown field '{name}' for {model.__name__}")
+        if sub_fields is not None:
+            if name not in nested:
+                raise ValueError(f"Field '{name}' of {model.__name__} has no sub-fields")
+            validate_fields(nested[name], sub_fields)
+
+class TextSpans(Sequence):
+    """
+    Read-only sequence of substrings of one text, stored as offsets
+    
+    Sentences and tokens are kept as two array('I') of start/end positions
+    into the text they came from (8 bytes per item instead of a str object
+    each) and only become strings when indexed or iterated. Compares equal
+    to any sequence of the same strings.
+    """
+    __slots__ = ("text", "starts", "ends")
+    
+    def __init__(self, text: str, starts: Optional[array] = None, ends: Optional[array] = None):
+        self.text = text
+        self.starts = starts if starts is not None else array("I")
+        self.ends = ends if ends is not None else array("I")
+    
+    @classmethod
+    def from_strings(cls, text: str, strings: Iterable[str]) -> "TextSpans":
+        """
+        Locate strings that occur in text in order
+        
+        Raises:
+            ValueError: If a string is not found after the previous one
+        """
+        spans = cls(text)
+        position = 0
+        for string in strings:
+            start = text.find(string, position)
+            if start < 0:
+                raise ValueError(f"{string[:40]!r} does not occur in the text in order")
+            position = start + len(string)
+            spans.append(start, position)
+        return spans
+    
+    def append(self, start: int, end: int) -> None:
+        """Add the span text[start:end]"""
+        self.starts.append(start)
+        self.ends.append(end)
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self.text[start:end] for start, end in zip(self.starts[index], self.ends[index])]
+        return self.text[self.starts[index]:self.ends[index]]
+    
+    def __iter__(self) -> Iterator[str]:
+        text = self.text
+        for start, end in zip(self.starts, self.ends):
+            yield text[start:end]
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TextSpans) and other.text is self.text:
+            return other.starts == self.starts and other.ends == self.ends
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(other) == len(self) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        preview = ", ".join(repr(item) for item in self[:3])
+        return f"TextSpans([{preview}{', ...' if len(self) > 3 else ''}], n={len(self)})"
+    
+    def __getstate__(self):
+        return self.text, self.starts, self.ends
+    
+    def __setstate__(self, state):
+        self.text, self.starts, self.ends = state
+
+def _as_spans(text: str, items: Union[TextSpans, List[str]]) -> Union[TextSpans, List[str]]:
+    """Store a list of substrings of text as spans; keep it as a list if they are not substrings"""
+    if isinstance(items, TextSpans):
+        return items
+    try:
+        return TextSpans.from_strings(text, items)
+    except ValueError:
+        return list(items)
+
+@dataclass(slots=True)
 class ExtractionResult:
     """
     Standard result format for text extraction
@@ -23,9 +147,14 @@ class ExtractionResult:
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, any] = field(default_factory=dict)
     
-    def to_dict(self):
-        """Convert to dictionary for JSON serialization"""
-        return {
+    def to_dict(self, fields: Optional[Iterable[str]] = None):
+        """
+        Convert to dictionary for JSON serialization
+        
+        Args:
+            fields: Keys to include (default all)
+        """
+        data = {
             "file_path": self.file_path,
             "file_name": self.file_name,
             "raw_text": self.raw_text,
@@ -35,19 +164,42 @@ class ExtractionResult:
             "timestamp": self.timestamp.isoformat(),
             "metadata": self.metadata,
         }
+        selected = parse_fields(fields)
+        return data if selected is None else {name: value for name, value in data.items() if name in selected}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ExtractionResult":
+        """Rebuild a result from the output of to_dict"""
+        metadata = dict(data.get("metadata", {}))
+        if "page_engines" in metadata:
+            # JSON object keys are strings; page numbers are ints
+            metadata["page_engines"] = {int(page): engine for page, engine in metadata["page_engines"].items()}
+        return cls(
+            file_path=data["file_path"],
+            file_name=data["file_name"],
+            raw_text=data["raw_text"],
+            num_pages=data["num_pages"],
+            extraction_method=data["extraction_method"],
+            extraction_time_seconds=data["extraction_time_seconds"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            metadata=metadata,
+        )
 
-@dataclass
+@dataclass(slots=True)
 class PreprocessedResult:
     """
     Standard result format for text preprocessing
     Used as output from text_preprocessing module
     Used as input for retrieval/RAG module
+    
+    sentences and tokens are TextSpans into cleaned_text; lists of strings
+    passed in are converted when they are substrings of cleaned_text.
     """
     original_text: str
     cleaned_text: str
     text_length: int
-    sentences: List[str] = field(default_factory=list)
-    tokens: List[str] = field(default_factory=list)
+    sentences: Union[TextSpans, List[str]] = field(default_factory=list)
+    tokens: Union[TextSpans, List[str]] = field(default_factory=list)
     language: str = "en"
     cleaning_time_seconds: float = 0.0
     preprocessing_time_seconds: float = 0.0
@@ -55,40 +207,161 @@ class PreprocessedResult:
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, any] = field(default_factory=dict)
     
-    def to_dict(self):
-        """Convert to dictionary for JSON serialization"""
-        return {
-            "original_text": self.original_text,
-            "cleaned_text": self.cleaned_text,
-            "text_length": self.text_length,
-            "sentences": self.sentences,
-            "tokens": self.tokens,
-            "language": self.language,
-            "cleaning_time_seconds": self.cleaning_time_seconds,
-            "preprocessing_time_seconds": self.preprocessing_time_seconds,
-            "processing_steps": self.processing_steps,
-            "timestamp": self.timestamp.isoformat(),
-            "metadata": self.metadata,
+    def __post_init__(self):
+        self.sentences = _as_spans(self.cleaned_text, self.sentences)
+        self.tokens = _as_spans(self.cleaned_text, self.tokens)
+    
+    def to_dict(self, fields: Optional[Iterable[str]] = None):
+        """
+        Convert to dictionary for JSON serialization
+        
+        Sentences and tokens are only turned into strings if selected.
+        
+        Args:
+            fields: Keys to include (default all)
+        """
+        selected = parse_fields(fields)
+        data = {
+            "original_text": lambda: self.original_text,
+            "cleaned_text": lambda: self.cleaned_text,
+            "text_length": lambda: self.text_length,
+            "sentences": lambda: list(self.sentences),
+            "tokens": lambda: list(self.tokens),
+            "language": lambda: self.language,
+            "cleaning_time_seconds": lambda: self.cleaning_time_seconds,
+            "preprocessing_time_seconds": lambda: self.preprocessing_time_seconds,
+            "processing_steps": lambda: self.processing_steps,
+            "timestamp": lambda: self.timestamp.isoformat(),
+            "metadata": lambda: self.metadata,
         }
+        return {name: value() for name, value in data.items() if selected is None or name in selected}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PreprocessedResult":
+        """Rebuild a result from the output of to_dict"""
+        return cls(
+            original_text=data["original_text"],
+            cleaned_text=data["cleaned_text"],
+            text_length=data["text_length"],
+            sentences=data.get("sentences", []),
+            tokens=data.get("tokens", []),
+            language=data.get("language", "en"),
+            cleaning_time_seconds=data.get("cleaning_time_seconds", 0.0),
+            preprocessing_time_seconds=data.get("preprocessing_time_seconds", 0.0),
+            processing_steps=data.get("processing_steps", []),
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            metadata=data.get("metadata", {}),
+        )
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingPipeline:
     """
     Complete processing result after extraction + preprocessing
     Final output ready for RAG/Retrieval module
     """
+    NESTED_MODELS: ClassVar[Dict[str, type]] = {
+        "extraction_result": ExtractionResult,
+        "preprocessing_result": PreprocessedResult,
+    }
+    
     extraction_result: ExtractionResult
     preprocessing_result: PreprocessedResult
     total_processing_time: float = 0.0
     status: str = "completed"  # completed, failed, partial
     error_message: Optional[str] = None
     
-    def to_dict(self):
-        """Convert to dictionary for JSON serialization"""
+    def to_dict(self, fields: Optional[Iterable[str]] = None):
+        """
+        Convert to dictionary for JSON serialization
+        
+        Args:
+            fields: Keys to include (default all); "extraction_result.num_pages"
+                   selects a single key of a nested result
+        """
+        selected = parse_fields(fields)
+        data = {
+            "extraction_result": lambda sub: self.extraction_result.to_dict(sub),
+            "preprocessing_result": lambda sub: self.preprocessing_result.to_dict(sub),
+            "total_processing_time": lambda sub: self.total_processing_time,
+            "status": lambda sub: self.status,
+            "error_message": lambda sub: self.error_message,
+        }
+        if selected is None:
+            return {name: value(None) for name, value in data.items()}
+        return {name: value(selected[name]) for name, value in data.items() if name in selected}
+
+@dataclass(slots=True)
+class BatchDocumentResult:
+    """
+    Outcome of one document in a batch
+    Failed documents carry the error instead of a result
+    """
+    file_path: str
+    status: str  # completed, partial, failed
+    result: Optional[ProcessingPipeline] = None
+    error_message: Optional[str] = None
+    processing_time: float = 0.0
+    
+    @property
+    def num_pages(self) -> int:
+        return self.result.extraction_result.num_pages if self.result else 0
+    
+    def to_dict(self, fields: Optional[Iterable[str]] = None):
+        """
+        Convert to dictionary for JSON serialization
+        
+        Args:
+            fields: ProcessingPipeline keys to include in "data" (default all)
+        """
         return {
-            "extraction_result": self.extraction_result.to_dict(),
-            "preprocessing_result": self.preprocessing_result.to_dict(),
-            "total_processing_time": self.total_processing_time,
+            "file_path": self.file_path,
             "status": self.status,
+            "num_pages": self.num_pages,
+            "processing_time": self.processing_time,
             "error_message": self.error_message,
+            "data": self.result.to_dict(fields) if self.result else None,
+        }
+
+@dataclass(slots=True)
+class BatchSummary:
+    """
+    Aggregate counts and throughput of a batch
+    Feed it each BatchDocumentResult as it completes
+    """
+    total_documents: int = 0
+    completed: int = 0
+    partial: int = 0
+    failed: int = 0
+    num_pages: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    elapsed_seconds: float = 0.0
+    
+    def add(self, item: BatchDocumentResult) -> None:
+        """Count a finished document"""
+        if item.status == "completed":
+            self.completed += 1
+        elif item.status == "partial":
+            self.partial += 1
+        else:
+            self.failed += 1
+        self.num_pages += item.num_pages
+        self.elapsed_seconds = time.monotonic() - self.started_at
+    
+    @property
+    def processed(self) -> int:
+        return self.completed + self.partial + self.failed
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        elapsed = self.elapsed_seconds or 1e-9
+        return {
+            "total_documents": self.total_documents,
+            "processed": self.processed,
+            "completed": self.completed,
+            "partial": self.partial,
+            "failed": self.failed,
+            "num_pages": self.num_pages,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "docs_per_second": round(self.processed / elapsed, 3),
+            "pages_per_second": round(self.num_pages / elapsed, 3),
         }
@@ -20,9 +20,15 @@ for dir_path in [UPLOADS_DIR, PROCESSED_DIR, LOGS_DIR]:
 # === TEXT EXTRACTION SETTINGS ===
 EXTRACTION_CONFIG = {
     "supported_formats": ["pdf"],
-    "extraction_method": "hybrid",  # Can be 'pypdf', 'pdfplumber', 'hybrid'
+    "extraction_method": "hybrid",  # Can be 'pypdf', 'pdfplumber', 'hybrid', 'parallel'
     "max_file_size_mb": 100,
     "timeout_seconds": 300,
+    "parallel_workers": int(os.getenv("EXTRACTION_WORKERS", os.cpu_count() or 1)),  # Processes for 'parallel'
+    "parallel_min_pages": 16,  # Smaller documents are extracted in-process
+    # Hybrid keeps a page's PyPDF2 text unless it fails these checks, then uses pdfplumber
+    "hybrid_min_page_chars": 16,  # Fewer non-space characters looks empty
+    "hybrid_max_garbled_ratio": 0.05,  # Share of control/private-use/undecodable characters
+    "hybrid_max_avg_word_length": 20,  # Longer average words means spaces were lost
 }
 
 # === TEXT PREPROCESSING SETTINGS ===
@@ -37,6 +43,8 @@ PREPROCESSING_CONFIG = {
     "min_sentence_length": 3,
     "max_sentence_length": 500,
     "language": "multilingual",  # English, Hindi, Marathi
+    "stream_threshold_chars": 8_000_000,  # Longer texts are cleaned chunk by chunk
+    "stream_chunk_chars": 1_000_000,
 }
 
 # === NLP PREPROCESSING ===
@@ -46,6 +54,14 @@ NLP_CONFIG = {
     "lemmatization": True,
     "pos_tagging": True,
     "supported_languages": ["en", "hi", "mr"],  # English, Hindi, Marathi
+    "batch_size": 16,  # Documents per spaCy nlp.pipe batch
+    "n_process": 1,  # spaCy worker processes for multi-document jobs
+}
+
+# === BATCH PROCESSING ===
+BATCH_CONFIG = {
+    "workers": int(os.getenv("BATCH_WORKERS", os.cpu_count() or 1)),  # Documents processed in parallel
+    "max_in_flight_per_worker": 2,  # Queued documents per worker; bounds memory on huge batches
 }
 
 # === LOGGING ===
@@ -60,6 +76,7 @@ STORAGE_CONFIG = {
     "type": "json",  # Can be 'json', 'sqlite', 'postgresql'
     "cache_extracted_text": True,
     "cache_preprocessed_text": True,
+    "cache_dir": PROCESSED_DIR / "cache",  # Content-addressed results, gzip-compressed JSON
 }
 
 # === INTEGRATION ENDPOINTS ===
@@ -68,4 +85,5 @@ INTEGRATION_ENDPOINTS = {
     "extract_text": "/api/v1/extract",
     "preprocess_text": "/api/v1/preprocess",
     "process_pipeline": "/api/v1/process-full",
+    "process_batch": "/api/v1/process-batch",
 }
@@ -5,16 +5,58 @@ Easy integration point for other modules
 """
 
 import time
-from typing import Union, Optional
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Generator, Iterable, Iterator, List, Union, Optional
 
 from text_extraction import extract_text
 from text_preprocessing import preprocess_text
+from common.cache import ResultCache, file_sha256
 from common.logger import setup_logger
-from common.data_models import ExtractionResult, PreprocessedResult, ProcessingPipeline
+from common.data_models import (
+    BatchDocumentResult, ExtractionResult, PreprocessedResult, ProcessingPipeline
+)
 from common.exceptions import DocumentProcessingError
+from config.settings import BATCH_CONFIG, EXTRACTION_CONFIG
 
 logger = setup_logger(__name__)
 
+# Pipeline reused by every document a worker process handles
+_worker_pipeline = None
+
+def _process_one(
+    pipeline: "DocumentProcessingPipeline",
+    file_path: str,
+    language: str,
+    extraction_method: str
+) -> BatchDocumentResult:
+    start_time = time.time()
+    try:
+        result = pipeline.process(file_path, language, extraction_method)
+        return BatchDocumentResult(
+            file_path=file_path,
+            status=result.status,
+            result=result,
+            processing_time=time.time() - start_time
+        )
+    except Exception as e:
+        return BatchDocumentResult(
+            file_path=file_path,
+            status="failed",
+            error_message=str(e),
+            processing_time=time.time() - start_time
+        )
+
+def _init_worker(cache: ResultCache) -> None:
+    """Build a pool worker's pipeline around a copy of the parent pipeline's cache"""
+    global _worker_pipeline
+    _worker_pipeline = DocumentProcessingPipeline(cache=cache)
+
+def _process_in_worker(file_path: str, language: str, extraction_method: str) -> BatchDocumentResult:
+    """Process one document in a pool worker, keeping the pipeline between documents"""
+    return _process_one(_worker_pipeline, file_path, language, extraction_method)
+
 class DocumentProcessingPipeline:
     """
     Complete document processing pipeline
@@ -33,8 +75,14 @@ class DocumentProcessingPipeline:
         print(result.preprocessing_result.sentences)
     """
     
-    def __init__(self):
-        """Initialize processing pipeline"""
+    def __init__(self, cache: Optional[ResultCache] = None):
+        """
+        Initialize processing pipeline
+        
+        Args:
+            cache: Result cache; defaults to one configured by STORAGE_CONFIG
+        """
+        self.cache = cache or ResultCache()
         logger.info("DocumentProcessingPipeline initialized")
     
     def process(
@@ -65,10 +113,23 @@ class DocumentProcessingPipeline:
             logger.info(f"Starting document processing pipeline for: {file_path}")
             
             # Step 1: Extract text
+            extraction_key = None
             try:
                 logger.info("Step 1: Extracting text...")
-                extraction_result = extract_text(file_path, method=extraction_method)
-                logger.info(f"✓ Extraction completed in {extraction_result.extraction_time_seconds:.2f}s")
+                extraction_result = None
+                # Missing files fall through to extract_text, which reports them
+                if self.cache.enabled and Path(file_path).is_file():
+                    method = extraction_method or EXTRACTION_CONFIG["extraction_method"]
+                    extraction_key = ResultCache.extraction_key(file_sha256(file_path), method)
+                    extraction_result = self.cache.get_extraction(extraction_key)
+                
+                if extraction_result is not None:
+                    logger.info("✓ Extraction loaded from cache")
+                else:
+                    extraction_result = extract_text(file_path, method=extraction_method)
+                    logger.info(f"✓ Extraction completed in {extraction_result.extraction_time_seconds:.2f}s")
+                    if extraction_key:
+                        self.cache.put_extraction(extraction_key, extraction_result)
             except Exception as e:
                 logger.error(f"Extraction failed: {str(e)}")
                 raise DocumentProcessingError(f"Extraction phase failed: {str(e)}")
@@ -76,11 +137,22 @@ class DocumentProcessingPipeline:
             # Step 2: Preprocess text
             try:
                 logger.info("Step 2: Preprocessing text...")
-                preprocessing_result = preprocess_text(extraction_result, language=language)
-                logger.info(
-                    f"✓ Preprocessing completed in "
-                    f"{preprocessing_result.cleaning_time_seconds + preprocessing_result.preprocessing_time_seconds:.2f}s"
+                preprocessing_key = ResultCache.preprocessing_key(extraction_key, language) if extraction_key else None
+                preprocessing_result = (
+                    self.cache.get_preprocessing(preprocessing_key, extraction_result.raw_text)
+                    if preprocessing_key else None
                 )
+                
+                if preprocessing_result is not None:
+                    logger.info("✓ Preprocessing loaded from cache")
+                else:
+                    preprocessing_result = preprocess_text(extraction_result, language=language)
+                    logger.info(
+                        f"✓ Preprocessing completed in "
+                        f"{preprocessing_result.cleaning_time_seconds + preprocessing_result.preprocessing_time_seconds:.2f}s"
+                    )
+                    if preprocessing_key:
+                        self.cache.put_preprocessing(preprocessing_key, preprocessing_result)
             except Exception as e:
                 logger.error(f"Preprocessing failed: {str(e)}")
                 # Create partial result if preprocessing fails
@@ -112,6 +184,142 @@ class DocumentProcessingPipeline:
             logger.error(f"Document processing pipeline failed: {str(e)}")
             raise
 
+    def process_many(
+        self,
+        file_paths: Iterable[str],
+        language: str = "en",
+        extraction_method: str = "hybrid",
+        workers: Optional[int] = None
+    ) -> Iterator[BatchDocumentResult]:
+        """
+        Process many documents across a process pool
+        
+        Results are yielded as documents finish, not in input order. A
+        document that fails is reported with status 'failed' and does not
+        stop the batch. If a worker process dies, the pool is restarted and
+        the documents that were in flight are retried one at a time, so only
+        the document that crashed is reported as failed. Only a few documents
+        per worker are queued at a time, so paths can come from a lazy
+        iterator of any length.
+        
+        Usage:
+            summary = BatchSummary(total_documents=len(paths))
+            for item in pipeline.process_many(paths):
+                summary.add(item)
+            print(summary.to_dict()["docs_per_second"])
+        
+        Args:
+            file_paths: Paths to PDF documents
+            language: Target language ('en', 'hi', 'mr')
+            extraction_method: PDF extraction method
+            workers: Worker processes (default BATCH_CONFIG["workers"]);
+                    1 processes documents in this process
+            
+        Yields:
+            BatchDocumentResult for each document
+        """
+        workers = workers or BATCH_CONFIG["workers"]
+        paths = iter(file_paths)
+        
+        if workers <= 1:
+            for file_path in paths:
+                yield _process_one(self, file_path, language, extraction_method)
+            return
+        
+        max_in_flight = workers * BATCH_CONFIG["max_in_flight_per_worker"]
+        logger.info(f"Starting batch processing with {workers} workers")
+        
+        pool = self._start_pool(workers)
+        in_flight = {}
+        crashed: List[str] = []
+        try:
+            for file_path in paths:
+                try:
+                    in_flight[pool.submit(_process_in_worker, file_path, language, extraction_method)] = file_path
+                except BrokenProcessPool:
+                    # The pool broke since the last collection; this document never started
+                    crashed.append(file_path)
+                if len(in_flight) >= max_in_flight or crashed:
+                    yield from self._collect_finished(in_flight, crashed)
+                if crashed:
+                    pool = yield from self._recover(pool, workers, in_flight, crashed, language, extraction_method)
+            
+            while in_flight:
+                yield from self._collect_finished(in_flight, crashed)
+                if crashed:
+                    pool = yield from self._recover(pool, workers, in_flight, crashed, language, extraction_method)
+        finally:
+            pool.shutdown(cancel_futures=True)
+    
+    def _start_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Start a worker pool; workers get this pipeline's cache settings (directory, toggles, subclass)"""
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.cache,))
+    
+    def _recover(
+        self,
+        pool: ProcessPoolExecutor,
+        workers: int,
+        in_flight: dict,
+        crashed: List[str],
+        language: str,
+        extraction_method: str
+    ) -> Generator[BatchDocumentResult, None, ProcessPoolExecutor]:
+        """
+        Replace a broken pool and retry the documents that were in flight
+        
+        A dead worker breaks every pending future, so the crashing document
+        cannot be told apart from its neighbours. Each suspect is rerun alone
+        in a fresh pool, and only one that kills its worker again is failed.
+        
+        Both ``in_flight`` and ``crashed`` are emptied.
+        
+        Returns:
+            A healthy pool to continue the batch with
+        """
+        suspects = crashed + list(in_flight.values())
+        in_flight.clear()
+        crashed.clear()
+        logger.warning(f"Worker process died; retrying {len(suspects)} documents one at a time")
+        pool.shutdown(cancel_futures=True)
+        pool = self._start_pool(workers)
+        for file_path in suspects:
+            try:
+                yield pool.submit(_process_in_worker, file_path, language, extraction_method).result()
+            except BrokenProcessPool as e:
+                logger.error(f"Worker crashed on {file_path}: {str(e)}")
+                yield BatchDocumentResult(
+                    file_path=file_path,
+                    status="failed",
+                    error_message=f"Worker process crashed: {str(e)}"
+                )
+                pool.shutdown(cancel_futures=True)
+                pool = self._start_pool(workers)
+            except Exception as e:
+                logger.error(f"Worker failed on {file_path}: {str(e)}")
+                yield BatchDocumentResult(file_path=file_path, status="failed", error_message=str(e))
+        return pool
+    
+    @staticmethod
+    def _collect_finished(in_flight: dict, crashed: List[str]) -> Iterator[BatchDocumentResult]:
+        """
+        Wait for at least one queued document and yield every finished one
+        
+        Documents whose worker process died are moved to ``crashed`` instead
+        of being reported, since the pool cannot tell which one caused it.
+        """
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            file_path = in_flight.pop(future)
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                crashed.append(file_path)
+            except Exception as e:
+                logger.error(f"Worker failed on {file_path}: {str(e)}")
+                yield BatchDocumentResult(file_path=file_path, status="failed", error_message=str(e))
+
 # Convenience function
 def process_document(
     file_path: str,
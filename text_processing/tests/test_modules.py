@@ -3,22 +3,66 @@ Test Suite for Document Processing Modules
 Unit and integration tests
 """
 
+import json
+import os
 import pytest
 from pathlib import Path
 import tempfile
 
 from text_extraction import extract_text
-from text_preprocessing import preprocess_text
-from pipeline import process_document
-from common.data_models import ExtractionResult, PreprocessedResult
+from text_extraction.pdf_extractor import PDFExtractor
+from text_preprocessing import TextPreprocessor, preprocess_text
+from text_preprocessing.cleaner import TextCleaner
+from pipeline import DocumentProcessingPipeline, process_document
+from common.cache import ResultCache, file_sha256
+from common.data_models import (
+    BatchSummary, ExtractionResult, PreprocessedResult, ProcessingPipeline, TextSpans, validate_fields
+)
+from config.settings import PREPROCESSING_CONFIG
 
 # ==================== FIXTURES ====================
 
-@pytest.fixture
-def sample_pdf_path():
-    """Provide path to a test PDF (create if needed)"""
-    # This assumes you have a test PDF in tests/fixtures/
-    pdf_path = Path(__file__).parent / "fixtures" / "sample.pdf"
+SAMPLE_PAGES = [
+    f"Page {number} of the sample document.\n"
+    f"This is a test sentence about refund policy number {number}.\n"
+    f"Contact support at help@example.com or visit https://example.com for details."
+    for number in range(1, 6)
+]
+
+def write_sample_pdf(pdf_path: Path, pages: list) -> None:
+    """Write a minimal text PDF (one Helvetica line per text line) readable by pdfplumber and PyPDF2"""
+    font_id = 3 + 2 * len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+    ]
+    for i, text in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode()
+        )
+        lines = [f"BT /F1 12 Tf 50 {740 - 16 * n} Td ({line}) Tj ET" for n, line in enumerate(text.split("\n"))]
+        stream = "\n".join(lines).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    pdf_path.write_bytes(data)
+
+@pytest.fixture(scope="session")
+def sample_pdf_path(tmp_path_factory):
+    """Provide path to a small multi-page test PDF generated for the session"""
+    pdf_path = tmp_path_factory.mktemp("fixtures") / "sample.pdf"
+    write_sample_pdf(pdf_path, SAMPLE_PAGES)
     return str(pdf_path)
 
 @pytest.fixture
@@ -31,6 +75,18 @@ def sample_text():
     Additional content here with numbers like 123 and 456.
     """
 
+class CrashingCache(ResultCache):
+    """Result cache that kills the worker process looking up one file"""
+    
+    def __init__(self, cache_dir: Path, crash_hash: str):
+        super().__init__(cache_dir)
+        self.crash_hash = crash_hash
+    
+    def get_extraction(self, key: str):
+        if key.startswith(self.crash_hash):
+            os._exit(1)
+        return super().get_extraction(key)
+
 # ==================== TEXT EXTRACTION TESTS ====================
 
 class TestTextExtraction:
@@ -58,6 +114,34 @@ class TestTextExtraction:
             result = extract_text(sample_pdf_path, method=method)
             assert isinstance(result, ExtractionResult)
             assert result.extraction_method == method
+    
+    def test_parallel_extraction_matches_pdfplumber(self, sample_pdf_path):
+        """Test that parallel extraction keeps pages and their order"""
+        extractor = PDFExtractor(method="parallel", workers=2)
+        assert list(extractor.iter_pages_parallel(sample_pdf_path)) == \
+            list(extractor.iter_pages_pdfplumber(sample_pdf_path))
+    
+    def test_hybrid_records_engine_per_page(self, sample_pdf_path):
+        """Test that hybrid extraction reports which engine produced each page"""
+        result = extract_text(sample_pdf_path, method="hybrid")
+        engines = result.metadata["page_engines"]
+        assert set(engines.values()) <= {"pypdf", "pdfplumber"}
+        assert sum(result.metadata["engine_page_counts"].values()) == len(engines)
+    
+    def test_hybrid_page_quality_heuristic(self):
+        """Test that empty, garbled or run-together pages are sent to pdfplumber"""
+        assert PDFExtractor._page_looks_good("A normal page of extracted text with spaces between words.")
+        assert not PDFExtractor._page_looks_good("")
+        assert not PDFExtractor._page_looks_good("\ufffd\ufffd\ufffd\ufffd text \ufffd\ufffd\ufffd\ufffd\ufffd\ufffd\ufffd")
+        assert not PDFExtractor._page_looks_good("Thewholepagecameoutasonelongwordwithoutanyspacesatall")
+    
+    def test_parallel_page_ranges_cover_document(self):
+        """Test that page ranges are contiguous and cover every page once"""
+        for num_pages in [1, 7, 16, 101]:
+            ranges = PDFExtractor._page_ranges(num_pages, workers=3)
+            assert ranges[0][0] == 0
+            assert ranges[-1][1] == num_pages
+            assert all(stop == start for (_, stop), (start, _) in zip(ranges, ranges[1:]))
 
 # ==================== TEXT PREPROCESSING TESTS ====================
 
@@ -79,6 +163,60 @@ class TestTextPreprocessing:
         assert "example.com" not in result.cleaned_text
         assert "test@" not in result.cleaned_text
     
+    def test_fused_cleaning_matches_step_by_step(self, sample_text):
+        """Test that fused cleaning passes give the same text as each step in turn"""
+        text = sample_text + " a#12 foo_bar www.example.org/x यह दस्तावेज़। \t\t\n\n\n\n end"
+        for config in [
+            PREPROCESSING_CONFIG,
+            dict(PREPROCESSING_CONFIG, remove_punctuation=True),
+            dict(PREPROCESSING_CONFIG, remove_numbers=True, remove_punctuation=True),
+        ]:
+            cleaner = TextCleaner(config)
+            expected = text
+            for step in [
+                cleaner.remove_urls, cleaner.remove_emails, cleaner.remove_special_characters,
+                cleaner.remove_numbers, cleaner.remove_punctuation, cleaner.remove_extra_whitespace,
+            ]:
+                expected = step(expected)
+            assert cleaner.clean(text)[0] == expected
+    
+    def test_chunked_cleaning_matches_clean(self, sample_text):
+        """Test that streaming cleaning gives the same text however the input is split"""
+        cleaner = TextCleaner()
+        text = ("  " + sample_text + "\n\n\n") * 20
+        expected = cleaner.clean(text)[0]
+        for chunk_size in [1, 7, 64, len(text)]:
+            assert "".join(cleaner.clean_chunked(text, chunk_size)) == expected
+    
+    def test_batch_preprocessing_matches_single(self, sample_text):
+        """Test that batched preprocessing gives the same results as one document at a time"""
+        texts = [sample_text, "Second document. It has two sentences here.", ""]
+        preprocessor = TextPreprocessor(language="en")
+        batch = preprocessor.preprocess_many(texts)
+        assert len(batch) == len(texts)
+        for text, result in zip(texts, batch):
+            single = preprocessor.preprocess(text)
+            assert result.cleaned_text == single.cleaned_text
+            assert result.sentences == single.sentences
+            assert result.tokens == single.tokens
+    
+    def test_sentences_and_tokens_are_spans_of_cleaned_text(self, sample_text):
+        """Test that sentences/tokens are stored as offsets and read back as strings"""
+        result = preprocess_text(sample_text)
+        assert isinstance(result.tokens, TextSpans)
+        assert result.tokens.text is result.cleaned_text
+        assert list(result.tokens) == result.cleaned_text.split()
+        assert result.sentences[0] in result.cleaned_text
+        assert result.to_dict()["tokens"] == list(result.tokens)
+    
+    def test_to_dict_field_selection(self, sample_text):
+        """Test that only the selected fields are serialized"""
+        result = preprocess_text(sample_text)
+        assert set(result.to_dict(["sentences", "language"])) == {"sentences", "language"}
+        validate_fields(ProcessingPipeline, ["status", "preprocessing_result.tokens"])
+        with pytest.raises(ValueError):
+            validate_fields(ProcessingPipeline, ["preprocessing_result.unknown"])
+    
     def test_preprocessing_supports_multiple_languages(self, sample_text):
         """Test preprocessing for different languages"""
         for lang in ["en", "hi", "mr"]:
@@ -119,6 +257,41 @@ class TestDocumentProcessingPipeline:
             result = process_document(sample_pdf_path, language=lang)
             assert result.preprocessing_result.language == lang
 
+    def test_process_many_reports_each_document(self, sample_pdf_path):
+        """Test that batch processing yields every document and counts failures"""
+        paths = [sample_pdf_path, sample_pdf_path, "/nonexistent/path/file.pdf"]
+        summary = BatchSummary(total_documents=len(paths))
+        items = list(DocumentProcessingPipeline().process_many(paths, workers=1))
+        for item in items:
+            summary.add(item)
+        assert sorted(item.file_path for item in items) == sorted(paths)
+        assert summary.failed == 1
+        assert summary.completed + summary.partial == 2
+        assert summary.to_dict()["pages_per_second"] > 0
+
+    def test_process_many_workers_use_pipeline_cache(self, sample_pdf_path, tmp_path):
+        """Test that pool workers write to the pipeline's own cache"""
+        items = list(DocumentProcessingPipeline(cache=ResultCache(tmp_path)).process_many([sample_pdf_path], workers=2))
+        assert items[0].status != "failed"
+        
+        pipeline = DocumentProcessingPipeline(cache=ResultCache(tmp_path))
+        pipeline.process(sample_pdf_path)
+        assert pipeline.cache.hits == 2
+
+    def test_process_many_survives_worker_crash(self, sample_pdf_path, tmp_path):
+        """Test that a worker dying on one document fails only that document"""
+        crash_path = tmp_path / "crash.pdf"
+        write_sample_pdf(crash_path, ["This page kills the worker that reads it."])
+        cache = CrashingCache(tmp_path / "cache", file_sha256(str(crash_path)))
+        paths = [sample_pdf_path] * 10 + [str(crash_path)] + [sample_pdf_path] * 10
+        
+        items = list(DocumentProcessingPipeline(cache=cache).process_many(paths, workers=2))
+        
+        assert len(items) == len(paths)
+        failed = [item for item in items if item.status == "failed"]
+        assert [item.file_path for item in failed] == [str(crash_path)]
+        assert "crashed" in failed[0].error_message
+
 # ==================== INTEGRATION TESTS ====================
 
 class TestIntegration:
@@ -143,6 +316,17 @@ class TestIntegration:
         assert pipeline_result.extraction_result.raw_text == extraction.raw_text
         assert pipeline_result.preprocessing_result.cleaned_text == preprocessing.cleaned_text
 
+    def test_results_round_trip_through_dict(self, sample_text):
+        """Test that cached results rebuild to the same objects"""
+        extraction = ExtractionResult(
+            file_path="doc.pdf", file_name="doc.pdf", raw_text=sample_text, num_pages=1,
+            extraction_method="hybrid", extraction_time_seconds=0.1,
+            metadata={"page_engines": {1: "pypdf"}}
+        )
+        assert ExtractionResult.from_dict(json.loads(json.dumps(extraction.to_dict()))) == extraction
+        preprocessing = preprocess_text(extraction)
+        assert PreprocessedResult.from_dict(preprocessing.to_dict()) == preprocessing
+
 # ==================== PERFORMANCE TESTS ====================
 
 class TestPerformance:
@@ -153,6 +337,17 @@ class TestPerformance:
         result = extract_text(sample_pdf_path)
         assert result.extraction_time_seconds < 300  # 5 minutes max
     
+    def test_repeated_processing_uses_cache(self, sample_pdf_path, tmp_path):
+        """Test that processing the same file again is served from the cache"""
+        pipeline = DocumentProcessingPipeline(cache=ResultCache(tmp_path))
+        first = pipeline.process(sample_pdf_path)
+        assert (pipeline.cache.hits, pipeline.cache.misses) == (0, 2)
+        second = pipeline.process(sample_pdf_path)
+        # Both the extraction and the preprocessing result come from the cache
+        assert (pipeline.cache.hits, pipeline.cache.misses) == (2, 2)
+        assert second.extraction_result.raw_text == first.extraction_result.raw_text
+        assert second.preprocessing_result.sentences == first.preprocessing_result.sentences
+    
     def test_preprocessing_completes_quickly(self, sample_text):
         """Test that preprocessing is fast"""
         result = preprocess_text(sample_text)
@@ -4,7 +4,7 @@ Entry point for text extraction with standardized API
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Tuple
 
 from text_extraction.pdf_extractor import TextExtractorFactory
 from common.logger import setup_logger
@@ -24,7 +24,7 @@ class TextExtractor:
         Initialize Text Extractor
         
         Args:
-            method: Extraction method ('pypdf', 'pdfplumber', 'hybrid')
+            method: Extraction method ('pypdf', 'pdfplumber', 'hybrid', 'parallel')
                    Defaults to config setting
         """
         self.method = method or EXTRACTION_CONFIG.get("extraction_method", "hybrid")
@@ -55,6 +55,20 @@ class TextExtractor:
         logger.info(f"Text extraction completed: {result.file_name}")
         return result
 
+    def iter_pages(self, file_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Extract a document page by page without holding the whole text
+        
+        Args:
+            file_path: Path to document file
+            
+        Yields:
+            Tuples of (page_number, page_text)
+        """
+        logger.info(f"Starting streaming text extraction for: {file_path}")
+        extractor = TextExtractorFactory.create_extractor(file_path, self.method)
+        yield from extractor.iter_pages(file_path)
+
 # Convenience function for direct use
 def extract_text(file_path: str, method: str = None) -> ExtractionResult:
     """
@@ -4,9 +4,15 @@ Handles PDF parsing using PyPDF2 and pdfplumber
 Returns standardized ExtractionResult
 """
 
+import math
+import re
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 import PyPDF2
 import pdfplumber
 
@@ -19,19 +25,272 @@ from config.settings import EXTRACTION_CONFIG
 
 logger = setup_logger(__name__)
 
+# Control, private-use and replacement characters: what a failed text decode leaves behind
+_GARBLED_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\ue000-\uf8ff\ufffd]|\(cid:\d+\)")
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """
+    Extract pages [start, stop) with pdfplumber in a worker process
+    
+    Each worker opens the file itself, so nothing but the path and the
+    page text crosses the process boundary.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        return list(PDFExtractor._pdfplumber_pages(pdf, start, stop))
+
+
 class PDFExtractor:
     """Extract text from PDF files using multiple methods"""
     
-    def __init__(self, method: str = "hybrid"):
+    def __init__(self, method: str = "hybrid", workers: Optional[int] = None):
         """
         Initialize PDF Extractor
         
         Args:
-            method: 'pypdf', 'pdfplumber', or 'hybrid'
+            method: 'pypdf', 'pdfplumber', 'hybrid' or 'parallel'
+            workers: Processes used by the 'parallel' method
+                    Defaults to EXTRACTION_CONFIG["parallel_workers"]
         """
         self.method = method
+        self.workers = workers or EXTRACTION_CONFIG["parallel_workers"]
         logger.info(f"PDFExtractor initialized with method: {method}")
     
+    @staticmethod
+    def _format_page(page_num: int, page_text: str) -> str:
+        """Prefix a page's text with its page marker"""
+        return f"\n--- Page {page_num} ---\n{page_text}"
+    
+    @staticmethod
+    def _pypdf_pages(reader: PyPDF2.PdfReader) -> Iterator[Tuple[int, str]]:
+        for page_num, page in enumerate(reader.pages, start=1):
+            try:
+                page_text = page.extract_text()
+            except Exception as page_error:
+                logger.warning(f"Error extracting page {page_num}: {str(page_error)}")
+                continue
+            if page_text:
+                yield page_num, page_text
+    
+    @staticmethod
+    def _pdfplumber_pages(pdf: pdfplumber.PDF, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        pages = pdf.pages
+        for index in range(start, len(pages) if stop is None else min(stop, len(pages))):
+            page_num, page = index + 1, pages[index]
+            try:
+                page_text = page.extract_text()
+            except Exception as page_error:
+                logger.warning(f"Error extracting page {page_num} with pdfplumber: {str(page_error)}")
+                continue
+            finally:
+                # Release the page's parsed layout so memory stays flat
+                page.flush_cache()
+            if page_text:
+                yield page_num, page_text
+    
+    def iter_pages_pypdf(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield pages extracted with PyPDF2, one at a time
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Tuples of (page_number, page_text) for pages with text; page numbers start at 1
+        """
+        with open(pdf_path, "rb") as file:
+            yield from self._pypdf_pages(PyPDF2.PdfReader(file))
+    
+    def iter_pages_pdfplumber(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield pages extracted with pdfplumber, one at a time
+        
+        Each page's parsed layout is released after extraction, so memory
+        stays flat however many pages the document has.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Tuples of (page_number, page_text) for pages with text; page numbers start at 1
+        """
+        with pdfplumber.open(pdf_path) as pdf:
+            yield from self._pdfplumber_pages(pdf)
+    
+    @staticmethod
+    def _page_looks_good(page_text: Optional[str]) -> bool:
+        """
+        Check whether a page's PyPDF2 output can be kept
+        
+        Pages that are empty or very short, contain many undecodable
+        characters, or run words together (missing spaces) are re-extracted
+        with pdfplumber.
+        """
+        if not page_text:
+            return False
+        words = page_text.split()
+        visible_chars = sum(len(word) for word in words)
+        if visible_chars < EXTRACTION_CONFIG["hybrid_min_page_chars"]:
+            return False
+        if len(_GARBLED_CHARS.findall(page_text)) / visible_chars > EXTRACTION_CONFIG["hybrid_max_garbled_ratio"]:
+            return False
+        return visible_chars / len(words) <= EXTRACTION_CONFIG["hybrid_max_avg_word_length"]
+    
+    def _hybrid_pages(self, pdf_path: str, stack: ExitStack) -> Tuple[int, Iterator[Tuple[int, str, str]]]:
+        """
+        Open the file for hybrid extraction
+        
+        Returns the page count and a generator of (page_number, page_text, engine).
+        Files PyPDF2 cannot read come entirely from pdfplumber; otherwise
+        pdfplumber is only opened once some page needs it.
+        """
+        try:
+            reader = PyPDF2.PdfReader(stack.enter_context(open(pdf_path, "rb")))
+            num_pages = len(reader.pages)
+        except Exception as pypdf_error:
+            logger.warning(f"PyPDF2 cannot read file, using pdfplumber: {str(pypdf_error)}")
+            pdf = stack.enter_context(pdfplumber.open(pdf_path))
+            pages = ((page_num, page_text, "pdfplumber") for page_num, page_text in self._pdfplumber_pages(pdf))
+            return len(pdf.pages), pages
+        
+        def pages():
+            pdf = None
+            for index in range(num_pages):
+                page_num = index + 1
+                try:
+                    page_text = reader.pages[index].extract_text()
+                except Exception as page_error:
+                    logger.warning(f"Error extracting page {page_num} with PyPDF2: {str(page_error)}")
+                    page_text = None
+                
+                if self._page_looks_good(page_text):
+                    yield page_num, page_text, "pypdf"
+                    continue
+                
+                if pdf is None:
+                    pdf = stack.enter_context(pdfplumber.open(pdf_path))
+                fallback = next(self._pdfplumber_pages(pdf, index, index + 1), None)
+                if fallback:
+                    yield page_num, fallback[1], "pdfplumber"
+                elif page_text:
+                    yield page_num, page_text, "pypdf"
+        
+        return num_pages, pages()
+    
+    def iter_pages_hybrid(self, pdf_path: str) -> Iterator[Tuple[int, str, str]]:
+        """
+        Yield pages extracted with PyPDF2, re-extracting poor pages with pdfplumber
+        
+        The file is parsed by pdfplumber only if some page needs it, and then
+        only the pages that need it are laid out.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Tuples of (page_number, page_text, engine) for pages with text;
+            engine is 'pypdf' or 'pdfplumber'
+        """
+        with ExitStack() as stack:
+            _, pages = self._hybrid_pages(pdf_path, stack)
+            yield from pages
+    
+    def iter_pages(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield pages with the configured method
+        
+        In hybrid mode each page comes from PyPDF2 unless its output looks
+        empty or garbled, in which case pdfplumber re-extracts that page.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Tuples of (page_number, page_text)
+        """
+        if self.method == "pypdf":
+            yield from self.iter_pages_pypdf(pdf_path)
+            return
+        if self.method == "pdfplumber":
+            yield from self.iter_pages_pdfplumber(pdf_path)
+            return
+        if self.method == "parallel":
+            yield from self.iter_pages_parallel(pdf_path)
+            return
+        
+        for page_num, page_text, _ in self.iter_pages_hybrid(pdf_path):
+            yield page_num, page_text
+    
+    @staticmethod
+    def _page_ranges(num_pages: int, workers: int) -> List[Tuple[int, int]]:
+        """
+        Split pages into contiguous ranges, a few per worker so uneven pages balance out
+        
+        Args:
+            num_pages: Number of pages in the document
+            workers: Number of worker processes
+            
+        Returns:
+            List of (start, stop) page index ranges in document order
+        """
+        size = max(1, math.ceil(num_pages / (workers * 4)))
+        return [(start, min(start + size, num_pages)) for start in range(0, num_pages, size)]
+    
+    def iter_pages_parallel(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield pages extracted with pdfplumber across a process pool
+        
+        Page ranges are extracted concurrently, each worker opening the file
+        independently, and pages are yielded in document order. Small
+        documents, or a single worker, use the in-process path.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Tuples of (page_number, page_text) for pages with text; page numbers start at 1
+        """
+        with pdfplumber.open(pdf_path) as pdf:
+            num_pages = len(pdf.pages)
+        
+        if self.workers <= 1 or num_pages < EXTRACTION_CONFIG["parallel_min_pages"]:
+            yield from self.iter_pages_pdfplumber(pdf_path)
+            return
+        
+        ranges = self._page_ranges(num_pages, self.workers)
+        logger.info(f"Extracting {num_pages} pages in {len(ranges)} ranges with {self.workers} workers")
+        
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges))) as pool:
+            starts, stops = zip(*ranges)
+            # map returns results in submission order, so pages come back in order
+            for pages in pool.map(_extract_page_range, repeat(pdf_path), starts, stops):
+                yield from pages
+    
+    def extract_with_parallel(self, pdf_path: str) -> Tuple[str, int]:
+        """
+        Extract text using pdfplumber in a process pool
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Tuple of (extracted_text, num_pages)
+        """
+        try:
+            with pdfplumber.open(pdf_path) as pdf:
+                num_pages = len(pdf.pages)
+            text = "".join(self._format_page(*page) for page in self.iter_pages_parallel(pdf_path))
+            
+            if not text.strip():
+                raise InvalidPDFError("No text extracted from PDF")
+            
+            logger.info(f"Successfully extracted text using {self.workers} pdfplumber workers from {num_pages} pages")
+            return text, num_pages
+            
+        except Exception as e:
+            logger.error(f"Parallel pdfplumber extraction failed: {str(e)}")
+            raise ExtractionError(f"Parallel pdfplumber extraction failed: {str(e)}")
+    
     def extract_with_pypdf(self, pdf_path: str) -> Tuple[str, int]:
         """
         Extract text using PyPDF2
@@ -43,19 +302,11 @@ class PDFExtractor:
             Tuple of (extracted_text, num_pages)
         """
         try:
-            text = ""
             with open(pdf_path, "rb") as file:
                 reader = PyPDF2.PdfReader(file)
                 num_pages = len(reader.pages)
-                
-                for page_num, page in enumerate(reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += f"\n--- Page {page_num + 1} ---\n{page_text}"
-                    except Exception as page_error:
-                        logger.warning(f"Error extracting page {page_num + 1}: {str(page_error)}")
-                        continue
+                # Join once; growing the string page by page is quadratic
+                text = "".join(self._format_page(*page) for page in self._pypdf_pages(reader))
             
             if not text.strip():
                 raise InvalidPDFError("No text extracted from PDF (possible scanned image)")
@@ -78,18 +329,9 @@ class PDFExtractor:
             Tuple of (extracted_text, num_pages)
         """
         try:
-            text = ""
             with pdfplumber.open(pdf_path) as pdf:
                 num_pages = len(pdf.pages)
-                
-                for page_num, page in enumerate(pdf.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += f"\n--- Page {page_num + 1} ---\n{page_text}"
-                    except Exception as page_error:
-                        logger.warning(f"Error extracting page {page_num + 1} with pdfplumber: {str(page_error)}")
-                        continue
+                text = "".join(self._format_page(*page) for page in self._pdfplumber_pages(pdf))
             
             if not text.strip():
                 raise InvalidPDFError("No text extracted from PDF")
@@ -101,9 +343,38 @@ class PDFExtractor:
             logger.error(f"pdfplumber extraction failed: {str(e)}")
             raise ExtractionError(f"pdfplumber extraction failed: {str(e)}")
     
+    def _extract_hybrid(self, pdf_path: str) -> Tuple[str, int, Dict[int, str]]:
+        """Hybrid extraction that also reports the engine used for each page"""
+        try:
+            parts = []
+            page_engines = {}
+            with ExitStack() as stack:
+                num_pages, pages = self._hybrid_pages(pdf_path, stack)
+                for page_num, page_text, engine in pages:
+                    parts.append(self._format_page(page_num, page_text))
+                    page_engines[page_num] = engine
+            text = "".join(parts)
+            
+            if not text.strip():
+                raise InvalidPDFError("No text extracted from PDF (possible scanned image)")
+            
+        except Exception as e:
+            logger.error(f"Hybrid extraction failed: {str(e)}")
+            raise ExtractionError(f"Hybrid extraction failed: {str(e)}")
+        
+        counts = Counter(page_engines.values())
+        logger.info(
+            f"Successfully extracted text using hybrid from {num_pages} pages "
+            f"(PyPDF2: {counts['pypdf']}, pdfplumber: {counts['pdfplumber']})"
+        )
+        return text, num_pages, page_engines
+    
     def extract_with_hybrid(self, pdf_path: str) -> Tuple[str, int]:
         """
-        Try pdfplumber first (better quality), fallback to PyPDF2
+        Extract each page with PyPDF2 (fast), falling back to pdfplumber per page
+        
+        Only pages whose PyPDF2 output looks empty or garbled are parsed by
+        pdfplumber, so no page is laid out twice unless it needs to be.
         
         Args:
             pdf_path: Path to PDF file
@@ -111,19 +382,8 @@ class PDFExtractor:
         Returns:
             Tuple of (extracted_text, num_pages)
         """
-        try:
-            logger.info("Attempting hybrid extraction: pdfplumber first")
-            return self.extract_with_pdfplumber(pdf_path)
-        except Exception as pdfplumber_error:
-            logger.warning(f"pdfplumber failed, falling back to PyPDF2: {str(pdfplumber_error)}")
-            try:
-                return self.extract_with_pypdf(pdf_path)
-            except Exception as pypdf_error:
-                logger.error(f"Both extraction methods failed")
-                raise ExtractionError(
-                    f"Hybrid extraction failed. pdfplumber: {str(pdfplumber_error)}, "
-                    f"PyPDF2: {str(pypdf_error)}"
-                )
+        text, num_pages, _ = self._extract_hybrid(pdf_path)
+        return text, num_pages
     
     def extract(self, pdf_path: str) -> ExtractionResult:
         """
@@ -155,16 +415,28 @@ class PDFExtractor:
             
             # Extract based on method
             start_time = time.time()
+            page_engines = None
             
             if self.method == "pypdf":
                 raw_text, num_pages = self.extract_with_pypdf(str(pdf_path))
             elif self.method == "pdfplumber":
                 raw_text, num_pages = self.extract_with_pdfplumber(str(pdf_path))
+            elif self.method == "parallel":
+                raw_text, num_pages = self.extract_with_parallel(str(pdf_path))
             else:  # hybrid
-                raw_text, num_pages = self.extract_with_hybrid(str(pdf_path))
+                raw_text, num_pages, page_engines = self._extract_hybrid(str(pdf_path))
             
             extraction_time = time.time() - start_time
             
+            metadata = {
+                "file_size_mb": file_size_mb,
+                "encoding": "utf-8",
+            }
+            if page_engines is not None:
+                # Engine that produced each page, keyed by page number
+                metadata["page_engines"] = page_engines
+                metadata["engine_page_counts"] = dict(Counter(page_engines.values()))
+            
             # Create standardized result
             result = ExtractionResult(
                 file_path=str(pdf_path),
@@ -173,10 +445,7 @@ class PDFExtractor:
                 num_pages=num_pages,
                 extraction_method=self.method,
                 extraction_time_seconds=extraction_time,
-                metadata={
-                    "file_size_mb": file_size_mb,
-                    "encoding": "utf-8",
-                }
+                metadata=metadata
             )
             
             logger.info(f"Extraction completed successfully in {extraction_time:.2f}s")
@@ -4,7 +4,7 @@ Entry point for text preprocessing with standardized API
 """
 
 import time
-from typing import Union
+from typing import List, Union
 
 from text_preprocessing.cleaner import TextCleaner, TokenizerPreprocessor
 from common.logger import setup_logger
@@ -34,6 +34,39 @@ class TextPreprocessor:
         self.tokenizer = TokenizerPreprocessor(language)
         logger.info(f"TextPreprocessor initialized for language: {language}")
     
+    def _set_language(self, language: str = None) -> None:
+        if language and language != self.language:
+            self.language = language
+            self.tokenizer = TokenizerPreprocessor(language)
+    
+    def _build_result(
+        self,
+        original_text: str,
+        cleaned_text: str,
+        cleaning_steps: List[str],
+        cleaning_time: float,
+        sentences: List[str],
+        tokens: List[str],
+        preprocessing_time: float
+    ) -> PreprocessedResult:
+        return PreprocessedResult(
+            original_text=original_text,
+            cleaned_text=cleaned_text,
+            text_length=len(cleaned_text),
+            sentences=sentences,
+            tokens=tokens,
+            language=self.language,
+            cleaning_time_seconds=cleaning_time,
+            preprocessing_time_seconds=preprocessing_time,
+            processing_steps=cleaning_steps,
+            metadata={
+                "original_length": len(original_text),
+                "cleaned_length": len(cleaned_text),
+                "num_sentences": len(sentences),
+                "num_tokens": len(tokens),
+            }
+        )
+    
     def preprocess(
         self, 
         extraction_result: Union[ExtractionResult, str],
@@ -72,9 +105,7 @@ class TextPreprocessor:
             logger.info(f"Starting text preprocessing for: {file_name}")
             
             # Update language if provided
-            if language:
-                self.language = language
-                self.tokenizer = TokenizerPreprocessor(language)
+            self._set_language(language)
             
             # Step 1: Clean text
             cleaned_text, cleaning_steps, cleaning_time = self.cleaner.clean(original_text)
@@ -85,22 +116,9 @@ class TextPreprocessor:
             total_time = time.time() - start_time
             
             # Create standardized result
-            result = PreprocessedResult(
-                original_text=original_text,
-                cleaned_text=cleaned_text,
-                text_length=len(cleaned_text),
-                sentences=sentences,
-                tokens=tokens,
-                language=self.language,
-                cleaning_time_seconds=cleaning_time,
-                preprocessing_time_seconds=preprocessing_time,
-                processing_steps=cleaning_steps,
-                metadata={
-                    "original_length": len(original_text),
-                    "cleaned_length": len(cleaned_text),
-                    "num_sentences": len(sentences),
-                    "num_tokens": len(tokens),
-                }
+            result = self._build_result(
+                original_text, cleaned_text, cleaning_steps, cleaning_time,
+                sentences, tokens, preprocessing_time
             )
             
             logger.info(f"Preprocessing completed successfully in {total_time:.2f}s")
@@ -110,6 +128,56 @@ class TextPreprocessor:
             logger.error(f"Preprocessing failed: {str(e)}")
             raise PreprocessingError(f"Text preprocessing failed: {str(e)}")
 
+    def preprocess_many(
+        self,
+        extraction_results: List[Union[ExtractionResult, str]],
+        language: str = None,
+        batch_size: int = None,
+        n_process: int = None
+    ) -> List[PreprocessedResult]:
+        """
+        Preprocess several documents, batching the NLP step
+        
+        Each text is cleaned, then all cleaned texts go through spaCy's
+        nlp.pipe together instead of one parse per document.
+        
+        Args:
+            extraction_results: ExtractionResult objects or raw text strings
+            language: Override default language
+            batch_size: Texts per spaCy batch (default NLP_CONFIG["batch_size"])
+            n_process: Worker processes for spaCy (default NLP_CONFIG["n_process"])
+            
+        Returns:
+            List of PreprocessedResult, in input order
+        """
+        try:
+            start_time = time.time()
+            self._set_language(language)
+            
+            original_texts = [
+                result.raw_text if isinstance(result, ExtractionResult) else result
+                for result in extraction_results
+            ]
+            cleaned = [self.cleaner.clean(text) for text in original_texts]
+            parsed = self.tokenizer.preprocess_batch(
+                [cleaned_text for cleaned_text, _, _ in cleaned],
+                batch_size=batch_size,
+                n_process=n_process
+            )
+            
+            results = [
+                self._build_result(original_text, cleaned_text, cleaning_steps, cleaning_time, *nlp_output)
+                for original_text, (cleaned_text, cleaning_steps, cleaning_time), nlp_output
+                in zip(original_texts, cleaned, parsed)
+            ]
+            
+            logger.info(f"Preprocessed {len(results)} documents in {time.time() - start_time:.2f}s")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Batch preprocessing failed: {str(e)}")
+            raise PreprocessingError(f"Batch text preprocessing failed: {str(e)}")
+
 # Convenience function for direct use
 def preprocess_text(
     text: Union[ExtractionResult, str],
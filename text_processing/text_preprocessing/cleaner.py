@@ -5,17 +5,39 @@ Returns standardized PreprocessedResult
 """
 
 import re
+import threading
 import time
-from typing import List
+from typing import Iterable, Iterator, List
 import string
 
 from common.logger import setup_logger
 from common.exceptions import PreprocessingError
-from common.data_models import PreprocessedResult
-from config.settings import PREPROCESSING_CONFIG
+from common.data_models import PreprocessedResult, TextSpans
+from config.settings import PREPROCESSING_CONFIG, NLP_CONFIG
 
 logger = setup_logger(__name__)
 
+# Patterns are compiled once, not on every call
+_URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_WWW_PATTERN = re.compile(r'www\.\S+')
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s\.\,\!\?\-\'\"\:\;\(\)\n]')
+# Special characters and punctuation removed together: everything but word
+# characters and whitespace, plus '_' (a word character but also punctuation)
+_SPECIAL_CHARS_AND_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]|_')
+_NUMBER_PATTERN = re.compile(r'\b\d+\b')
+# A character class is several times faster than str.translate on non-ASCII text
+_PUNCTUATION_PATTERN = re.compile(f"[{re.escape(string.punctuation)}]+")
+# Space/tab runs other than a lone space (replacing those is a no-op), and 3+ newlines
+_SPACE_RUN_PATTERN = re.compile(r'\t[ \t]*| [ \t]+')
+_NEWLINE_RUN_PATTERN = re.compile(r'\n{3,}')
+_SENTENCE_PATTERN = re.compile(r'[^.!?]+')
+_WORD_PATTERN = re.compile(r'\S+')
+
+def _sub_matching_lines(pattern: "re.Pattern", marker: str, text: str) -> str:
+    """Apply a pattern that never spans lines only to the lines containing marker"""
+    return "\n".join(pattern.sub('', line) if marker in line else line for line in text.split("\n"))
+
 class TextCleaner:
     """Clean extracted text - remove noise and normalize"""
     
@@ -27,49 +49,81 @@ class TextCleaner:
             config: Preprocessing configuration
         """
         self.config = config or PREPROCESSING_CONFIG
+        self._steps = self._build_steps()
         logger.info("TextCleaner initialized")
     
+    def _build_steps(self) -> list:
+        """
+        Plan the removal passes for this config
+        
+        Disabled steps are left out, and steps that cannot change each
+        other's matches are fused into one pass: special characters and
+        punctuation are both plain character removals, so they become a
+        single pattern when number removal (which depends on the characters
+        around a number) is off. URLs and emails stay separate passes because
+        removing a URL can end a word where an email match would otherwise
+        continue.
+        """
+        remove_special = self.config.get("remove_special_chars", True)
+        remove_numbers = self.config.get("remove_numbers", False)
+        remove_punctuation = self.config.get("remove_punctuation", False)
+        
+        steps = []
+        if self.config.get("remove_urls", True):
+            steps.append(self.remove_urls)
+        if self.config.get("remove_emails", True):
+            steps.append(self.remove_emails)
+        if remove_special and remove_punctuation and not remove_numbers:
+            steps.append(lambda text: _SPECIAL_CHARS_AND_PUNCTUATION_PATTERN.sub('', text))
+        else:
+            if remove_special:
+                steps.append(self.remove_special_characters)
+            if remove_numbers:
+                steps.append(self.remove_numbers)
+            if remove_punctuation:
+                steps.append(self.remove_punctuation)
+        return steps
+    
     def remove_special_characters(self, text: str) -> str:
         """Remove special characters while preserving spaces and basic punctuation"""
         if not self.config.get("remove_special_chars", True):
             return text
         
         # Keep alphanumeric, spaces, and basic punctuation
-        text = re.sub(r'[^\w\s\.\,\!\?\-\'\"\:\;\(\)\n]', '', text, flags=re.UNICODE)
-        return text
+        return _SPECIAL_CHARS_PATTERN.sub('', text)
     
     def remove_urls(self, text: str) -> str:
         """Remove URLs from text"""
         if not self.config.get("remove_urls", True):
             return text
-        
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        text = re.sub(r'www\.\S+', '', text)
+        # Substring checks are far cheaper than a regex scan over text without URLs
+        if "http" in text:
+            text = _URL_PATTERN.sub('', text)
+        if "www." in text:
+            text = _WWW_PATTERN.sub('', text)
         return text
     
     def remove_emails(self, text: str) -> str:
         """Remove email addresses"""
-        if not self.config.get("remove_emails", True):
+        if not self.config.get("remove_emails", True) or "@" not in text:
             return text
         
-        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', text)
-        return text
+        # The pattern tries every word start, so only scan lines that can hold an email
+        return _sub_matching_lines(_EMAIL_PATTERN, "@", text)
     
     def remove_numbers(self, text: str) -> str:
         """Remove numbers (optional)"""
         if not self.config.get("remove_numbers", False):
             return text
         
-        text = re.sub(r'\b\d+\b', '', text)
-        return text
+        return _NUMBER_PATTERN.sub('', text)
     
     def remove_punctuation(self, text: str) -> str:
         """Remove punctuation (optional)"""
         if not self.config.get("remove_punctuation", False):
             return text
         
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        return text
+        return _PUNCTUATION_PATTERN.sub('', text)
     
     def remove_extra_whitespace(self, text: str) -> str:
         """Remove extra spaces, tabs, newlines"""
@@ -77,13 +131,79 @@ class TextCleaner:
             return text
         
         # Replace multiple spaces/tabs with single space
-        text = re.sub(r'[ \t]+', ' ', text)
+        text = _SPACE_RUN_PATTERN.sub(' ', text)
         # Replace multiple newlines with double newline
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _NEWLINE_RUN_PATTERN.sub('\n\n', text)
         # Strip leading/trailing whitespace
-        text = text.strip()
+        return text.strip()
+    
+    def _remove_noise(self, text: str) -> str:
+        for step in self._steps:
+            text = step(text)
         return text
     
+    def clean_stream(self, pieces: Iterable[str]) -> Iterator[str]:
+        """
+        Clean text arriving in pieces, yielding cleaned text as it goes
+        
+        Pieces can be split anywhere. Text is only cut before a space or
+        newline, where no removal pattern can match across the cut, and
+        trailing whitespace is held back until the next piece so whitespace
+        runs are normalized as a whole. Joining the output gives exactly
+        clean(text) of the joined input, without building either in full.
+        
+        Args:
+            pieces: Consecutive parts of the raw text
+            
+        Yields:
+            Consecutive parts of the cleaned text
+        """
+        normalize = self.config.get("remove_extra_whitespace", True)
+        buffer = ""
+        carry = ""
+        started = False
+        
+        def emit(segment: str) -> str:
+            nonlocal carry, started
+            segment = self._remove_noise(segment)
+            if not normalize:
+                return segment
+            segment = carry + segment
+            head = segment.rstrip()
+            carry = segment[len(head):]
+            head = _NEWLINE_RUN_PATTERN.sub('\n\n', _SPACE_RUN_PATTERN.sub(' ', head))
+            if not started:
+                head = head.lstrip()
+                started = bool(head)
+            return head
+        
+        for piece in pieces:
+            buffer += piece
+            cut = max(buffer.rfind(" "), buffer.rfind("\n"))
+            if cut <= 0:
+                continue
+            cleaned = emit(buffer[:cut])
+            buffer = buffer[cut:]
+            if cleaned:
+                yield cleaned
+        
+        cleaned = emit(buffer)
+        if cleaned:
+            yield cleaned
+    
+    def clean_chunked(self, text: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+        """
+        Clean a very large text in chunks of about chunk_size characters
+        
+        Args:
+            text: Raw extracted text
+            chunk_size: Characters handed to each cleaning pass
+            
+        Yields:
+            Consecutive parts of the cleaned text
+        """
+        return self.clean_stream(text[start:start + chunk_size] for start in range(0, len(text), chunk_size))
+    
     def clean(self, text: str) -> tuple:
         """
         Apply all cleaning steps
@@ -97,26 +217,22 @@ class TextCleaner:
         try:
             start_time = time.time()
             original_length = len(text)
-            processing_steps = []
-            
-            # Apply cleaning steps in order
-            text = self.remove_urls(text)
-            processing_steps.append("urls_removed")
             
-            text = self.remove_emails(text)
-            processing_steps.append("emails_removed")
-            
-            text = self.remove_special_characters(text)
-            processing_steps.append("special_chars_removed")
-            
-            text = self.remove_numbers(text)
-            processing_steps.append("numbers_removed")
-            
-            text = self.remove_punctuation(text)
-            processing_steps.append("punctuation_removed")
+            if original_length > self.config.get("stream_threshold_chars", float("inf")):
+                # Keep each pass's working copy to one chunk instead of the whole document
+                text = "".join(self.clean_chunked(text, self.config.get("stream_chunk_chars", 1 << 20)))
+            else:
+                text = self.remove_extra_whitespace(self._remove_noise(text))
             
-            text = self.remove_extra_whitespace(text)
-            processing_steps.append("whitespace_normalized")
+            # Steps are applied in this order, each a no-op when disabled
+            processing_steps = [
+                "urls_removed",
+                "emails_removed",
+                "special_chars_removed",
+                "numbers_removed",
+                "punctuation_removed",
+                "whitespace_normalized",
+            ]
             
             cleaning_time = time.time() - start_time
             
@@ -131,6 +247,65 @@ class TextCleaner:
             logger.error(f"Text cleaning failed: {str(e)}")
             raise PreprocessingError(f"Text cleaning failed: {str(e)}")
 
+# spaCy model per language; Marathi has no model and uses basic tokenization
+SPACY_MODELS = {
+    "en": "en_core_web_sm",
+    "hi": "hi_core_web_sm",
+    "mr": None,
+}
+
+# Components never used here; the parser is only needed if there is no senter
+_UNUSED_COMPONENTS = ["ner"]
+_LEMMA_COMPONENTS = ["tagger", "attribute_ruler", "lemmatizer"]
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+def load_pipeline(language: str):
+    """
+    Return the process-wide spaCy pipeline for a language, loading it once
+    
+    Named entity recognition is excluded, the dependency parser is replaced
+    by the lighter sentence recognizer when the model ships one, and the
+    tagging/lemmatization components are disabled unless NLP_CONFIG asks
+    for lemmas or POS tags.
+    
+    Args:
+        language: Language code ('en', 'hi', 'mr')
+        
+    Returns:
+        spaCy Language object, or None when spaCy or the model is unavailable
+    """
+    model_name = SPACY_MODELS.get(language, SPACY_MODELS["en"])
+    with _pipelines_lock:
+        if model_name in _pipelines:
+            return _pipelines[model_name]
+        
+        nlp = None
+        if model_name:
+            # Try to import spacy (optional dependency)
+            try:
+                import spacy  # type: ignore
+                nlp = spacy.load(model_name, exclude=_UNUSED_COMPONENTS)
+                
+                disabled = []
+                if "senter" in nlp.component_names and "parser" in nlp.pipe_names:
+                    nlp.enable_pipe("senter")
+                    disabled.append("parser")
+                if not (NLP_CONFIG.get("lemmatization") or NLP_CONFIG.get("pos_tagging")):
+                    disabled.extend(name for name in _LEMMA_COMPONENTS if name in nlp.pipe_names)
+                for name in disabled:
+                    nlp.disable_pipe(name)
+                
+                logger.info(f"Loaded spaCy model {model_name} with components: {', '.join(nlp.pipe_names)}")
+            except ImportError:
+                logger.warning("spaCy not installed, using basic tokenization")
+            except OSError:
+                logger.warning(f"spaCy model not found for {language}, using basic tokenization")
+        
+        _pipelines[model_name] = nlp
+        return nlp
+
 class TokenizerPreprocessor:
     """
     Tokenize and preprocess text using NLTK/spaCy
@@ -145,82 +320,92 @@ class TokenizerPreprocessor:
             language: Language code ('en', 'hi', 'mr')
         """
         self.language = language
-        
-        # Try to import spacy (optional dependency)
-        try:
-            import spacy  # type: ignore
-            try:
-                if language == "en":
-                    self.nlp = spacy.load("en_core_web_sm")
-                elif language == "hi":
-                    self.nlp = spacy.load("hi_core_web_sm")
-                elif language == "mr":
-                    # For Marathi, we'll use a basic tokenizer
-                    self.nlp = None
-                else:
-                    self.nlp = spacy.load("en_core_web_sm")
-            except OSError:
-                logger.warning(f"spaCy model not found for {language}, using basic tokenization")
-                self.nlp = None
-        except ImportError:
-            logger.warning("spaCy not installed, using basic tokenization")
-            self.nlp = None
+        # Shared by every tokenizer of this language in the process
+        self.nlp = load_pipeline(language)
         
         logger.info(f"TokenizerPreprocessor initialized for language: {language}")
     
-    def tokenize_sentences(self, text: str) -> List[str]:
-        """Split text into sentences"""
+    def _sentence_spans(self, text: str, bounds: Iterable[tuple]) -> TextSpans:
+        """Strip and length-filter candidate sentences, keeping them as offsets into text"""
+        # Filter by length
+        min_len = self.language != "en" and 2 or 3  # Allow shorter sentences for Hindi/Marathi
+        max_len = 500
+        
+        spans = TextSpans(text)
+        for start, end in bounds:
+            sentence = text[start:end]
+            stripped = sentence.strip()
+            if stripped and min_len <= len(stripped.split()) <= max_len:
+                start += len(sentence) - len(sentence.lstrip())
+                spans.append(start, start + len(stripped))
+        return spans
+    
+    def tokenize_sentences(self, text: str, doc=None) -> TextSpans:
+        """
+        Split text into sentences
+        
+        Args:
+            text: Cleaned text
+            doc: spaCy Doc already parsed from text, to avoid parsing again
+            
+        Returns:
+            Sentences as offsets into text
+        """
         try:
             if self.nlp:
-                doc = self.nlp(text)
-                sentences = [sent.text.strip() for sent in doc.sents]
+                doc = doc if doc is not None else self.nlp(text)
+                bounds = ((sent.start_char, sent.end_char) for sent in doc.sents)
             else:
-                # Basic sentence tokenization using regex
-                sentences = re.split(r'[.!?]+', text)
-                sentences = [s.strip() for s in sentences if s.strip()]
-            
-            # Filter by length
-            min_len = self.language != "en" and 2 or 3  # Allow shorter sentences for Hindi/Marathi
-            max_len = 500
-            
-            sentences = [
-                s for s in sentences
-                if min_len <= len(s.split()) <= max_len
-            ]
+                # Basic sentence tokenization: the runs between . ! and ?
+                bounds = (match.span() for match in _SENTENCE_PATTERN.finditer(text))
             
-            return sentences
+            return self._sentence_spans(text, bounds)
         except Exception as e:
             logger.error(f"Sentence tokenization failed: {str(e)}")
             raise PreprocessingError(f"Sentence tokenization failed: {str(e)}")
     
-    def tokenize_words(self, text: str) -> List[str]:
-        """Tokenize text into words/tokens"""
+    def tokenize_words(self, text: str, doc=None) -> TextSpans:
+        """
+        Tokenize text into words/tokens
+        
+        Args:
+            text: Cleaned text
+            doc: spaCy Doc already parsed from text, to avoid parsing again
+            
+        Returns:
+            Tokens as offsets into text
+        """
         try:
+            tokens = TextSpans(text)
+            starts, ends = tokens.starts, tokens.ends
             if self.nlp:
-                doc = self.nlp(text)
-                tokens = [token.text for token in doc]
+                doc = doc if doc is not None else self.nlp(text)
+                for token in doc:
+                    starts.append(token.idx)
+                    ends.append(token.idx + len(token))
             else:
-                # Basic word tokenization
-                tokens = text.split()
-            
+                # Basic word tokenization: whitespace-separated runs
+                for match in _WORD_PATTERN.finditer(text):
+                    starts.append(match.start())
+                    ends.append(match.end())
             return tokens
         except Exception as e:
             logger.error(f"Word tokenization failed: {str(e)}")
             raise PreprocessingError(f"Word tokenization failed: {str(e)}")
     
-    def get_lemmas(self, text: str) -> List[str]:
+    def get_lemmas(self, text: str, doc=None) -> List[str]:
         """Get lemmatized form of words (for English primarily)"""
         try:
             if not self.nlp or self.language != "en":
                 # Return original tokens for non-English
-                return self.tokenize_words(text)
+                return list(self.tokenize_words(text))
             
-            doc = self.nlp(text)
+            doc = doc if doc is not None else self.nlp(text)
             lemmas = [token.lemma_ for token in doc]
             return lemmas
         except Exception as e:
             logger.warning(f"Lemmatization failed: {str(e)}, using original tokens")
-            return self.tokenize_words(text)
+            return list(self.tokenize_words(text))
     
     def preprocess(self, text: str) -> tuple:
         """
@@ -235,8 +420,10 @@ class TokenizerPreprocessor:
         try:
             start_time = time.time()
             
-            sentences = self.tokenize_sentences(text)
-            tokens = self.tokenize_words(text)
+            # Parse once; sentences and tokens both come from the same Doc
+            doc = self.nlp(text) if self.nlp else None
+            sentences = self.tokenize_sentences(text, doc)
+            tokens = self.tokenize_words(text, doc)
             
             preprocessing_time = time.time() - start_time
             
@@ -250,3 +437,54 @@ class TokenizerPreprocessor:
         except Exception as e:
             logger.error(f"NLP preprocessing failed: {str(e)}")
             raise PreprocessingError(f"NLP preprocessing failed: {str(e)}")
+    
+    def preprocess_batch(
+        self,
+        texts: List[str],
+        batch_size: int = None,
+        n_process: int = None
+    ) -> List[tuple]:
+        """
+        Perform NLP preprocessing on many texts
+        
+        With spaCy the texts are parsed through nlp.pipe, which batches them
+        and can spread batches over several processes.
+        
+        Args:
+            texts: Cleaned texts
+            batch_size: Texts per spaCy batch (default NLP_CONFIG["batch_size"])
+            n_process: Worker processes for spaCy (default NLP_CONFIG["n_process"])
+            
+        Returns:
+            List of (sentences, tokens, preprocessing_time) tuples, one per text;
+            the batch time is shared out by text length
+        """
+        try:
+            start_time = time.time()
+            
+            if self.nlp:
+                docs = self.nlp.pipe(
+                    texts,
+                    batch_size=batch_size or NLP_CONFIG.get("batch_size", 16),
+                    n_process=n_process or NLP_CONFIG.get("n_process", 1)
+                )
+                parsed = [
+                    (self.tokenize_sentences(text, doc), self.tokenize_words(text, doc))
+                    for text, doc in zip(texts, docs)
+                ]
+            else:
+                parsed = [(self.tokenize_sentences(text), self.tokenize_words(text)) for text in texts]
+            
+            preprocessing_time = time.time() - start_time
+            total_length = sum(len(text) for text in texts) or 1
+            
+            logger.info(f"NLP preprocessing of {len(texts)} texts completed in {preprocessing_time:.2f}s")
+            
+            return [
+                (sentences, tokens, preprocessing_time * len(text) / total_length)
+                for text, (sentences, tokens) in zip(texts, parsed)
+            ]
+            
+        except Exception as e:
+            logger.error(f"NLP preprocessing failed: {str(e)}")
+            raise PreprocessingError(f"NLP preprocessing failed: {str(e)}")